@@ -32,7 +32,7 @@ def plot_data_gen(filename):
             bw_max_per_cbsd = {key: Total_BandWidth / val[0] for key, val in assignment.items()}
 
             tmp = {"CxG_"+str(cxg_num): np.mean([val for key, val in bw_max_per_cbsd.items()
-                                                 if key in {cbsd.id for cbsd in mysas.CBSDs if cbsd.CxG == cxg_num}])
+                                                 if key in mysas.get_cxg_members(cxg_num)])
                    for cxg_num in cxg_nums}
 
             bw_content[str(et)] = tmp
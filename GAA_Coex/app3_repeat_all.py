@@ -1,4 +1,5 @@
 import time, os
+import constant
 import app3_repeat_ew as ew
 import app3_rp_data as dt
 import app3_rp_eval as ev
@@ -23,6 +24,9 @@ def cleanfile(infile):
         print("The file does not exist")
 
 if __name__ == '__main__':
+    # Reuse propagation losses of identical links across runs
+    constant.loss_cache_file = "cache/propagation.loss"
+
     densities = [10]
     locations = ["vb", "sd"]
     cats = ["both"]
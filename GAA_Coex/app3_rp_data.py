@@ -20,7 +20,7 @@ def plot_data_gen(filename):
         Total_BandWidth = len(mysas.channels) * 10.0
 
         # Total CxG
-        cxg_nums = {cbsd.CxG for cbsd in mysas.CBSDs}
+        cxg_nums = mysas.cxg_members.keys()
 
         bw_content = {}
         for et in ets:
@@ -29,7 +29,7 @@ def plot_data_gen(filename):
             bw_max_per_cbsd = {key: Total_BandWidth / val[0] for key, val in assignment.items()}
 
             tmp = {"CxG_" + str(cxg_num): np.mean([val for key, val in bw_max_per_cbsd.items()
-                                                   if key in {cbsd.id for cbsd in mysas.CBSDs if cbsd.CxG == cxg_num}])
+                                                   if key in mysas.get_cxg_members(cxg_num)])
                    for cxg_num in cxg_nums}
 
             bw_content[str(et)] = tmp
@@ -41,23 +41,26 @@ def plot_data_gen(filename):
 
         potential_pairs_list = {et: mysas.get_approach_3(et) for et in ets}
 
-        cxg_nums = {cbsd.CxG for cbsd in mysas.CBSDs}
+        cxg_nums = mysas.cxg_members.keys()
 
         coverage = {}
         noises = {}
         for cxg_num in cxg_nums:
             noises_cxg = {}
+            # CBSDs in and out of the CxG
+            cxg_cbsds = [mysas.get_cbsd(cbsd_id) for cbsd_id in mysas.get_cxg_members(cxg_num)]
+            other_cbsds = [cbsd for cbsd in mysas.CBSDs if cbsd.CxG != cxg_num]
+
             # find the coverage of all CBSDs in the CxG
-            grids_covered = {key for cbsd in mysas.CBSDs if cbsd.CxG == cxg_num
-                             for key, val in cbsd.coverage.items() if val >= min_rx}
+            grids_covered = {key for cbsd in cxg_cbsds for key, val in cbsd.coverage.items() if val >= min_rx}
 
             coverage["CxG_"+str(cxg_num)] = list(grids_covered)
 
             # for each grid, find the CBSDs cover and interfere it
             for grid_id in grids_covered:
                 noises_grid = {}
-                cbsds_in_cxg = {cbsd for cbsd in mysas.CBSDs if cbsd.CxG == cxg_num and cbsd.coverage.get(grid_id) >= min_rx}
-                cbsds_out_cxg = {cbsd for cbsd in mysas.CBSDs if cbsd.CxG != cxg_num and cbsd.coverage.get(grid_id) >= min_rx}
+                cbsds_in_cxg = {cbsd for cbsd in cxg_cbsds if cbsd.coverage.get(grid_id) >= min_rx}
+                cbsds_out_cxg = {cbsd for cbsd in other_cbsds if cbsd.coverage.get(grid_id) >= min_rx}
 
                 # under each edge threshold
                 for et in ets:
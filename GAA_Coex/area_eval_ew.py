@@ -1,4 +1,5 @@
 import time
+import constant
 from gaa_sas import SAS
 
 
@@ -20,6 +21,9 @@ def ew(inputfile, outputfile, pm):
 
 
 if __name__ == '__main__':
+    # Reuse propagation losses of identical links across runs
+    constant.loss_cache_file = "cache/propagation.loss"
+
     # densities = [3, 10, 30, 50]
     densities = [50]
     # locations = ["vb", "sd"]
@@ -25,6 +25,27 @@ no_edge_distance = 40   # kilometer, the threshold of distance between 2 cbsd to
 initial_edge_threshold = 0.2    # 0~1, initialize the threshold of edge weight (ew) for edge creation
 
 tx_power_min = 20   # dBm/10MHz, minimum Tx Power
+ew_block_size = 512  # number of CBSDs per block of the area edge weight matrix product
+ew_chunk_size = 100000  # number of CBSD pairs per chunk of the edge weight computation (and its journal)
+link_loss_min_parallel = 64   # fewer directed link losses are computed in the current process
+
+# coverage related
+coverage_block_size = 250   # number of grid points handed to each worker per propagation call
+prune_loss_margin = 6       # dB, terrain models may go this far below free space loss before a grid is pruned
+indoor_loss = 15            # dB, building loss the propagation models add for indoor CBSDs
+
+# radial-sweep coverage related (coverage mode "radial")
+radial_count = 72           # number of radials from the CBSD
+radial_step = 0.05          # kilometer, distance between two evaluated points on a radial
+radial_stop_distance = 0.5  # kilometer, a radial stops once Rx stays below rx_power_min for this distance
+radial_segment = 20         # number of points evaluated per propagation call on a radial
+
+# adaptive coverage related (coverage mode "adaptive")
+adaptive_stride = 4         # number of fine grids between two evaluated coarse grids
+
+# propagation loss cache related
+loss_cache_file = None      # file of the on-disk propagation loss cache shared by all processes, None to disable
+loss_cache_slots = 2**22    # maximum number of cached losses (16 bytes each), least recently used ones are evicted
 
 
 # Channel Related
@@ -37,3 +58,9 @@ hb_channels_frequency = 3700     # MHz, the lower bound of frequency
 
 # Coloring related
 max_attempt = 80        # Maximum attempt times for coloring
+coloring_chunks_per_process = 4     # number of size-balanced chunks of graphs per worker of the coloring pool
+exact_max_nodes = 40    # graphs above this number of nodes are colored by DSATUR instead of exact coloring
+exact_max_steps = 200000    # maximum number of search steps of the exact coloring, the best found is used after
+kempe_max_chain = 50    # maximum number of CBSDs recolored by a Kempe chain swap when a CBSD joins a CxG
+coloring_cache_size = 10000     # number of CxG colorings kept in memory, least recently used ones are evicted
+coloring_cache_dir = None       # directory of the on-disk coloring cache shared by all processes, None to disable
@@ -1,8 +1,9 @@
 from typing import Set, Dict
+from gaa_coverage import Coverage
 
 
 # CBSD Related
-class CBSD:
+class CBSD(object):
     """
     The CBSD object stores states of the CBSDs and provide operation methods
     """
@@ -60,7 +61,9 @@ class CBSD:
         self.CNG = None     # Common Node Group     //Not in use for the current ver.
 
         # Coverage
-        self.coverage = None    # type: Dict[int: float]  # For Area Coordination Only, {grid_index: signal}
+        self.loss = None        # type: Coverage  # For Area Coordination Only, {grid_index: path_loss}
+        self.loss_key = None    # type: tuple   # Link geometry the path loss map was computed for
+        self._coverage = None   # type: Coverage  # Rx map derived from loss and TxPower, {grid_index: signal}
 
         # GAA Resource
         self.color = 0      # for coloring, 0 stands for unassigned, CxG-wide
@@ -112,9 +115,61 @@ class CBSD:
         # self.set_cs(cs_id)
         self.set_cxg(cxg_id)
 
+    # Coverage (Rx signal map), derived lazily from the power-independent path loss map
+    @property
+    def coverage(self):
+        if self._coverage is None and self.loss is not None:
+            self._coverage = self.TxPower - self.loss
+        return self._coverage
+
+    @coverage.setter
+    def coverage(self, coverage):
+        self.set_coverage(coverage)
+
     # Set Coverage
     def set_coverage(self, coverage=None):
-        self.coverage = coverage
+        """
+        Set the Rx signal map, usually recovered from record file.
+        The map is stored as path loss with respect to the current TxPower.
+
+        Input:
+            coverage:
+                Rx signal map {grid_index: signal}, None to clear
+                :type coverage: Coverage or Dict[int: float]
+        """
+        if coverage is None:
+            self.set_loss(None)
+        else:
+            if not isinstance(coverage, Coverage):
+                coverage = Coverage.from_dict(coverage)
+            self.set_loss(self.TxPower - coverage)
+
+    # Set Path Loss Map
+    def set_loss(self, loss=None):
+        """
+        Set the power-independent path loss map, the Rx signal map is derived from it on demand.
+
+        Input:
+            loss:
+                path loss map {grid_index: loss}, None to clear
+                :type loss: Coverage or Dict[int: float]
+
+        Post-Condition:
+            self.loss is set, self.loss_key records the current link geometry
+        """
+        if loss is not None and not isinstance(loss, Coverage):
+            loss = Coverage.from_dict(loss)
+        self.loss = loss
+        self.loss_key = None if loss is None else self.get_geometry()
+        self._coverage = None
+
+    # Link geometry that determines the path loss
+    def get_geometry(self):
+        return self.latitude, self.longitude, self.height, self.indoor, self.region_type
+
+    # Check if the path loss map is valid for the current link geometry
+    def has_loss(self):
+        return self.loss is not None and self.loss_key == self.get_geometry()
 
     # Convert object to String value
     def get_state_content(self):
@@ -150,9 +205,9 @@ class CBSD:
             CBSD coverage map is created
 
         Returns:
-            dict of the coverage map, {cbsd_id: coverage}.
+            dict of the coverage map, {grid_index: signal}, grids never covered (-inf) are omitted.
         """
-        return self.coverage
+        return self.coverage.to_dict() if self.coverage is not None else None
 
     # Transmitter Power Related Methods:
     def set_power(self, power):
@@ -167,11 +222,14 @@ class CBSD:
                 :type power: float
         """
         if power > self.TxPowerMax:
-            self.TxPower = self.TxPowerMax
+            power = self.TxPowerMax
         # elif power < tx_power_min:
-        #     self.TxPower = tx_power_min
-        else:
-            self.TxPower = power
+        #     power = tx_power_min
+
+        # Rx signal map will be derived again from the path loss map
+        if power != self.TxPower:
+            self._coverage = None
+        self.TxPower = power
 
     # Coloring Related Methods
     def set_color(self, color=0):
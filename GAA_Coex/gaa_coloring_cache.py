@@ -0,0 +1,103 @@
+# Graph Coloring Result Cache, in memory and optionally on disk
+import os
+import json
+import tempfile
+import constant
+from collections import OrderedDict
+from typing import Dict
+
+_cache = None   # type: ColoringCache   # cache of the current process
+
+
+class ColoringCache(object):
+    """
+    Content-addressed cache of CxG colorings, keyed by the fingerprint of the colored graph (see CxG.get_fingerprint).
+
+    Recent results are kept in memory, the least recently used ones are evicted beyond the size.
+    The optional on-disk layer keeps one file per fingerprint in a directory, shared by all processes and runs:
+    files are written to a temporary name and renamed, so readers never see a partial file.
+    """
+    def __init__(self, size=10000, directory=None):
+        """
+        Input:
+            size:       maximum number of colorings kept in memory, 0 for none
+                :type size: int
+
+            directory:  directory of the on-disk layer, created if not exists. None to disable
+                :type directory: str
+        """
+        self.size = size
+        self.directory = directory
+        self.entries = OrderedDict()    # type: OrderedDict[str: Dict[str: int]]   # from least to most recent
+
+    # Get the file of a key in the on-disk layer
+    def get_filename(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    # Find the coloring of a key
+    def lookup(self, key):
+        """
+        :param key: fingerprint of the graph
+        :return: color assignment, None if not cached
+        :type return: Dict[str: int]
+        """
+        colors = self.entries.pop(key, None)
+        if colors is None and self.directory is not None:
+            try:
+                with open(self.get_filename(key)) as f:
+                    colors = {str(cbsd_id): clr for cbsd_id, clr in json.load(f).items()}
+            except (IOError, ValueError):   # not cached, or written by an incompatible version
+                colors = None
+        if colors is not None:
+            self.remember(key, colors)
+        return colors
+
+    # Insert a coloring
+    def insert(self, key, colors):
+        """
+        :param key: fingerprint of the graph
+        :param colors: color assignment to cache
+        :type colors: Dict[str: int]
+        """
+        self.remember(key, colors)
+        if self.directory is None:
+            return
+
+        filename = self.get_filename(key)
+        directory = os.path.dirname(filename)
+        if not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:     # created by another process
+                pass
+        fd, tempname = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(colors, f)
+        os.rename(tempname, filename)
+
+    # Keep a coloring in memory as the most recent one
+    def remember(self, key, colors):
+        if self.size <= 0:
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = colors
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    # Forget the colorings kept in memory (the on-disk layer is kept)
+    def clear(self):
+        self.entries = OrderedDict()
+
+
+# Get the cache defined by constant.coloring_cache_size and constant.coloring_cache_dir
+def get_cache():
+    """
+    :return: ColoringCache of the current process, None if the cache is disabled
+    """
+    global _cache
+    size, directory = constant.coloring_cache_size, constant.coloring_cache_dir
+    if size <= 0 and directory is None:
+        return None
+    if _cache is None or _cache.size != size or _cache.directory != directory:
+        _cache = ColoringCache(size, directory)
+    return _cache
@@ -0,0 +1,181 @@
+import numpy as np
+from typing import Dict, List, Set
+
+
+# Component Tree of the interference graph
+class ComponentTree(object):
+    """
+    Merge tree of the connected sets of all edge thresholds (Kruskal reconstruction tree).
+
+    Built once from the edges sorted by descending edge weight with union-find: every merge of two sets
+    creates a new node whose height is the edge weight of the merge. Leaves are the CBSDs (height: infinity).
+    At edge threshold t (edges with ew > t), the connected sets are the subtrees of the highest nodes
+    with height > t, and the leaves of each subtree are contiguous in the leaf order.
+    """
+    def __init__(self, ids, rows, cols, ews):
+        """
+        Input:
+            ids:            CBSD id of each index
+                :type ids: List[str]
+
+            rows, cols:     indexes of both ends of each edge
+                :type rows: np.ndarray[int]
+                :type cols: np.ndarray[int]
+
+            ews:            edge weight of each edge
+                :type ews: np.ndarray[float]
+        """
+        self.ids = list(ids)    # type: List[str]
+        self.index = {cbsd_id: i for i, cbsd_id in enumerate(self.ids)}     # type: Dict[str: int]
+        n = len(self.ids)
+
+        # Tree nodes: leaves 0..n-1, merge nodes from n on (in the order of merge, i.e. descending height)
+        parent = [-1] * n
+        height = [np.inf] * n
+        children = [()] * n
+
+        # Union-Find over the edges by descending edge weight (stable for equal weights)
+        ews = np.asarray(ews, dtype=np.float32)
+        order = np.argsort(-ews, kind="mergesort")
+        uf = range(n)       # union-find parent
+        size = [1] * n      # union-find set size
+        node = range(n)     # tree node of each union-find root
+        for i, j, ew in zip(np.asarray(rows)[order].tolist(), np.asarray(cols)[order].tolist(), ews[order].tolist()):
+            # Find the roots (with path halving)
+            while uf[i] != i:
+                uf[i] = uf[uf[i]]
+                i = uf[i]
+            while uf[j] != j:
+                uf[j] = uf[uf[j]]
+                j = uf[j]
+            if i == j:
+                continue
+
+            # Merge the smaller set into the larger one, and record the merge as a new node
+            if size[i] < size[j]:
+                i, j = j, i
+            k = len(parent)
+            parent[node[i]] = k
+            parent[node[j]] = k
+            parent.append(-1)
+            height.append(ew)
+            children.append((node[i], node[j]))
+            uf[j] = i
+            size[i] += size[j]
+            node[i] = k
+
+        self.parent = np.array(parent, dtype=np.int64)      # type: np.ndarray  # parent node, -1 for roots
+        self.height = np.array(height, dtype=np.float32)    # type: np.ndarray  # edge weight of the merge
+
+        # Leaf order (depth first from each root), each subtree covers leaves [start, end) of the order
+        self.order = np.zeros(n, dtype=np.int64)    # type: np.ndarray  # leaves in depth first order
+        self.start = np.zeros(len(parent), dtype=np.int64)  # type: np.ndarray
+        self.end = np.zeros(len(parent), dtype=np.int64)    # type: np.ndarray
+        position = 0
+        for root in np.flatnonzero(self.parent < 0).tolist():
+            stack = [(root, False)]
+            while len(stack) != 0:
+                x, visited = stack.pop()
+                if visited:
+                    self.end[x] = position
+                elif x < n:
+                    self.start[x] = position
+                    self.order[position] = x
+                    position += 1
+                    self.end[x] = position
+                else:
+                    self.start[x] = position
+                    stack.append((x, True))
+                    stack.extend((child, False) for child in reversed(children[x]))
+
+    # Get the nodes of the connected sets at a threshold
+    def get_roots(self, th):
+        """
+        :type th: float
+        :return: highest node with height > th of each connected set
+        :type return: np.ndarray[int]
+        """
+        th = np.float32(th)
+        above = self.height > th
+        parent_above = np.zeros(len(self.parent), dtype=bool)
+        parent_above[self.parent >= 0] = above[self.parent[self.parent >= 0]]
+        return np.flatnonzero(above & ~parent_above)
+
+    # Get the connected set of each leaf at a threshold
+    def get_labels(self, th):
+        """
+        :type th: float
+        :return: label (0, 1, ...) of the connected set of each CBSD index
+        :type return: np.ndarray[int]
+        """
+        roots = self.get_roots(th)
+        roots = roots[np.argsort(self.start[roots])]    # the subtrees of the roots partition the leaf order
+        label = np.zeros(len(self.ids), dtype=np.int64)
+        label[self.order] = np.repeat(np.arange(len(roots)), self.end[roots] - self.start[roots])
+        return label
+
+    # Get the connected sets at a threshold
+    def connected_sets(self, th, cbsd_ids=None):
+        """
+        Connected sets of the graph of the edges with ew > th
+
+        Input:
+            th:         edge threshold
+                :type th: float
+
+            cbsd_ids:   only the given CBSDs (the connected sets are cut to them), None for all
+                :type cbsd_ids: Iterable[str]
+
+        Returns:
+            List of sets of CBSD ids, ids not in the tree are singleton sets
+                :type return: List[Set[str]]
+        """
+        if cbsd_ids is None:
+            cbsd_ids = self.ids
+        label = self.get_labels(th)
+
+        # Group the given CBSDs by label
+        groups = {}
+        sets = []
+        for cbsd_id in cbsd_ids:
+            i = self.index.get(cbsd_id)
+            if i is None:
+                sets.append({cbsd_id})
+                continue
+            if label[i] not in groups:
+                groups[label[i]] = set()
+                sets.append(groups[label[i]])
+            groups[label[i]].add(cbsd_id)
+        return sets
+
+    # Get the members of the connected set containing a CBSD at a threshold
+    def members(self, cbsd_id, th):
+        """
+        :type cbsd_id: str
+        :type th: float
+        :return: ids of the CBSDs connected with the given CBSD (including itself) by edges with ew > th
+        :type return: Set[str]
+        """
+        if cbsd_id not in self.index:
+            return {cbsd_id}
+        th = np.float32(th)
+        x = self.index[cbsd_id]
+        while self.parent[x] >= 0 and self.height[self.parent[x]] > th:
+            x = self.parent[x]
+        return {self.ids[i] for i in self.order[self.start[x]: self.end[x]]}
+
+    # Check if the given CBSDs are a union of connected sets at a threshold
+    def is_closed(self, cbsd_ids, th):
+        """
+        True if no connected set (at th) has members both inside and outside the given CBSDs,
+        then connected_sets(th, cbsd_ids) equals the connected sets of the sub-graph of the given CBSDs
+
+        :type cbsd_ids: Iterable[str]
+        :type th: float
+        :rtype: bool
+        """
+        index = [self.index[cbsd_id] for cbsd_id in cbsd_ids if cbsd_id in self.index]
+        label = self.get_labels(th)
+        inside = np.bincount(label[index], minlength=label.max() + 1 if len(label) > 0 else 0)
+        total = np.bincount(label, minlength=len(inside))
+        return bool(np.all((inside == 0) | (inside == total)))
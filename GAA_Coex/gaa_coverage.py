@@ -0,0 +1,127 @@
+import numpy as np
+from typing import Dict, List
+
+
+# Coverage Map (Rx signal or path loss of each grid)
+class Coverage(object):
+    """
+    Map of {grid_index: value} backed by a contiguous float32 array aligned to the SAS grid order,
+    grid index i is stored at position i - 1. Grids without a value are stored as NaN.
+    Provides the read API of the dict used before (get, keys, values, items, in, len, []).
+    """
+    def __init__(self, values):
+        """
+        Input:
+            values:     value of each grid in the order of grid index (starting from grid index 1)
+                :type values: np.ndarray[float]
+        """
+        self.array = np.asarray(values, dtype=np.float32)     # type: np.ndarray
+        self.packed = {}    # type: Dict[tuple: np.ndarray]  # packed masks already computed, {(threshold, size): bits}
+
+    # Create from grid indexes and values
+    @staticmethod
+    def from_items(keys, values):
+        """
+        Input:
+            keys:   grid indexes
+                :type keys: List[int]
+
+            values: value of each grid index
+                :type values: List[float]
+
+        Returns:
+            Coverage
+        """
+        keys = np.asarray(keys, dtype=int)
+        array = np.full(keys.max() if len(keys) > 0 else 0, np.nan, dtype=np.float32)
+        array[keys - 1] = values
+        return Coverage(array)
+
+    # Create from a dict {grid_index: value}
+    @staticmethod
+    def from_dict(content):
+        """
+        :type content: Dict[int: float]
+        :return: Coverage
+        """
+        keys = [int(k) for k in content.keys()]
+        return Coverage.from_items(keys, [content.get(k) for k in content.keys()])
+
+    # Convert to dict {grid_index: value}, used for output
+    def to_dict(self):
+        """
+        Grids with an infinite value (e.g. out of range, never covered) are omitted like the grids without a value,
+        so the content stays standard JSON
+
+        :return: Dict[int: float]
+        """
+        return {key: float(self.array[key - 1]) for key in self.keys() if np.isfinite(self.array[key - 1])}
+
+    # Array of the values padded (with NaN) or cut to the given number of grids
+    def to_array(self, size=None):
+        """
+        :type size: int
+        :return: np.ndarray[float32], position i - 1 holds grid index i
+        """
+        if size is None or size == len(self.array):
+            return self.array
+        array = np.full(size, np.nan, dtype=np.float32)
+        array[:min(size, len(self.array))] = self.array[:size]
+        return array
+
+    # Mask of the grids whose value >= threshold (NaN is never included)
+    def mask(self, threshold, size=None):
+        """
+        :type threshold: float
+        :type size: int
+        :return: np.ndarray[bool]
+        """
+        with np.errstate(invalid="ignore"):
+            return self.to_array(size) >= threshold
+
+    # Bit-packed mask of the grids whose value >= threshold, computed once for each (threshold, size)
+    def packed_mask(self, threshold, size=None):
+        """
+        :type threshold: float
+        :type size: int
+        :return: np.ndarray[uint8], 8 grids per byte, unpack with np.unpackbits(...)[:size]
+        """
+        size = len(self.array) if size is None else size
+        if (threshold, size) not in self.packed:
+            self.packed[(threshold, size)] = np.packbits(self.mask(threshold, size))
+        return self.packed.get((threshold, size))
+
+    # Dict-like read API
+    def get(self, key, default=None):
+        index = int(key) - 1
+        if 0 <= index < len(self.array) and not np.isnan(self.array[index]):
+            return float(self.array[index])
+        return default
+
+    def keys(self):
+        return (np.flatnonzero(~np.isnan(self.array)) + 1).tolist()
+
+    def values(self):
+        return self.array[~np.isnan(self.array)].astype(float).tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __getitem__(self, key):
+        val = self.get(key)
+        if val is None:
+            raise KeyError(key)
+        return val
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.array)))
+
+    # scalar - Coverage, e.g. Rx = TxPower - loss
+    def __rsub__(self, other):
+        return Coverage(np.float32(other) - self.array)
@@ -1,16 +1,25 @@
 import gaa_graph_coloring as gc
+from gaa_ewt import EdgeWeightTable
 import numpy as np
+import json
+import hashlib
 from typing import Dict, Set, FrozenSet
 
 
 # Coexistence Group
 class CxG:
     # Constructor
-    def __init__(self, uid):
+    def __init__(self, uid, algorithm="welsh_powell"):
         """
         This is the Coexistence Group
+
+        Inputs:
+            uid:        id of the CxG
+            algorithm:  graph coloring algorithm, see gaa_graph_coloring.algorithms
+                :type algorithm: str
         """
         self.id = uid
+        self.algorithm = algorithm  # type: str
         # CBSDs
         self.CBSDs = set()  # type: Set[str]
 
@@ -20,6 +29,9 @@ class CxG:
         # Chromatic Number
         self.chromatic = 0  # type: int
 
+        # Color assignment to start the coloring from (valid for the current edges), None to color from scratch
+        self.warm = None    # type: Dict[str: int]
+
     # CxG Grouping related Methods
     def add_cbsd(self, cbsd_id):
         """
@@ -45,7 +57,7 @@ class CxG:
         Inputs:
             ewt:
                 Edge Weight Table of a given set of CBSDs
-                :type ewt: Dict[FrozenSet[int: int] : float]
+                :type ewt: EdgeWeightTable or Dict[FrozenSet[int: int] : float]
 
             th:
                 Edge Threshold
@@ -56,15 +68,18 @@ class CxG:
             and contains only pairs of CBSDs in this CxGs
             self.ew_table is set to the above subset.
         """
-        self.edges = {key for key, val in ewt.items()
-                      if key.issubset(self.CBSDs) and val > th
-                      }
+        if isinstance(ewt, EdgeWeightTable):
+            self.edges = ewt.get_edge_set(self.CBSDs, th)
+        else:
+            self.edges = {key for key, val in ewt.items()
+                          if key.issubset(self.CBSDs) and val > th
+                          }
 
     def coloring(self):
         """
         Set edges based on the edge weight table of the CXG and the given threshold.
         Then perform graph coloring for all included CBSDs
-        Use Welsh-Powell algorithm
+        Use the algorithm of the CxG (default Welsh-Powell), or reduce the warm start if set (see set_warm_start)
 
         Pre-Condition:
             CBSDs are added, edges is set
@@ -77,7 +92,55 @@ class CxG:
                 chromatic_number, color_assignment   (int, Dict[str: int])
         """
 
-        # Call graph coloring tools with all CBSDs and edges
-        result = gc.coloring(self.CBSDs, self.edges)
+        # Start from the previous coloring if given for all CBSDs, otherwise call graph coloring tools
+        warm = self.get_warm_start()
+        if warm is not None:
+            result = gc.reduce_colors(self.CBSDs, self.edges, warm)
+        else:
+            result = gc.coloring(self.CBSDs, self.edges, self.algorithm)
         self.chromatic = len({val for val in result.values()})
         return self.chromatic, result
+
+    def set_warm_start(self, assignment):
+        """
+        Set the color assignment for coloring() to start from, e.g. of the same CBSDs at a lower edge threshold
+        (a coloring valid with more edges stays valid when edges are removed)
+
+        Inputs:
+            assignment:
+                color of each CBSD (may include other CBSDs), None to color from scratch
+                :type assignment: Dict[str: int]
+
+        Post-Condition:
+            coloring() eliminates the highest color classes of the assignment instead of coloring from scratch
+        """
+        self.warm = None if assignment is None else {key: assignment.get(key, 0) for key in self.CBSDs}
+
+    def get_warm_start(self):
+        """
+        :return: the warm start used by coloring(), None if not set or not given for all CBSDs
+        :type return: Dict[str: int]
+        """
+        if self.warm is not None and all(self.warm.get(key, 0) > 0 for key in self.CBSDs):
+            return self.warm
+        return None
+
+    def get_fingerprint(self):
+        """
+        Canonical fingerprint of the coloring problem: algorithm and the limits of the search
+        (gaa_graph_coloring.exact_max_nodes, exact_max_steps, kempe_max_chain), CxG id, CBSDs,
+        edges (above the threshold) and the warm start (by the order of its colors).
+        Equal fingerprints give equal results of coloring().
+
+        Returns:
+            hex digest
+                :type return: str
+        """
+        warm = self.get_warm_start()
+        if warm is not None:
+            rank = {clr: k for k, clr in enumerate(sorted(set(warm.values())))}
+            warm = sorted((key, rank.get(val)) for key, val in warm.items())
+        limits = [gc.exact_max_nodes, gc.exact_max_steps, gc.kempe_max_chain]
+        content = json.dumps([self.algorithm, limits, str(self.id), sorted(self.CBSDs),
+                              sorted(sorted(key) for key in self.edges), warm])
+        return hashlib.sha1(content).hexdigest()
@@ -116,6 +116,32 @@ def get_per_unit_dbm(ixs, units=1.0):
         return None
 
 
+def get_ix_in_coverage(cbsd, interferers):
+    """
+    Get the interferences (>= min_rx) from the given CBSDs at every grid in the coverage of the given CBSD
+
+    Input:
+            cbsd:           CBSD being interfered
+                :type cbsd: CBSD
+            interferers:    CBSDs interfering
+                :type interferers: List[CBSD]
+
+    Return:
+            interferences in dbm, number of covered grids
+            :type return: Tuple[np.ndarray, int]
+    """
+    size = max([len(cbsd.coverage.array)] + [len(other.coverage.array) for other in interferers])
+    covered_grids = cbsd.coverage.mask(min_rx, size)
+
+    if len(interferers) == 0:
+        return np.array([]), int(np.count_nonzero(covered_grids))
+
+    # Signals of the interferers in the covered grids (one row per interferer)
+    signals = np.vstack([other.coverage.to_array(size)[covered_grids] for other in interferers]).astype(float)
+    with np.errstate(invalid="ignore"):
+        return signals[signals >= min_rx], int(np.count_nonzero(covered_grids))
+
+
 def get_ix_cbsd((cbsd, mysas)):
     """
     Get AIPA Noise for each CBSD with best and worst channel
@@ -130,31 +156,22 @@ def get_ix_cbsd((cbsd, mysas)):
             max_noise, min_noise, accu_noise
     """
 
-    covered_grids = {key for key in cbsd.coverage.keys() if cbsd.coverage.get(key) >= min_rx}
-
     channel_noises = {}
     interference_all_channels = []
 
     # Each Channel
     for ch in cbsd.channels:
-        # Find the interference from all other cbsds that use same channel
-        interference_in_coverage = []
-        for grid in covered_grids:
-            interference_in_grid = [other_cbsd.coverage.get(grid)
-                                    for other_cbsd in mysas.CBSDs
-                                    if (other_cbsd.id != cbsd.id            # exclude self
-                                        and ch in other_cbsd.channels       # Using same channel
-                                        and other_cbsd.coverage.get(grid) >= min_rx)    # Above Threshold
-                                    ]
-
-            # Update list of each interference
-            if len(interference_in_grid) > 0:
-                interference_in_coverage.extend(interference_in_grid)
-                interference_all_channels.extend(interference_in_grid)
+        # Find the interference (above threshold) from all other cbsds that use same channel
+        interferers = [other_cbsd for other_cbsd in mysas.CBSDs
+                       if (other_cbsd.id != cbsd.id             # exclude self
+                           and ch in other_cbsd.channels)       # Using same channel
+                       ]
+        interference_in_coverage, num_covered_grids = get_ix_in_coverage(cbsd, interferers)
+        interference_all_channels.extend(interference_in_coverage)
 
         # if there are interferences over min_rx (-96dbm by default), calculate effective interferences
         # otherwise set channel noise to None
-        channel_noises[ch] = get_per_unit_dbm(interference_in_coverage, len(covered_grids)) \
+        channel_noises[ch] = get_per_unit_dbm(interference_in_coverage, num_covered_grids) \
             if len(interference_in_coverage) > 0 else None
 
     # calculate sum of interference of all channel in each grid
@@ -178,31 +195,22 @@ def get_inter_cxg_ix_cbsd((cbsd, mysas)):
             max_noise, min_noise, accu_noise
     """
 
-    covered_grids = {key for key in cbsd.coverage.keys() if cbsd.coverage.get(key) >= min_rx}
-
     channel_noises = {}
     interference_all_channels = []
 
     # Each Channel
     for ch in cbsd.channels:
-        # Find the interference from all other cbsds that use same channel
-        interference_in_coverage = []
-        for grid in covered_grids:
-            interference_in_grid = [other_cbsd.coverage.get(grid)
-                                    for other_cbsd in mysas.CBSDs
-                                    if (other_cbsd.CxG != cbsd.CxG            # exclude same CxG
-                                        and ch in other_cbsd.channels       # Using same channel
-                                        and other_cbsd.coverage.get(grid) >= min_rx)    # Above Threshold
-                                    ]
-
-            # Update list of each interference
-            if len(interference_in_grid) > 0:
-                interference_in_coverage.extend(interference_in_grid)
-                interference_all_channels.extend(interference_in_grid)
+        # Find the interference (above threshold) from all other cbsds that use same channel
+        interferers = [other_cbsd for other_cbsd in mysas.CBSDs
+                       if (other_cbsd.CxG != cbsd.CxG           # exclude same CxG
+                           and ch in other_cbsd.channels)       # Using same channel
+                       ]
+        interference_in_coverage, num_covered_grids = get_ix_in_coverage(cbsd, interferers)
+        interference_all_channels.extend(interference_in_coverage)
 
         # if there are interferences over min_rx (-96dbm by default), calculate effective interferences
         # otherwise set channel noise to None
-        channel_noises[ch] = get_per_unit_dbm(interference_in_coverage, len(covered_grids)) \
+        channel_noises[ch] = get_per_unit_dbm(interference_in_coverage, num_covered_grids) \
             if len(interference_in_coverage) > 0 else None
 
     # calculate sum of interference of all channel in each grid
@@ -224,9 +232,7 @@ def get_plotdata_ix_per_ch(mysas):
            sorted dbm_per_channel of each cbsd
     """
     avg_dbm_per_ch = [get_per_unit_dbm([get_ix_cbsd((cbsd, mysas))[2]],
-                                       len(cbsd.channels) * len({key for key in cbsd.coverage.keys()
-                                                                 if cbsd.coverage.get(key) >= min_rx
-                                                                 })
+                                       len(cbsd.channels) * np.count_nonzero(cbsd.coverage.mask(min_rx))
                                        )
                       for cbsd in mysas.CBSDs]
 
@@ -247,9 +253,7 @@ def get_plotdata_inter_cxg_ix_per_ch(mysas):
            sorted dbm_per_channel of each cbsd
     """
     avg_dbm_per_ch = [get_per_unit_dbm([get_inter_cxg_ix_cbsd((cbsd, mysas))[2]],
-                                       len(cbsd.channels) * len({key for key in cbsd.coverage.keys()
-                                                                 if cbsd.coverage.get(key) >= min_rx
-                                                                 })
+                                       len(cbsd.channels) * np.count_nonzero(cbsd.coverage.mask(min_rx))
                                        )
                       for cbsd in mysas.CBSDs]
 
@@ -298,6 +302,39 @@ def get_plotdata_interference(mysas):
     result = {"max_noises": max_noises, "min_noises": min_noises, "overall_noises": overall_effective_interference_dbm}
     return result
 
+def get_plotdata_point_interference(mysas):
+    """
+    Output co-channel Interference at the location of each CBSD (Point Coordination) from given SAS,
+    read from the link loss matrix of the SAS (no propagation call)
+
+    Input:
+            mysas:  SAS object
+                :type mysas: SAS
+
+    Pre-Condition:
+            the link loss matrix of the SAS is computed (create_ew_table with point coordination),
+            links not in the matrix are not counted
+
+    Return:
+            CDF Plot Data for interference
+    """
+    cbsds = {cbsd.id: cbsd for cbsd in mysas.CBSDs}
+
+    noises = []
+    for cbsd in mysas.CBSDs:
+        # Interference from every CBSD in range sharing a channel, above min_rx
+        ixs = [cbsds[other_id].TxPower - mysas.link_loss.get(other_id, cbsd.id)
+               for other_id in mysas.link_loss.get_neighbors(cbsd.id)
+               if other_id in cbsds and len(cbsds[other_id].channels & cbsd.channels) > 0]
+        ixs = [x for x in ixs if x >= min_rx]
+        noises.append(get_per_unit_dbm(ixs) if len(ixs) > 0 else None)
+
+    noises.sort()
+
+    result = {"noises": noises}
+    return result
+
+
 def get_plotdata_inter_cxg_interference(mysas):
     """
     Output InterCxG Interference data of all CBSDs from given SAS
@@ -342,33 +379,34 @@ def get_plotdata_sir(mysas):
     """
     Data = {}
 
+    grid_ids = list(mysas.grids.keys())
+    positions = np.array([int(grid_id) - 1 for grid_id in grid_ids], dtype=int)
+    size = max([len(cbsd.coverage.array) for cbsd in mysas.CBSDs] + [positions.max() + 1 if len(positions) else 0])
+
     # Each Channel:
     for ch in mysas.channels:
         SIR = {}    # Ratio of Primary Signal vs Interference
-        for grid_id in mysas.grids.keys():
-            # Find CBSD Signals to the grid at given channel
-            signals = [cbsd.coverage.get(grid_id)
-                       for cbsd in mysas.CBSDs
-                       if ch in cbsd.channels
-                       ]
-            # Filter only signals above min_rx
-            signals = [x for x in signals if x is not None and x >= min_rx]
-
-            # Check number of signals
-            if len(signals) > 0:
-                primary_sig = max(signals)
-                signals.remove(primary_sig)
-
-                # if there are signals other than primary
-                if len(signals) > 0:
-                    # calculate the noise
-                    noise = np.log10(sum([10**(x/10) for x in signals]))*10
-                    sir = primary_sig - noise
-                else:
-                    sir = max_sir_value
 
-                # Record the sir
-                SIR[grid_id] = {"sir": min(sir, max_sir_value), "coordinate": mysas.grids.get(grid_id)}
+        # Find CBSD Signals to each grid at given channel (one row per CBSD), only signals above min_rx
+        cbsds_in_ch = [cbsd for cbsd in mysas.CBSDs if ch in cbsd.channels]
+        if len(cbsds_in_ch) == 0:
+            Data[ch] = SIR
+            continue
+        signals = np.vstack([cbsd.coverage.to_array(size)[positions] for cbsd in cbsds_in_ch]).astype(float)
+        with np.errstate(invalid="ignore"):
+            signals[~(signals >= min_rx)] = -np.inf
+
+        # Primary signal is the strongest one, the others are the interference
+        primary = np.argmax(signals, axis=0)
+        primary_sig = signals[primary, np.arange(len(grid_ids))]
+        signals[primary, np.arange(len(grid_ids))] = -np.inf
+        with np.errstate(divide="ignore"):
+            noise = np.log10(np.sum(np.power(10, signals / 10), axis=0)) * 10
+            sir = np.where(np.isfinite(noise), primary_sig - noise, max_sir_value)
+
+        # Record the sir of each grid with signals
+        for i in np.flatnonzero(np.isfinite(primary_sig)):
+            SIR[grid_ids[i]] = {"sir": min(float(sir[i]), max_sir_value), "coordinate": mysas.grids.get(grid_ids[i])}
 
         # Record SIR for current channel
         Data[ch] = SIR
@@ -421,18 +459,26 @@ def get_inter_cxg_ix(mysas):
     cxg_ids = {cbsd.CxG for cbsd in mysas.CBSDs}
     inter_cxg_ixs = {}
 
+    # All edges between the CBSDs, with the CxG and channels of both ends
+    cbsds = {cbsd.id: cbsd for cbsd in mysas.CBSDs}
+    ids = mysas.ew_table.ids
+    rows, cols, ews = mysas.ew_table.get_edges(cbsds.keys())
+    cxg_rows = np.array([cbsds.get(ids[i]).CxG for i in rows])
+    cxg_cols = np.array([cbsds.get(ids[j]).CxG for j in cols])
+    ews = ews.astype(float)
+
+    # edges whose both ends are using each channel
+    in_ch = {ch: np.array([ch in cbsds.get(ids[i]).channels and ch in cbsds.get(ids[j]).channels
+                           for i, j in zip(rows, cols)], dtype=bool)
+             for ch in chs}
+
     for cxg_id in cxg_ids:
         inter_cxg_ixs_ch = {}
+        # edges of cbsds in this cxg with cbsds in other cxg
+        inter_cxg = (cxg_rows == cxg_id) != (cxg_cols == cxg_id)
         for ch in chs:
-            # find all cbsd pairs for cbsds in this cxg with cbsds in other cxg using current channel
-            cbsds_in_cxg = {cbsd for cbsd in mysas.CBSDs if cbsd.CxG == cxg_id and ch in cbsd.channels}
-            cbsds_out_cxg = {cbsd for cbsd in mysas.CBSDs if cbsd.CxG != cxg_id and ch in cbsd.channels}
-            pairs = [frozenset((x.id, y.id)) for x in cbsds_in_cxg for y in cbsds_out_cxg]
-
             # find the sum of the edge weights
-            inter_cxg_ixs_ch[str(ch)] = sum(
-                [mysas.ew_table.get(pair) for pair in set(pairs).intersection(mysas.ew_table.keys())]
-            )
+            inter_cxg_ixs_ch[str(ch)] = float(np.sum(ews[inter_cxg & in_ch.get(ch)]))
         inter_cxg_ixs[str(cxg_id)] = inter_cxg_ixs_ch
 
     return inter_cxg_ixs
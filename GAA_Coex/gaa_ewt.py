@@ -0,0 +1,381 @@
+import os
+import numpy as np
+from gaa_component import ComponentTree
+from typing import Dict, List, Set, FrozenSet, Tuple
+
+_missing = object()     # default marker of pop()
+
+
+# Text of an edge weight in the .ewt and journal files
+def format_ew(ew):
+    """
+    :type ew: float
+    :return: the shortest text read back as the same float32 weight (e.g. "0.3", not "0.30000001192092896")
+    :type return: str
+    """
+    return np.format_float_positional(np.float32(ew), trim="0")
+
+
+# Edge Weight Table
+class EdgeWeightTable(object):
+    """
+    Symmetric sparse matrix of the edge weights between CBSDs.
+
+    CBSD ids are mapped to integer indexes (in the order they are first seen), each edge is stored once
+    in the upper triangle as arrays (row int32, col int32, weight float32) sorted by (row, col).
+    Only edges with weight > 0 are kept. A symmetric CSR view is built lazily for neighbor lookups.
+
+    Provides the API of the dict {frozenset((id1, id2)): ew} used before (get, [], in, pop, keys, values, items),
+    single edges set or removed through that API are buffered and merged at the next vectorized access.
+    """
+    def __init__(self):
+        self.ids = []       # type: List[str]           # CBSD id of each index
+        self.index = {}     # type: Dict[str: int]      # index of each CBSD id
+
+        self.rows = np.zeros(0, dtype=np.int32)         # type: np.ndarray  # smaller index of each edge
+        self.cols = np.zeros(0, dtype=np.int32)         # type: np.ndarray  # larger index of each edge
+        self.weights = np.zeros(0, dtype=np.float32)    # type: np.ndarray  # edge weight of each edge
+
+        self.pending = {}   # type: Dict[Tuple[int, int]: float]  # edges set (or removed with 0) not merged yet
+        self.csr = None     # type: Tuple[np.ndarray, np.ndarray, np.ndarray]    # symmetric CSR, built lazily
+
+        self.version = 0    # type: int     # increased on every change of the CBSDs or edges
+        self.tree = None    # type: ComponentTree   # component tree of the version self.tree_version, built lazily
+        self.tree_version = -1  # type: int
+
+    # Create the table from (id, id, ew)
+    @staticmethod
+    def from_edges(ids1, ids2, ews):
+        """
+        Input:
+            ids1, ids2:     CBSD ids of both ends of each edge
+                :type ids1: List[str]
+                :type ids2: List[str]
+
+            ews:            edge weight of each edge, edges with ew <= 0 are dropped
+                :type ews: List[float]
+
+        Returns:
+            EdgeWeightTable
+        """
+        table = EdgeWeightTable()
+        rows = np.array([table.add_id(cbsd_id) for cbsd_id in ids1], dtype=np.int32)
+        cols = np.array([table.add_id(cbsd_id) for cbsd_id in ids2], dtype=np.int32)
+        table.set_edges(rows, cols, np.asarray(ews, dtype=np.float32))
+        return table
+
+    # Get the index of a CBSD id, a new index is assigned for a new id
+    def add_id(self, cbsd_id):
+        if cbsd_id not in self.index:
+            self.index[cbsd_id] = len(self.ids)
+            self.ids.append(cbsd_id)
+            self.version += 1
+        return self.index[cbsd_id]
+
+    # Get the indexes of CBSD ids
+    def get_index(self, cbsd_ids):
+        """
+        :type cbsd_ids: Iterable[str]
+        :return: index of each id, -1 for the ids not in the table
+        :type return: np.ndarray[int]
+        """
+        return np.array([self.index.get(cbsd_id, -1) for cbsd_id in cbsd_ids], dtype=int)
+
+    # Get the mask of the indexes of CBSD ids
+    def get_mask(self, cbsd_ids):
+        """
+        :type cbsd_ids: Iterable[str]
+        :return: mask over all indexes, True for the given ids
+        :type return: np.ndarray[bool]
+        """
+        mask = np.zeros(len(self.ids), dtype=bool)
+        index = self.get_index(cbsd_ids)
+        mask[index[index >= 0]] = True
+        return mask
+
+    # Set edges in bulk (replacing existing ones)
+    def set_edges(self, rows, cols, ews):
+        """
+        Input:
+            rows, cols:     indexes of both ends of each edge
+                :type rows: np.ndarray[int]
+                :type cols: np.ndarray[int]
+
+            ews:            edge weight of each edge, edges with ew <= 0 are removed
+                :type ews: np.ndarray[float]
+        """
+        self.merge()
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+        self.merge_arrays(np.concatenate((self.rows, rows)),
+                          np.concatenate((self.cols, cols)),
+                          np.concatenate((self.weights, np.asarray(ews, dtype=np.float32))))
+
+    # Merge the buffered edges into the arrays
+    def merge(self):
+        if len(self.pending) == 0:
+            return
+        keys = np.array(list(self.pending.keys()), dtype=np.int32).reshape(-1, 2)
+        ews = np.array(list(self.pending.values()), dtype=np.float32)
+        self.pending = {}
+        self.merge_arrays(np.concatenate((self.rows, keys[:, 0])),
+                          np.concatenate((self.cols, keys[:, 1])),
+                          np.concatenate((self.weights, ews)))
+
+    # Sort edges, the last one of duplicated edges is kept, edges with ew <= 0 are dropped
+    def merge_arrays(self, rows, cols, ews):
+        codes = rows.astype(np.int64) * max(len(self.ids), 1) + cols
+        _, last = np.unique(codes[::-1], return_index=True)
+        last = len(codes) - 1 - last
+        keep = last[ews[last] > 0]
+        self.rows = rows[keep].astype(np.int32)
+        self.cols = cols[keep].astype(np.int32)
+        self.weights = ews[keep].astype(np.float32)
+        self.csr = None
+        self.version += 1
+
+    # Get the edges (upper triangle) as arrays
+    def get_edges(self, cbsd_ids=None, th=None):
+        """
+        Input:
+            cbsd_ids:   only the edges between the given CBSDs, None for all
+                :type cbsd_ids: Iterable[str]
+
+            th:         only the edges with ew > th, None for all
+                :type th: float
+
+        Returns:
+            rows, cols, ews
+            :type return: Tuple[np.ndarray[int], np.ndarray[int], np.ndarray[float]]
+        """
+        self.merge()
+        selected = np.ones(len(self.weights), dtype=bool)
+        if th is not None:
+            selected &= self.weights > np.float32(th)
+        if cbsd_ids is not None:
+            mask = self.get_mask(cbsd_ids)
+            selected &= mask[self.rows] & mask[self.cols]
+        return self.rows[selected], self.cols[selected], self.weights[selected]
+
+    # Get the edges as a set of pairs of CBSD ids
+    def get_edge_set(self, cbsd_ids=None, th=None):
+        """
+        Same selection as get_edges()
+
+        :return: Set[FrozenSet[str, str]]
+        """
+        rows, cols, _ = self.get_edges(cbsd_ids, th)
+        return {frozenset((self.ids[i], self.ids[j])) for i, j in zip(rows, cols)}
+
+    # Get the symmetric CSR matrix
+    def get_csr(self):
+        """
+        :return: indptr, indices, data (both directions of each edge)
+        """
+        self.merge()
+        if self.csr is None:
+            rows = np.concatenate((self.rows, self.cols))
+            cols = np.concatenate((self.cols, self.rows))
+            data = np.concatenate((self.weights, self.weights))
+            order = np.lexsort((cols, rows))
+            indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(self.ids)))
+            self.csr = (indptr, cols[order].astype(np.int32), data[order])
+        return self.csr
+
+    # Get the component tree of the current edges
+    def get_tree(self):
+        """
+        Built once for each version of the table, answers the connected sets at any edge threshold
+
+        :return: ComponentTree
+        """
+        self.merge()
+        if self.tree is None or self.tree_version != self.version:
+            self.tree = ComponentTree(self.ids, self.rows, self.cols, self.weights)
+            self.tree_version = self.version
+        return self.tree
+
+    # Get the neighbors of a CBSD
+    def get_neighbors(self, cbsd_id, th=None):
+        """
+        :type cbsd_id: str
+        :type th: float
+        :return: ids of the CBSDs having an edge (ew > th) with the given CBSD
+        :type return: Set[str]
+        """
+        if cbsd_id not in self.index:
+            return set()
+        indptr, indices, data = self.get_csr()
+        i = self.index[cbsd_id]
+        neighbors = indices[indptr[i]: indptr[i + 1]]
+        if th is not None:
+            neighbors = neighbors[data[indptr[i]: indptr[i + 1]] > np.float32(th)]
+        return {self.ids[j] for j in neighbors}
+
+    # Get the key (index pair) of a pair of CBSD ids
+    def get_key(self, pair, create=False):
+        """
+        :type pair: FrozenSet[str, str]
+        :return: (smaller index, larger index), None if any id is not in the table
+        """
+        id1, id2 = tuple(pair)
+        if create:
+            i, j = self.add_id(id1), self.add_id(id2)
+        else:
+            i, j = self.index.get(id1), self.index.get(id2)
+            if i is None or j is None:
+                return None
+        return min(i, j), max(i, j)
+
+    # Dict-like API, keyed by frozenset((id1, id2))
+    def get(self, pair, default=None):
+        key = self.get_key(pair)
+        if key is None:
+            return default
+        if key in self.pending:
+            return float(self.pending.get(key)) if self.pending.get(key) > 0 else default
+
+        # Binary search in the arrays sorted by (row, col)
+        start, stop = np.searchsorted(self.rows, key[0], side="left"), np.searchsorted(self.rows, key[0], side="right")
+        position = start + np.searchsorted(self.cols[start:stop], key[1])
+        if position < stop and self.cols[position] == key[1]:
+            return float(self.weights[position])
+        return default
+
+    def __getitem__(self, pair):
+        val = self.get(pair)
+        if val is None:
+            raise KeyError(pair)
+        return val
+
+    def __setitem__(self, pair, ew):
+        self.pending[self.get_key(pair, create=True)] = ew
+        self.csr = None
+        self.version += 1
+
+    def pop(self, pair, default=_missing):
+        val = self.get(pair)
+        if val is None:
+            if default is _missing:
+                raise KeyError(pair)
+            return default
+        self.pending[self.get_key(pair)] = 0.0
+        self.csr = None
+        self.version += 1
+        return val
+
+    def __contains__(self, pair):
+        return self.get(pair) is not None
+
+    def __len__(self):
+        self.merge()
+        return len(self.weights)
+
+    def keys(self):
+        self.merge()
+        return [frozenset((self.ids[i], self.ids[j])) for i, j in zip(self.rows, self.cols)]
+
+    def values(self):
+        self.merge()
+        return self.weights.astype(float).tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+# Journal of an Edge Weight Table computed chunk by chunk
+class EdgeWeightJournal(object):
+    """
+    Append-only file of the edges of finished chunks, for resuming an interrupted Edge Weight Table computation.
+
+    Same line format as the .ewt file ("id1, id2, ew"), each chunk is followed by a commit marker "# chunk n".
+    The first line records a fingerprint of the inputs, a journal of other inputs is discarded.
+    Lines after the last commit marker (an interrupted chunk) are dropped when the journal is opened again.
+    """
+    def __init__(self, filename, fingerprint):
+        """
+        Input:
+            filename:       the journal file (.ewj), created if not exists
+                :type filename: str
+
+            fingerprint:    fingerprint of the inputs (CBSDs, propagation model, ...) of the computation
+                :type fingerprint: str
+
+        Post-Condition:
+            self.chunks is the number of committed chunks, self.table holds their edges
+        """
+        self.filename = filename
+        self.fingerprint = fingerprint
+        self.chunks = 0                     # type: int     # number of committed chunks
+        self.table = EdgeWeightTable()      # type: EdgeWeightTable     # edges of the committed chunks
+
+        offset = self.read() if os.path.exists(filename) else None
+        if offset is None:
+            # New journal
+            with open(filename, "w") as f:
+                f.write("# ewj " + fingerprint + "\n")
+        else:
+            # Drop the interrupted chunk
+            with open(filename, "r+") as f:
+                f.truncate(offset)
+        self.file = open(filename, "a")
+
+    # Read the committed chunks
+    def read(self):
+        """
+        :return: file offset after the last commit marker, None if the journal is not for the same inputs
+        """
+        ids1, ids2, ews = [], [], []
+        pending = []
+        offset = None
+        with open(self.filename) as f:
+            header = f.readline()
+            if header.rstrip() != "# ewj " + self.fingerprint:
+                return None
+            offset = f.tell()
+            for line in iter(f.readline, ""):
+                if not line.endswith("\n"):
+                    break   # partial line
+                if line.startswith("# chunk "):
+                    for id1, id2, ew in pending:
+                        ids1.append(id1)
+                        ids2.append(id2)
+                        ews.append(float(ew))
+                    pending = []
+                    self.chunks = int(line.split()[2]) + 1
+                    offset = f.tell()
+                else:
+                    pending.append(line.rstrip().split(", "))
+        self.table = EdgeWeightTable.from_edges(ids1, ids2, ews)
+        return offset
+
+    # Commit a finished chunk
+    def append(self, chunk, ids1, ids2, ews):
+        """
+        Input:
+            chunk:          number of the chunk, equals to self.chunks
+                :type chunk: int
+
+            ids1, ids2, ews:    edges of the chunk (ew > 0)
+        """
+        content = "".join([str(id1) + ", " + str(id2) + ", " + format_ew(ew) + "\n"
+                           for id1, id2, ew in zip(ids1, ids2, ews)])
+        self.file.write(content + "# chunk " + str(chunk) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.chunks = chunk + 1
+
+    # Close the journal, and remove the file if finished
+    def close(self, remove=False):
+        self.file.close()
+        if remove:
+            os.remove(self.filename)
@@ -1,9 +1,17 @@
 # Graph Coloring algorithms
 import networkx as nx
-from typing import Dict, FrozenSet, Set
+import heapq
+import constant
+import numpy as np
+from itertools import chain
+from typing import Dict, FrozenSet, List, Set, Tuple
 
+exact_max_nodes = constant.exact_max_nodes		# graphs above this number of nodes are not colored exactly
+exact_max_steps = constant.exact_max_steps		# maximum number of search steps of the exact coloring
+kempe_max_chain = constant.kempe_max_chain		# maximum number of nodes swapped by an incremental recoloring
 
-def coloring(vertices, edges):
+
+def coloring(vertices, edges, algorithm="welsh_powell"):
 	"""
 	This is the handler for choosing coloring algorithm
 
@@ -14,17 +22,53 @@ def coloring(vertices, edges):
 		edges:	all edges in the graph
 			:type edges: Set[FrozenSet[str, str]]
 
+		algorithm:	name of the coloring algorithm, one of the keys of algorithms
+			:type algorithm: str
+
 	Returns:
 		Color Assignment in form of Dictionary, node as key and color as val.
 			:type :return: Dict[str: int]
 	"""
-	# Call method to create a graph
-	G = create_graph(vertices, edges)
+	# Create the adjacency arrays of the graph
+	nodes, indptr, indices = create_csr(vertices, edges)
+
+	# Perform Graph Coloring by applying the selected algorithm
+	colors = algorithms[algorithm](indptr, indices)		# type: List[int]
+
+	return dict(zip(nodes, colors))
+
+
+def create_csr(vertices, edges):
+	"""
+	Method to create the adjacency arrays (CSR) of the graph from given vertices and edges
+
+	Inputs:
+		vertices: all nodes in the graph
+			:type vertices: Set[str]
+
+		edges:	all edges in the graph
+			:type edges: Set[FrozenSet[str, str]]
 
-	# Perform Graph Coloring by applying welsh powell algorithm
-	result = welsh_powell(G)		# type: Dict[str: int]
+	Returns:
+		nodes, indptr, indices
+			nodes:		all nodes (from vertices and edges), sorted; the position is the index of the node
+			indptr:		neighbors of node i are indices[indptr[i]: indptr[i + 1]]
+			indices:	neighbor indexes
+			:type :return: Tuple[List[str], np.ndarray[int], np.ndarray[int]]
+	"""
+	# Index of the nodes (sorted) at both ends of each edge
+	ends = list(chain.from_iterable(edges))
+	nodes = sorted(set(vertices).union(ends))
+	index = {node: i for i, node in enumerate(nodes)}
+	ends = np.array([index[node] for node in ends], dtype=np.int64).reshape(-1, 2)
 
-	return result
+	# Both directions of each edge, grouped by the first end
+	rows = np.concatenate((ends[:, 0], ends[:, 1]))
+	cols = np.concatenate((ends[:, 1], ends[:, 0]))
+	order = np.lexsort((cols, rows))
+	indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+	indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(nodes)))
+	return nodes, indptr, cols[order]
 
 
 def create_graph(vertices, edges):
@@ -70,28 +114,404 @@ def welsh_powell(G):
 		Color Assignment in form of Dictionary, node as key and color as val.
 			:type :return: Dict[str: int]
 	"""
+	nodes, indptr, indices = create_csr(G.nodes(), {frozenset(e) for e in G.edges()})
+	return dict(zip(nodes, welsh_powell_csr(indptr, indices)))
 
+
+# implementation of welsh_powell algorithm on adjacency arrays
+def welsh_powell_csr(indptr, indices):
+	"""
+	Nodes are colored greedily in descending order of degree (ties by index)
+
+	Input:
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+			:type indptr:	np.ndarray[int]
+			:type indices:	np.ndarray[int]
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
 	# Sort nodes based on number of neighbors
-	node_list = sorted(G.nodes(), key=lambda x: G.neighbors(x))
-
-	# Assign first node to first color (0)
-	col_val = {node_list[0]: 0}  # dictionary to store the color assignment
-
-	# Assign colors to remaining nodes
-	for node in node_list[1:]:
-		# Initialize available colors list
-		available = [True] * len(G.nodes())
-
-		# Colors are not available if used by adjacent nodes
-		for adj_node in G.neighbors(node):
-			if adj_node in col_val.keys():
-				col = col_val[adj_node]
-				available[col] = False
-
-		# Find smallest available color to assign to the current node
-		for clr in range(len(available)):
-			if available[clr]:		# True
-				col_val[node] = clr
+	degrees = np.diff(indptr)
+	node_list = np.argsort(-degrees, kind="mergesort").tolist()
+
+	return greedy_csr(node_list, indptr, indices)
+
+
+# Greedy coloring in a given order
+def greedy_csr(node_list, indptr, indices):
+	"""
+	Color nodes in the given order, each with the smallest color not used by its colored neighbors.
+	Colors used by the neighbors of each node are kept as a bitset.
+
+	Input:
+		node_list:	order of the nodes
+			:type node_list: List[int]
+
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
+	num_nodes = len(indptr) - 1
+	colors = [-1] * num_nodes
+	forbidden = [0] * num_nodes		# bitset of the colors used by the neighbors of each node
+	starts = indptr.tolist()
+	neighbors = indices.tolist()
+	for node in node_list:
+		# Find smallest available color (lowest zero bit) to assign to the current node
+		used = forbidden[node]
+		clr = (~used & (used + 1)).bit_length() - 1
+		colors[node] = clr
+
+		# The color is not available for adjacent nodes
+		bit = 1 << clr
+		for adj_node in neighbors[starts[node]: starts[node + 1]]:
+			forbidden[adj_node] |= bit
+
+	return colors
+
+
+# implementation of DSATUR algorithm on adjacency arrays
+def dsatur_csr(indptr, indices):
+	"""
+	Repeatedly color the uncolored node with the most distinct colors among its neighbors (saturation),
+	ties by degree then index, with the smallest available color
+
+	Input:
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
+	num_nodes = len(indptr) - 1
+	starts = indptr.tolist()
+	neighbors = indices.tolist()
+	degrees = np.diff(indptr).tolist()
+
+	colors = [-1] * num_nodes
+	forbidden = [0] * num_nodes		# bitset of the colors used by the neighbors of each node
+	saturation = [0] * num_nodes
+
+	# Priority queue of (-saturation, -degree, node), outdated entries are skipped when popped
+	queue = [(0, -degrees[node], node) for node in range(num_nodes)]
+	heapq.heapify(queue)
+	while len(queue) > 0:
+		sat, _, node = heapq.heappop(queue)
+		if colors[node] >= 0 or -sat != saturation[node]:
+			continue
+
+		used = forbidden[node]
+		clr = (~used & (used + 1)).bit_length() - 1
+		colors[node] = clr
+
+		bit = 1 << clr
+		for adj_node in neighbors[starts[node]: starts[node + 1]]:
+			if colors[adj_node] < 0 and not forbidden[adj_node] & bit:
+				forbidden[adj_node] |= bit
+				saturation[adj_node] += 1
+				heapq.heappush(queue, (-saturation[adj_node], -degrees[adj_node], adj_node))
+
+	return colors
+
+
+# implementation of recursive largest first (RLF) algorithm on adjacency arrays
+def rlf_csr(indptr, indices):
+	"""
+	Build one color class at a time: start from the uncolored node with the most uncolored neighbors,
+	then repeatedly add the candidate (not adjacent to the class) with the most neighbors already excluded
+	from the class, ties by the fewest neighbors among the candidates, then index
+
+	Input:
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
+	num_nodes = len(indptr) - 1
+	starts = indptr.tolist()
+	neighbors = indices.tolist()
+
+	colors = [-1] * num_nodes
+	uncolored = set(range(num_nodes))
+	degrees = np.diff(indptr).tolist()		# number of uncolored neighbors of each node
+	clr = 0
+	while len(uncolored) > 0:
+		candidates = set(uncolored)		# uncolored nodes that may join the current class
+		in_candidates = list(degrees)		# number of neighbors among the candidates
+		in_excluded = [0] * num_nodes		# number of neighbors excluded from the current class
+
+		node = min(candidates, key=lambda x: (-degrees[x], x))
+		while node is not None:
+			colors[node] = clr
+			uncolored.discard(node)
+			candidates.discard(node)
+
+			# The node and its candidate neighbors leave the candidates, the neighbors are excluded
+			excluded = [adj for adj in neighbors[starts[node]: starts[node + 1]] if adj in candidates]
+			candidates.difference_update(excluded)
+			for x in [node] + excluded:
+				for adj in neighbors[starts[x]: starts[x + 1]]:
+					in_candidates[adj] -= 1
+			for x in excluded:
+				for adj in neighbors[starts[x]: starts[x + 1]]:
+					in_excluded[adj] += 1
+
+			# Uncolored degrees after coloring the node
+			for adj in neighbors[starts[node]: starts[node + 1]]:
+				degrees[adj] -= 1
+
+			node = min(candidates, key=lambda x: (-in_excluded[x], in_candidates[x], x)) if len(candidates) > 0 else None
+		clr += 1
+
+	return colors
+
+
+# implementation of smallest-last algorithm on adjacency arrays
+def smallest_last_csr(indptr, indices):
+	"""
+	Order the nodes by repeatedly removing a node of the smallest remaining degree (ties by index),
+	then color greedily in the reverse order of removal
+
+	Input:
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
+	num_nodes = len(indptr) - 1
+	starts = indptr.tolist()
+	neighbors = indices.tolist()
+	degrees = np.diff(indptr).tolist()
+
+	# Buckets of the remaining nodes by remaining degree
+	buckets = [set() for _ in range(max(degrees) + 1 if num_nodes > 0 else 0)]
+	for node in range(num_nodes):
+		buckets[degrees[node]].add(node)
+
+	removed = [False] * num_nodes
+	order = []
+	lowest = 0
+	for _ in range(num_nodes):
+		while len(buckets[lowest]) == 0:
+			lowest += 1
+		node = min(buckets[lowest])
+		buckets[lowest].discard(node)
+		removed[node] = True
+		order.append(node)
+		for adj in neighbors[starts[node]: starts[node + 1]]:
+			if not removed[adj]:
+				buckets[degrees[adj]].discard(adj)
+				degrees[adj] -= 1
+				buckets[degrees[adj]].add(adj)
+		lowest = max(lowest - 1, 0)
+
+	return greedy_csr(order[::-1], indptr, indices)
+
+
+# implementation of exact coloring (branch and bound) on adjacency arrays
+def exact_csr(indptr, indices):
+	"""
+	Minimum coloring by DSATUR branch and bound for graphs up to exact_max_nodes nodes, starting from the
+	DSATUR coloring as the upper bound and a greedy clique as the lower bound.
+	Larger graphs, or a search over exact_max_steps steps, return the best coloring found (DSATUR at least).
+
+	Input:
+		indptr, indices:	adjacency arrays (CSR) of the graph, see create_csr()
+
+	Returns:
+		Color of each node (starting from 0)
+			:type :return: List[int]
+	"""
+	num_nodes = len(indptr) - 1
+	best = dsatur_csr(indptr, indices)
+	if num_nodes > exact_max_nodes or num_nodes == 0:
+		return best
+
+	starts = indptr.tolist()
+	neighbors = [set(indices[starts[node]: starts[node + 1]].tolist()) for node in range(num_nodes)]
+	degrees = np.diff(indptr).tolist()
+
+	# Lower bound: a clique grown greedily from the node of the highest degree
+	clique = []
+	for node in sorted(range(num_nodes), key=lambda x: (-degrees[x], x)):
+		if all(node in neighbors[x] for x in clique):
+			clique.append(node)
+
+	state = {"best": list(best), "num_colors": max(best) + 1, "steps": 0}
+	colors = [-1] * num_nodes
+	counts = [[0] * num_nodes for _ in range(num_nodes)]	# number of neighbors of each node with each color
+	saturation = [0] * num_nodes
+
+	def search(num_colored, num_used):
+		if state["num_colors"] <= len(clique) or state["steps"] >= exact_max_steps:
+			return
+		state["steps"] += 1
+		if num_colored == num_nodes:
+			state["best"] = list(colors)
+			state["num_colors"] = num_used
+			return
+
+		# Branch on the uncolored node of the highest saturation (ties by degree, then index)
+		node = min([x for x in range(num_nodes) if colors[x] < 0], key=lambda x: (-saturation[x], -degrees[x], x))
+		for clr in range(min(num_used + 1, state["num_colors"] - 1)):
+			if clr >= state["num_colors"] - 1:
 				break
+			if counts[node][clr] > 0:
+				continue
+			colors[node] = clr
+			for adj in neighbors[node]:
+				if counts[adj][clr] == 0:
+					saturation[adj] += 1
+				counts[adj][clr] += 1
+			search(num_colored + 1, max(num_used, clr + 1))
+			for adj in neighbors[node]:
+				counts[adj][clr] -= 1
+				if counts[adj][clr] == 0:
+					saturation[adj] -= 1
+			colors[node] = -1
+
+	search(0, 0)
+	return state["best"]
+
+
+# Color a new node keeping the colors of the others, with Kempe chain swaps
+def kempe_insert(node, colors, palette, get_neighbors, max_chain=None):
+	"""
+	Give a new node a color of the palette: a color not used by its neighbors, otherwise swap the two colors
+	(a, b) of a Kempe chain (the nodes colored a or b connected to the neighbors colored a) to free color a.
+	Chains larger than max_chain nodes are not swapped, so the repair stays local.
+
+	Inputs:
+		node:	the new node (not in colors)
+			:type node: str
+
+		colors:	valid coloring of the other nodes, updated in place if succeeded
+			:type colors: Dict[str: int]
+
+		palette:	colors allowed for the nodes
+			:type palette: List[int]
+
+		get_neighbors:	function returning the neighbors of a node
+			:type get_neighbors: Callable[[str], Set[str]]
+
+		max_chain:	maximum number of nodes of a Kempe chain, default kempe_max_chain
+			:type max_chain: int
+
+	Returns:
+		True if the node is colored, False if the local repair failed (colors unchanged)
+			:type :return: bool
+	"""
+	max_chain = kempe_max_chain if max_chain is None else max_chain
+	neighbors = get_neighbors(node)
+	used = {colors.get(x) for x in neighbors if x in colors}
+
+	# A free color
+	for clr in palette:
+		if clr not in used:
+			colors[node] = clr
+			return True
+
+	# Kempe chain swap
+	for a in palette:
+		starts = [x for x in neighbors if colors.get(x) == a]
+		for b in palette:
+			if b == a:
+				continue
+			chain = get_kempe_chain(starts, (a, b), colors, get_neighbors, max_chain)
+			if chain is None or any(colors.get(x) == b for x in neighbors if x in chain):
+				continue	# too large, or the swap takes color a to another neighbor
+			for x in chain:
+				colors[x] = b if colors.get(x) == a else a
+			colors[node] = a
+			return True
+
+	return False
+
+
+# Find the Kempe chain of two colors from given nodes
+def get_kempe_chain(starts, (a, b), colors, get_neighbors, max_chain):
+	"""
+	:return: nodes colored a or b connected to the starts by such nodes, None if more than max_chain nodes
+	:type :return: Set[str]
+	"""
+	chain = set(starts)
+	frontier = list(starts)
+	while len(frontier) > 0:
+		if len(chain) > max_chain:
+			return None
+		x = frontier.pop()
+		for y in get_neighbors(x):
+			if y not in chain and colors.get(y) in (a, b):
+				chain.add(y)
+				frontier.append(y)
+	return chain if len(chain) <= max_chain else None
+
+
+# Reduce the colors of a valid coloring
+def reduce_colors(vertices, edges, assignment, max_chain=None):
+	"""
+	Start from a valid coloring (e.g. of the graph with more edges at a lower edge threshold) and eliminate the
+	highest color classes: each member of the class is moved to a lower color, free or freed by a Kempe chain swap.
+	Stops at the first node that cannot be moved, the moves already made are kept (the coloring stays valid).
+
+	Inputs:
+		vertices: all nodes in the graph
+			:type vertices: Set[str]
+
+		edges:	all edges in the graph, the assignment is a valid coloring of them
+			:type edges: Set[FrozenSet[str, str]]
+
+		assignment:	color of each node
+			:type assignment: Dict[str: int]
+
+		max_chain:	maximum number of nodes of a Kempe chain, default kempe_max_chain
+
+	Returns:
+		Color Assignment in form of Dictionary, node as key and color as val (starting from 0, as coloring())
+			:type :return: Dict[str: int]
+	"""
+	nodes, indptr, indices = create_csr(vertices, edges)
+	indptr, indices = indptr.tolist(), indices.tolist()
+
+	def get_neighbors(x):
+		return indices[indptr[x]: indptr[x + 1]]
+
+	# Renumber the colors 1..k, keeping their order
+	palette = sorted({assignment.get(x) for x in nodes})
+	renumber = {clr: k + 1 for k, clr in enumerate(palette)}
+	colors = {i: renumber.get(assignment.get(x)) for i, x in enumerate(nodes)}
+
+	# Eliminate the highest color classes (swaps change the lower classes, each class is taken from the current colors)
+	top = len(palette)
+	while top > 1:
+		lower = range(1, top)
+		eliminated = True
+		for i in [i for i, clr in colors.items() if clr == top]:
+			del colors[i]
+			if not kempe_insert(i, colors, lower, get_neighbors, max_chain):
+				colors[i] = top
+				eliminated = False
+				break
+		if not eliminated:
+			break
+		top -= 1
+
+	# Renumber again, a swap may have emptied a lower class
+	renumber = {clr: k for k, clr in enumerate(sorted(set(colors.values())))}
+	return {x: renumber.get(colors.get(i)) for i, x in enumerate(nodes)}
+
 
-	return col_val
+# Coloring algorithms by name, select with coloring(..., algorithm=name)
+algorithms = {
+	"welsh_powell": welsh_powell_csr,
+	"dsatur": dsatur_csr,
+	"rlf": rlf_csr,
+	"smallest_last": smallest_last_csr,
+	"exact": exact_csr
+}
@@ -0,0 +1,213 @@
+import constant
+import gaa_propagation as pm
+import ndpool as mp
+import gaa_shared
+from gaa_spatial import SpatialIndex
+from typing import Dict, Set, FrozenSet
+
+no_edge_distance = constant.no_edge_distance   # kilometer, links beyond this distance are not stored
+link_loss_min_parallel = constant.link_loss_min_parallel   # fewer links are computed in the current process
+
+
+# Link Loss Matrix
+class LinkLoss:
+    """
+    Sparse matrix of the directed CBSD-to-CBSD propagation losses.
+    Each directed loss (tx -> rx) is computed once and kept, only for pairs within no_edge_distance.
+    For reciprocal models one direction is computed and the other derived (gaa_propagation.get_reverse_link_loss).
+    Losses are independent of the transmitter power, Rx is derived as TxPower - loss.
+    """
+    def __init__(self, propagation="itm", cutoff=no_edge_distance):
+        """
+        Input:
+            propagation:    Propagation Model used to compute the losses
+                :type propagation: str
+
+            cutoff:         kilometer, pairs beyond this distance are not computed
+                :type cutoff: float
+        """
+        self.propagation = propagation
+        self.cutoff = cutoff
+
+        self.losses = {}    # type: Dict[str: Dict[str: float]]    # {tx_id: {rx_id: loss}}
+        self.geometry = {}  # type: Dict[str: tuple]   # link geometry of each CBSD the losses were computed with
+
+    # Reset all losses
+    def reset(self):
+        self.losses = {}
+        self.geometry = {}
+
+    # Get the loss from tx to rx
+    def get(self, tx_id, rx_id):
+        """
+        :return: loss of the link, None if not computed (or out of range)
+        """
+        return self.losses.get(tx_id, {}).get(rx_id)
+
+    # Set the loss from tx to rx
+    def set(self, tx_id, rx_id, loss):
+        self.losses.setdefault(tx_id, {})[rx_id] = loss
+
+    # Remove all links of a CBSD
+    def remove_cbsd(self, cbsd_id):
+        """
+        Drop the row (as tx) and the column (as rx) of the given CBSD
+
+        :type cbsd_id: str
+        """
+        self.losses.pop(cbsd_id, None)
+        self.geometry.pop(cbsd_id, None)
+        for row in self.losses.values():
+            row.pop(cbsd_id, None)
+
+    # Get all pairs with losses of both directions
+    def get_pairs(self):
+        """
+        :return: Set[FrozenSet[str, str]]
+        """
+        return {frozenset((tx_id, rx_id)) for tx_id, row in self.losses.items() for rx_id in row.keys()
+                if self.get(rx_id, tx_id) is not None}
+
+    # Get neighbors (in range) of a CBSD
+    def get_neighbors(self, cbsd_id):
+        """
+        :return: ids of the CBSDs in range (with a computed link) of the given CBSD
+        :type return: Set[str]
+        """
+        return set(self.losses.get(cbsd_id, {}).keys())
+
+    # Compute the missing losses
+    def update(self, cbsds):
+        """
+        Compute the directed losses of all pairs of the given CBSDs within the cutoff distance
+        that are not computed yet. CBSDs that moved (or changed height/indoor/region) are computed again.
+
+        Input:
+            cbsds:  CBSDs to cover
+                :type cbsds: Iterable[CBSD]
+
+        Post-Condition:
+            self.losses holds the loss of both directions of every pair in range
+        """
+        cbsds = sorted(cbsds, key=lambda x: x.id)
+        self.check_geometry(cbsds)
+
+        # Find all pairs in range (from a spatial index), chunk by chunk
+        index = SpatialIndex([cbsd.latitude for cbsd in cbsds], [cbsd.longitude for cbsd in cbsds], self.cutoff)
+        for rows, cols in index.get_pairs():
+            self.update_pairs(cbsds, rows, cols)
+
+    # Drop the links of CBSDs whose geometry changed
+    def check_geometry(self, cbsds):
+        """
+        :type cbsds: Iterable[CBSD]
+        """
+        for cbsd in cbsds:
+            if cbsd.id in self.geometry and self.geometry.get(cbsd.id) != cbsd.get_geometry():
+                self.remove_cbsd(cbsd.id)
+            self.geometry[cbsd.id] = cbsd.get_geometry()
+
+    # Compute the missing losses of the given pairs
+    def update_pairs(self, cbsds, rows, cols):
+        """
+        Compute the directed losses (both directions) of the given pairs that are not computed yet,
+        with one propagation call per pair if the model is reciprocal
+
+        Input:
+            cbsds:      CBSDs, addressed by index
+                :type cbsds: List[CBSD]
+
+            rows, cols: indexes of the CBSDs of each pair
+                :type rows: np.ndarray[int]
+                :type cols: np.ndarray[int]
+
+        Pre-Condition:
+            check_geometry() has been called for the CBSDs
+        """
+        query = []
+        for i, j in zip(rows, cols):
+            forward, backward = self.get(cbsds[i].id, cbsds[j].id), self.get(cbsds[j].id, cbsds[i].id)
+            if forward is not None and backward is None:
+                i, j, forward, backward = j, i, backward, forward
+            if forward is None and backward is not None:
+                # Derive from the known reverse link if reciprocal
+                loss = pm.get_reverse_link_loss(backward, cbsds[j], cbsds[i], self.propagation)
+                if loss is not None:
+                    self.set(cbsds[i].id, cbsds[j].id, loss)
+                else:
+                    query.append((i, j, len(query), self.propagation))
+            elif forward is None:
+                # The same direction (from the smaller id) is computed however the pair is given
+                if cbsds[j].id < cbsds[i].id:
+                    i, j = j, i
+                query.append((i, j, len(query), self.propagation))
+                if not pm.is_reciprocal(self.propagation):
+                    query.append((j, i, len(query), self.propagation))
+
+        if len(query) == 0:
+            return
+
+        # Call Propagation Model once for each directed link, a few links in the current process
+        if len(query) < link_loss_min_parallel:
+            for (tx, rx, _, _) in query:
+                self.set(cbsds[tx].id, cbsds[rx].id, float(pm.get_link_loss((cbsds[tx], cbsds[rx], self.propagation))))
+        else:
+            self.query_parallel(cbsds, query)
+
+        # Derive the reverse links of reciprocal models
+        for (tx, rx, _, _) in query:
+            if pm.is_reciprocal(self.propagation) and self.get(cbsds[rx].id, cbsds[tx].id) is None:
+                self.set(cbsds[rx].id, cbsds[tx].id,
+                         pm.get_reverse_link_loss(self.get(cbsds[tx].id, cbsds[rx].id), cbsds[tx], cbsds[rx],
+                                                  self.propagation))
+
+    # Compute directed links with multiprocessing
+    def query_parallel(self, cbsds, query):
+        """
+        Workers read the CBSDs and write the losses through a shared store of the CBSDs in the query,
+        addressed by index
+
+        Input:
+            cbsds:  CBSDs, addressed by index
+                :type cbsds: List[CBSD]
+
+            query:  transmitter and receiver index, result slot and propagation model of each link
+                :type query: List[Tuple[int, int, int, str]]
+        """
+        involved = sorted({k for (tx, rx, _, _) in query for k in (tx, rx)})
+        position = {k: n for n, k in enumerate(involved)}
+        store = gaa_shared.SharedStore.create([cbsds[k] for k in involved], num_results=len(query))
+        p = None
+        try:
+            p = mp.Pool(initializer=gaa_shared.attach, initargs=(store.directory,))
+            p.map(pm.get_link_loss_shared, [(position.get(tx), position.get(rx), slot, model)
+                                            for (tx, rx, slot, model) in query])
+            for (tx, rx, slot, _) in query:
+                self.set(cbsds[tx].id, cbsds[rx].id, float(store.results[slot]))
+        finally:
+            if p is not None:
+                p.terminate()
+            store.close()
+
+    # Get the content of the losses (for export)
+    def get_content(self):
+        """
+        :return: {tx_id: {rx_id: loss}}
+        :type return: Dict[str: Dict[str: float]]
+        """
+        return self.losses
+
+    # Restore the losses (of an export) computed for the given CBSDs
+    def set_content(self, content, cbsds):
+        """
+        Input:
+            content:    {tx_id: {rx_id: loss}}, see get_content()
+                :type content: Dict[str: Dict[str: float]]
+
+            cbsds:      the CBSDs the losses were computed for
+                :type cbsds: Iterable[CBSD]
+        """
+        self.reset()
+        self.losses = {str(tx_id): {str(rx_id): float(loss) for rx_id, loss in row.items()}
+                       for tx_id, row in content.items()}
+        self.check_geometry(cbsds)
@@ -2,15 +2,29 @@
 from typing import Tuple
 import constant
 from gaa_cbsd import CBSD
+from gaa_coverage import Coverage
+import numpy as np
 import multiprocessing as mp     # Revised multiprocessing pool, supports non-daemonic process
 import geopy.distance
 import propagation_model.free_space as fs
 import propagation_model.itm as itm
 import propagation_model.hybrid as hybrid
+import gaa_shared
 
 no_edge_distance = constant.no_edge_distance   # kilometer, edge is not considered for distance greater than this
 I_max = constant.I_max      # Upper bound for calculating Point Interference Coordination
 I_min = constant.I_min      # Lower bound for calculating Point Interference Coordination
+rx_power_min = constant.rx_power_min    # minimum rx power for a grid to be covered
+prune_loss_margin = constant.prune_loss_margin  # dB, margin below free space loss for pruning grids
+indoor_loss = constant.indoor_loss      # dB, building loss of indoor CBSDs
+block_size = constant.coverage_block_size   # number of grid points per propagation task
+radial_count = constant.radial_count    # number of radials in radial-sweep coverage
+radial_step = constant.radial_step      # kilometer, step between points on a radial
+radial_stop_distance = constant.radial_stop_distance    # kilometer, a radial stops after this distance below rx_power_min
+radial_segment = constant.radial_segment    # number of points per propagation call on a radial
+adaptive_stride = constant.adaptive_stride  # number of fine grids between two coarse grids in adaptive coverage
+tx_power_min = constant.tx_power_min    # dBm, minimum Tx Power
+ew_block_size = constant.ew_block_size  # number of CBSDs per block of the area edge weight matrix
 
 
 # Function (for Multi-Processing) to check if distance in range
@@ -20,6 +34,52 @@ def is_in_range((coordinate_1, grid_index, coordinate_2)):
         return grid_index
 
 
+# Vectorized prefilter of grids for coverage calculation
+def get_grids_in_range(cbsd, coordinates):
+    """
+    Find the grids that need a propagation call for the coverage of the given CBSD.
+    A grid is dropped if it is beyond no_edge_distance, or if even the free space loss (plus the building loss of
+    indoor CBSDs, a lower bound of the loss relaxed by prune_loss_margin) pushes the Rx signal at the maximum power
+    below rx_power_min.
+
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each grid
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+    Returns:
+            mask of the grids to evaluate
+            :type return: np.ndarray[bool]
+    """
+    distances = fs.get_distance_array(cbsd.latitude, cbsd.longitude, coordinates[:, 0], coordinates[:, 1])
+    return (distances <= no_edge_distance) & \
+        (cbsd.TxPowerMax - get_loss_lower_bound(cbsd, distances) >= rx_power_min)
+
+
+# Lower bound of the path loss used to prune grids
+def get_loss_lower_bound(cbsd, distances):
+    """
+    Free space loss, plus the building loss of indoor CBSDs, relaxed by prune_loss_margin
+
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            distances:  kilometer, distance of each grid
+                :type distances: np.ndarray[float]
+
+    Returns:
+            dB, lower bound of the loss of each grid
+            :type return: np.ndarray[float]
+    """
+    loss_lower_bound = fs.get_loss_km_mhz(fs.tx_frequency, distances) - prune_loss_margin
+    if cbsd.indoor:
+        loss_lower_bound += indoor_loss
+    return loss_lower_bound
+
+
 # Handler for Edge Weight
 def get_ew((cbsdpair, pm, ic)):
     """
@@ -75,10 +135,605 @@ def get_ew((cbsdpair, pm, ic)):
             return 0
 
 
+# Function (for Multi-Processing) to get the propagation loss of a directed link between CBSDs
+def get_link_loss((cbsd_tx, cbsd_rx, pm)):
+    """
+    Return the propagation loss from cbsd_tx to the location (and height) of cbsd_rx
+
+    Input:
+            cbsd_tx, cbsd_rx:   the transmitter and the receiver
+                :type cbsd_tx: CBSD
+                :type cbsd_rx: CBSD
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+    Returns:
+            propagation loss in dB
+    """
+    if pm == "itm":
+        return itm.get_loss(cbsd_tx, cbsd_rx.latitude, cbsd_rx.longitude, cbsd_rx.height)
+    elif pm == "hybrid":
+        return hybrid.get_loss(cbsd_tx, cbsd_rx.latitude, cbsd_rx.longitude, cbsd_rx.height)
+    else:
+        return float(fs.get_loss_batch(cbsd_tx, [cbsd_rx.latitude], [cbsd_rx.longitude])[0])
+
+
+# Derive the loss of the reverse link from a known link (reciprocity)
+def get_reverse_link_loss(loss, cbsd_tx, cbsd_rx, pm):
+    """
+    Free space and the ITM terrain loss are reciprocal, only the building loss belongs to the transmitter:
+    the loss from cbsd_rx to cbsd_tx is the given loss without the building loss of cbsd_tx,
+    plus the building loss of cbsd_rx. The hybrid model is not reciprocal (the region of the transmitter
+    selects the model).
+
+    Input:
+            loss:       propagation loss from cbsd_tx to cbsd_rx
+                :type loss: float
+
+            cbsd_tx, cbsd_rx:   the transmitter and the receiver of the known link
+                :type cbsd_tx: CBSD
+                :type cbsd_rx: CBSD
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+    Returns:
+            propagation loss from cbsd_rx to cbsd_tx, None if it has to be computed
+    """
+    if not is_reciprocal(pm):
+        return None
+    elif pm == "itm":
+        return loss - indoor_loss * bool(cbsd_tx.indoor) + indoor_loss * bool(cbsd_rx.indoor)
+    else:
+        return loss
+
+
+# Check if the link losses of a Propagation Model are reciprocal (see get_reverse_link_loss)
+def is_reciprocal(pm):
+    return pm != "hybrid"
+
+
+# Handler for Edge Weight with known link losses (Point Coordination)
+def get_ew_link(cbsdpair, losses, pm):
+    """
+    Return the point coordination edge weight of the given pair of CBSDs from known directed losses,
+    without calling the propagation model.
+
+    Input:
+            cbsdpair:   The pair of CBSDs to get edge weight
+                :type cbsdpair: Tuple[CBSD, CBSD]
+
+            losses:     propagation losses (cbsdpair[1] -> cbsdpair[0], cbsdpair[0] -> cbsdpair[1])
+                :type losses: Tuple[float, float]
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+    Returns:
+            edge weight between the two CBSDs
+    """
+    model = itm if pm == "itm" else hybrid  # Both models share the same Interference Metric
+    IM_1 = model.get_im_point(cbsdpair[0], cbsdpair[1], loss=losses[0])
+    IM_2 = model.get_im_point(cbsdpair[1], cbsdpair[0], loss=losses[1])
+    return max(IM_1, IM_2)
+
+
+# Handler for Edge Weights of all pairs at once (matrix mode)
+def get_ew_edges(cbsds, pm, ic):
+    """
+    Return the edges of all pairs of the given CBSDs at once, for models that support matrix mode.
+
+    Input:
+            cbsds:      list of CBSDs
+                :type cbsds: List[CBSD]
+
+            pm:         Propagation Model ("freespace")
+                :type pm:   str
+
+            ic:         Interference Coordination ("area"; "point")
+                :type ic:   str
+
+    Pre-Condition:
+            For area coordination with "itm" or "hybrid", each CBSD should have its coverage map ready.
+
+    Returns:
+            List of (cbsd_id, cbsd_id, edge weight) of the pairs whose edge weight > 0,
+            None if the model has no matrix mode
+            :type return: List[Tuple[str, str, float]]
+    """
+    if pm == "freespace":
+        lats = [cbsd.latitude for cbsd in cbsds]
+        lons = [cbsd.longitude for cbsd in cbsds]
+        powers = [cbsd.TxPower for cbsd in cbsds]
+        rows, cols, ews = fs.get_ew_edges(lats, lons, powers, ic)
+        return [(cbsds[i].id, cbsds[j].id, float(ew)) for i, j, ew in zip(rows, cols, ews)]
+
+    elif (pm == "itm" or pm == "hybrid") and ic == "area":
+        rows, cols, ews = get_ew_edges_area(cbsds)
+        return [(cbsds[i].id, cbsds[j].id, float(ew)) for i, j, ew in zip(rows, cols, ews)]
+
+    return None
+
+
+# Area Coordination Edge Weights of all pairs from the coverage maps
+def get_ew_edges_area(cbsds, block_size=ew_block_size):
+    """
+    Return the area coordination edge weights of all pairs at once (same as get_im_area of each pair).
+    Each CBSD's effective coverage (Rx >= rx_power_min) is packed into bits once,
+    the overlap of all pairs is counted by a blocked matrix product of the masks.
+
+    Input:
+            cbsds:      list of CBSDs with coverage maps ready
+                :type cbsds: List[CBSD]
+
+            block_size: number of CBSDs per block of the matrix product
+                :type block_size: int
+
+    Returns:
+            rows, cols, ews: indexes (rows < cols) of the CBSD pairs with ew > 0, and the edge weights
+                :type return: Tuple[np.ndarray[int], np.ndarray[int], np.ndarray[float]]
+    """
+    n = len(cbsds)
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    # Packed effective coverage masks (one row per CBSD) and the covered area in grids
+    size = max(len(cbsd.coverage.array) for cbsd in cbsds)
+    masks = np.vstack([cbsd.coverage.packed_mask(rx_power_min, size) for cbsd in cbsds])
+    areas = np.array([np.count_nonzero(cbsd.coverage.mask(rx_power_min, size)) for cbsd in cbsds], dtype=float)
+
+    lats = np.array([cbsd.latitude for cbsd in cbsds], dtype=float)
+    lons = np.array([cbsd.longitude for cbsd in cbsds], dtype=float)
+
+    rows, cols, ews = [], [], []
+    for start_i in range(0, n, block_size):
+        stop_i = min(start_i + block_size, n)
+        block_i = np.unpackbits(masks[start_i:stop_i], axis=1)[:, :size].astype(np.float32)
+
+        for start_j in range(start_i, n, block_size):
+            stop_j = min(start_j + block_size, n)
+
+            # Candidate pairs (i < j) within no_edge_distance, skip the block if there is none
+            distance = fs.get_distance_array(lats[start_i:stop_i, None], lons[start_i:stop_i, None],
+                                             lats[None, start_j:stop_j], lons[None, start_j:stop_j])
+            candidate = distance < no_edge_distance
+            if start_i == start_j:
+                candidate = np.triu(candidate, k=1)
+            if not candidate.any():
+                continue
+
+            # Overlap (number of grids covered by both) of every pair in the block
+            block_j = block_i if start_i == start_j else \
+                np.unpackbits(masks[start_j:stop_j], axis=1)[:, :size].astype(np.float32)
+            overlap = np.dot(block_i, block_j.T)
+
+            # IM = overlap / smaller coverage area, keep only pairs with ew > 0
+            bi, bj = np.nonzero(candidate & (overlap > 0))
+            i = bi + start_i
+            j = bj + start_j
+            rows.append(i)
+            cols.append(j)
+            ews.append(overlap[bi, bj] / np.minimum(areas[i], areas[j]))
+
+    if len(rows) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(ews)
+
+
+# Edge Weights between one CBSD and a list of CBSDs (one row of the edge weight table)
+def get_ew_row(cbsd, others, pm, ic):
+    """
+    Return the edge weights of the given CBSD against each of the other CBSDs.
+
+    Input:
+            cbsd:       the CBSD of the row
+                :type cbsd: CBSD
+
+            others:     the other CBSDs (usually the CBSDs within no_edge_distance)
+                :type others: List[CBSD]
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+            ic:         Interference Coordination ("area"; "point")
+                :type ic:   str
+
+    Pre-Condition:
+            For area coordination with "itm" or "hybrid", all the CBSDs should have their coverage maps ready.
+
+    Returns:
+            edge weight of each of the other CBSDs
+            :type return: np.ndarray[float]
+    """
+    if len(others) == 0:
+        return np.zeros(0)
+
+    if (pm == "itm" or pm == "hybrid") and ic == "area":
+        # Overlap of the effective coverage masks, divided by the smaller coverage area (same as get_im_area)
+        size = max([len(cbsd.coverage.array)] + [len(other.coverage.array) for other in others])
+        mask = cbsd.coverage.mask(rx_power_min, size).astype(np.float32)
+        masks = np.vstack([np.unpackbits(other.coverage.packed_mask(rx_power_min, size))[:size]
+                           for other in others]).astype(np.float32)
+        overlap = np.dot(masks, mask)
+        areas = np.minimum(mask.sum(), masks.sum(axis=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(overlap > 0, overlap / areas, 0.0)
+
+    if pm == "freespace":
+        # Same as the matrix mode of get_ew_edges
+        lats = np.array([other.latitude for other in others], dtype=float)
+        lons = np.array([other.longitude for other in others], dtype=float)
+        powers = np.array([other.TxPower for other in others], dtype=float)
+        distance = fs.get_distance_array(cbsd.latitude, cbsd.longitude, lats, lons)
+        ews = fs.get_ew_distance(distance, cbsd.TxPower, powers, ic)
+        return np.where(distance < no_edge_distance, ews, 0.0)
+
+    return np.array([get_ew(((cbsd, other), pm, ic)) for other in others], dtype=float)
+
+
+# Function (for Multi-Processing) to get propagation loss of a block of grid points
+def get_loss_block((cbsd, lats, lons, pm)):
+    """
+    Call the batch entry point of the selected Propagation Model for a block of locations.
+
+    Input:
+            cbsd:       a cbsd object (the transmitter)
+                :type cbsd: CBSD
+
+            lats, lons: coordinates of the block of locations
+                :type lats: np.ndarray[float]
+                :type lons: np.ndarray[float]
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+    Returns:
+            Propagation loss at each location of the block
+            :type return: np.ndarray[float]
+    """
+    if pm == "itm":
+        return itm.get_loss_batch(cbsd, lats, lons)
+    elif pm == "hybrid":
+        return hybrid.get_loss_batch(cbsd, lats, lons)
+    else:
+        return fs.get_loss_batch(cbsd, lats, lons)
+
+
+# Function (for Multi-Processing) to get propagation loss along a radial from the CBSD
+def get_loss_radial((cbsd, azimuth, num_points, pm)):
+    """
+    Evaluate the propagation loss at points along a radial, one segment of points per propagation call.
+    Stop early once the Rx signal (at maximum power) has stayed below rx_power_min for radial_stop_distance.
+
+    Input:
+            cbsd:       a cbsd object (the transmitter)
+                :type cbsd: CBSD
+
+            azimuth:    degree, clockwise from north
+                :type azimuth: float
+
+            num_points: maximum number of points, the k-th point is at (k + 1) * radial_step km
+                :type num_points: int
+
+            pm:         Propagation Model ("itm", "hybrid")
+                :type pm:   str
+
+    Returns:
+            Propagation loss at the evaluated points (the first points of the radial)
+            :type return: np.ndarray[float]
+    """
+    ranges = (np.arange(num_points) + 1) * radial_step
+    lats, lons = fs.get_destination_array(cbsd.latitude, cbsd.longitude, azimuth, ranges)
+    stop_points = int(np.ceil(radial_stop_distance / radial_step))
+
+    losses = []
+    below = 0   # number of continuous points below rx_power_min
+    for start in range(0, num_points, radial_segment):
+        segment = get_loss_block((cbsd, lats[start: start + radial_segment], lons[start: start + radial_segment], pm))
+        losses.extend(segment)
+        for loss in segment:
+            below = below + 1 if cbsd.TxPowerMax - loss < rx_power_min else 0
+        if below >= stop_points:
+            break
+
+    return np.array(losses)
+
+
+# Radial-sweep path losses, interpolated to the given locations
+def get_loss_radial_sweep(cbsd, coordinates, pm, parallel=True):
+    """
+    Compute the propagation loss along radials from the CBSD (in parallel, one radial per task),
+    then resample the polar samples onto the given locations by bilinear interpolation in (azimuth, range).
+
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each location
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+            pm: The propagation model used
+                :type pm:   str
+
+            parallel: compute the radials on a pool, False in the current process (e.g. in a worker)
+                :type parallel: bool
+
+    Returns:
+            (loss at each location, number of propagation calls)
+            :type return: Tuple[np.ndarray[float], int]
+    """
+    if len(coordinates) == 0:
+        return np.zeros(0), 0
+
+    distances = fs.get_distance_array(cbsd.latitude, cbsd.longitude, coordinates[:, 0], coordinates[:, 1])
+    bearings = fs.get_bearing_array(cbsd.latitude, cbsd.longitude, coordinates[:, 0], coordinates[:, 1])
+
+    # Evaluate each radial up to the farthest location
+    num_points = int(np.ceil(distances.max() / radial_step)) + 1
+    azimuths = np.arange(radial_count) * 360.0 / radial_count
+    query = [(cbsd, azimuth, num_points, pm) for azimuth in azimuths]
+
+    if parallel:
+        pool_radial = mp.Pool()
+        try:
+            radials = pool_radial.map(get_loss_radial, query)
+        finally:
+            pool_radial.terminate()     # Important! Release Pool Resource!
+    else:
+        radials = map(get_loss_radial, query)
+
+    # Polar samples, the part after an early stop takes the last loss (no less than free space loss)
+    ranges = (np.arange(num_points) + 1) * radial_step
+    polar = np.empty((radial_count, num_points))
+    for a, radial in enumerate(radials):
+        polar[a, :len(radial)] = radial
+        polar[a, len(radial):] = np.maximum(radial[-1], fs.get_loss_km_mhz(fs.tx_frequency, ranges[len(radial):]))
+
+    # Bilinear interpolation in (azimuth, range)
+    ua = bearings / (360.0 / radial_count)
+    a0 = np.floor(ua).astype(int) % radial_count
+    a1 = (a0 + 1) % radial_count
+    wa = ua - np.floor(ua)
+    ur = np.clip(distances / radial_step - 1, 0, num_points - 1)
+    k0 = np.floor(ur).astype(int)
+    k1 = np.minimum(k0 + 1, num_points - 1)
+    wr = ur - k0
+
+    losses = (1 - wa) * ((1 - wr) * polar[a0, k0] + wr * polar[a0, k1]) \
+        + wa * ((1 - wr) * polar[a1, k0] + wr * polar[a1, k1])
+
+    return losses, sum(len(radial) for radial in radials)
+
+
+# Path losses of the given locations, in blocks of locations (with help of multiprocessing)
+def get_loss_points(cbsd, coordinates, pm, parallel=True):
+    """
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each location
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+            pm: The propagation model used
+                :type pm:   str
+
+            parallel: compute the blocks on a pool, False in the current process (e.g. in a worker)
+                :type parallel: bool
+
+    Returns:
+            loss at each location
+            :type return: np.ndarray[float]
+    """
+    # Split the locations into blocks, each block is handled by one propagation call of a worker
+    query = [(cbsd, coordinates[k: k + block_size, 0], coordinates[k: k + block_size, 1], pm)
+             for k in range(0, len(coordinates), block_size)]
+
+    if len(query) == 0:
+        return np.zeros(0)
+
+    # Based on Propagation Model, call the batch functions to get the loss of each block for the given CBSD
+    if parallel:
+        pool_signal = mp.Pool()
+        try:
+            block_losses = pool_signal.map(get_loss_block, query)
+        finally:
+            pool_signal.terminate()     # Important! Release Pool Resource!
+    else:
+        block_losses = map(get_loss_block, query)
+
+    return np.concatenate(block_losses)
+
+
+# Find the shape of the grids created by SAS.set_grid
+def get_grid_shape(coordinates):
+    """
+    Grids are ordered column by column (x outer, y inner), so latitude increases within a column
+    and drops at the start of the next one.
+
+    Input:
+            coordinates: (lat, lon) of each grid, in the order of grid index
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+    Returns:
+            (number of columns, number of grids per column), None if the grids are not a full rectangle
+            :type return: Tuple[int, int]
+    """
+    n = len(coordinates)
+    if n == 0:
+        return None
+    drops = np.flatnonzero(np.diff(coordinates[:, 0]) < 0) + 1
+    ny = drops[0] if len(drops) > 0 else n
+    if n % ny != 0 or not np.array_equal(drops, np.arange(1, n // ny) * ny):
+        return None
+    return n // ny, ny
+
+
+# Coarse-to-fine path losses on the rectangle grids
+def get_loss_adaptive(cbsd, coordinates, shape, in_range, losses, pm, parallel=True):
+    """
+    Evaluate a coarse grid (every adaptive_stride grids) first, then evaluate the fine grids only in the coarse cells
+    whose corners straddle the rx_power_min contour (for any power in [tx_power_min, TxPowerMax]).
+    The fine grids of the other cells inherit the loss interpolated from the cell corners.
+
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each grid, in the order of grid index
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+            shape:  (number of columns, number of grids per column)
+                :type shape: Tuple[int, int]
+
+            in_range: mask of the grids that need propagation (others keep their loss)
+                :type in_range: np.ndarray[bool]
+
+            losses: loss of each grid for the grids not in range (free space bound)
+                :type losses: np.ndarray[float]
+
+            pm: The propagation model used
+                :type pm:   str
+
+            parallel: compute the blocks of grids on a pool, False in the current process
+                :type parallel: bool
+
+    Returns:
+            (loss at each grid, number of propagation calls)
+            :type return: Tuple[np.ndarray[float], int]
+    """
+    nx, ny = shape
+    losses = np.array(losses, dtype=float).reshape(nx, ny)
+    in_range = in_range.reshape(nx, ny)
+    evaluated = ~in_range   # type: np.ndarray  # grids with a final loss
+
+    # Step 1. Coarse grids
+    cx = np.union1d(np.arange(0, nx, adaptive_stride), [nx - 1])
+    cy = np.union1d(np.arange(0, ny, adaptive_stride), [ny - 1])
+    coarse = np.zeros((nx, ny), dtype=bool)
+    coarse[np.ix_(cx, cy)] = True
+    calls = 0
+
+    targets = coarse & ~evaluated
+    losses[targets] = get_loss_points(cbsd, coordinates.reshape(nx, ny, 2)[targets], pm, parallel)
+    evaluated |= targets
+    calls += np.count_nonzero(targets)
+
+    # Step 2. Find coarse cells straddling the contour, from the status of the corners
+    # +1 if covered at any power, -1 if not covered at any power, 0 depends on power
+    corner = np.where(cbsd.TxPowerMax - losses[np.ix_(cx, cy)] < rx_power_min, -1,
+                      np.where(min(cbsd.TxPower, tx_power_min) - losses[np.ix_(cx, cy)] >= rx_power_min, 1, 0))
+    settled = (corner[:-1, :-1] == corner[1:, :-1]) & (corner[:-1, :-1] == corner[:-1, 1:]) \
+        & (corner[:-1, :-1] == corner[1:, 1:]) & (corner[:-1, :-1] != 0)
+
+    # Cell of each fine grid
+    ca = np.clip(np.searchsorted(cx, np.arange(nx), side="right") - 1, 0, max(len(cx) - 2, 0))
+    cb = np.clip(np.searchsorted(cy, np.arange(ny), side="right") - 1, 0, max(len(cy) - 2, 0))
+
+    # Step 3. Refine the straddling cells (a grid on the border of a straddling cell is refined too)
+    refine = np.zeros((nx, ny), dtype=bool)
+    if len(cx) > 1 and len(cy) > 1:
+        for a, b in zip(*np.nonzero(~settled)):
+            refine[cx[a]: cx[a + 1] + 1, cy[b]: cy[b + 1] + 1] = True
+    else:
+        refine[:] = True    # Single row or column, no cell to inherit from
+    targets = refine & ~evaluated
+    losses[targets] = get_loss_points(cbsd, coordinates.reshape(nx, ny, 2)[targets], pm, parallel)
+    evaluated |= targets
+    calls += np.count_nonzero(targets)
+
+    # Step 4. Fill the rest by inheritance: bilinear interpolation from the corners of the cell
+    targets = ~evaluated
+    if np.any(targets):
+        corner_losses = losses[np.ix_(cx, cy)]
+        i, j = np.nonzero(targets)
+        a, b = ca[i], cb[j]
+        wx = np.true_divide(i - cx[a], np.maximum(cx[a + 1] - cx[a], 1))
+        wy = np.true_divide(j - cy[b], np.maximum(cy[b + 1] - cy[b], 1))
+        losses[i, j] = (1 - wx) * ((1 - wy) * corner_losses[a, b] + wy * corner_losses[a, b + 1]) \
+            + wx * ((1 - wy) * corner_losses[a + 1, b] + wy * corner_losses[a + 1, b + 1])
+
+    return losses.reshape(-1), calls
+
+
+# Free space bound of the Path Loss Map
+def get_coverage_bound(cbsd, coordinates):
+    """
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each grid, in the order of grid index
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+    Returns:
+            grids_in_range: mask of the grids that need a propagation call
+            losses:         the loss lower bound of the pruning (get_loss_lower_bound) of each grid,
+                            inf if out of range. Pruned grids keep it, so their Rx stays below rx_power_min
+            :type return: Tuple[np.ndarray[bool], np.ndarray[float]]
+    """
+    # Prune the grids that can not be covered, without calling the propagation model
+    grids_in_range = get_grids_in_range(cbsd, coordinates)
+
+    # Pruned grids take the same lower bound as the pruning, grids out of range are not covered at all
+    distances = fs.get_distance_array(cbsd.latitude, cbsd.longitude, coordinates[:, 0], coordinates[:, 1])
+    losses = get_loss_lower_bound(cbsd, distances)
+    losses[distances > no_edge_distance] = np.inf
+    return grids_in_range, losses
+
+
+# Path Loss of each grid
+def get_coverage_losses(cbsd, coordinates, pm, mode, parallel=True):
+    """
+    Input:
+            cbsd:  a cbsd object
+                :type cbsd: CBSD
+
+            coordinates: (lat, lon) of each grid, in the order of grid index
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+            pm: The propagation model used ("itm", "hybrid")
+                :type pm:   str
+
+            mode: How the grids are evaluated ("point", "radial", "adaptive"), see get_coverage()
+                :type mode: str
+
+            parallel: compute the propagation calls on a pool, False in the current process (e.g. in a worker)
+                :type parallel: bool
+
+    Returns:
+            path loss of each grid
+            :type return: np.ndarray[float]
+    """
+    # Step 1: Prune the grids that can not be covered, without calling the propagation model
+    grids_in_range, losses = get_coverage_bound(cbsd, coordinates)
+
+    # Step 2. Based on the list of grid, calculate the path losses
+    targets = np.flatnonzero(grids_in_range)
+
+    shape = get_grid_shape(coordinates) if mode == "adaptive" else None
+
+    if mode == "radial":
+        # Sweep radials from the CBSD and interpolate to the in-range grids
+        losses[targets] = get_loss_radial_sweep(cbsd, coordinates[targets], pm, parallel)[0]
+
+    elif shape is not None:
+        # Coarse grids first, refine only around the contour
+        losses = get_loss_adaptive(cbsd, coordinates, shape, grids_in_range, losses, pm, parallel)[0]
+
+    else:
+        # Every in-range grid (also the fallback of adaptive mode if the grids are not a rectangle)
+        losses[targets] = get_loss_points(cbsd, coordinates[targets], pm, parallel)
+
+    return losses
+
+
 # Handler for Area Coverage
-def get_coverage((cbsd, grids, pm)):
+def get_coverage((cbsd, grids, pm, mode)):
     """
-    Get the Signal Coverage of the cbsd within the given area.
+    Get the power-independent Path Loss Map of the cbsd within the given area.
+    The Signal Coverage is derived from it as TxPower - loss.
 
     Input:
             cbsd:  a cbsd object
@@ -89,45 +744,130 @@ def get_coverage((cbsd, grids, pm)):
 
             pm: The propagation model used
                 :type pm:   str
+
+            mode: How the grids are evaluated
+                    "point":    one propagation call per grid (in blocks)
+                    "radial":   propagation along radials from the CBSD, interpolated to the grids
+                    "adaptive": coarse grids first, fine grids only around the rx_power_min contour
+                :type mode: str
     Returns:
-            Signal Map, the signal strength in each grid as dictionary {grid_index: signal_strength}
-            :type signal_map: Dict[int: float]
+            Loss Map, the path loss to each grid {grid_index: path_loss}, backed by an array in grid order
+            :type return: Coverage
     """
     if pm == "itm" or pm == "hybrid":     # Only ITM and Propagation Model
+        grid_indexes = sorted(grids.keys())
+        coordinates = np.array([grids.get(g_index) for g_index in grid_indexes], dtype=float).reshape(-1, 2)
+        losses = get_coverage_losses(cbsd, coordinates, pm, mode)
 
-        # Skip Step 1 for small area
-        # # Step 1: Limit the location points to the range of the no_edge_distance (40km default)
-        # coordinate_cbsd = (cbsd.latitude, cbsd.longitude)   # coordinate of the CBSD
-        #
-        # # List all pairs of cbsd/location for multi-processing
-        # pairs = [(coordinate_cbsd, g_index, grids.get(g_index)) for g_index in grids.keys()]
-        #
-        # # Find and List all grid (locations) in defined (40km) range
-        # pool_range = mp.Pool()
-        # grids_in_range = set(pool_range.map(is_in_range, pairs))
-        # # the list of all grids that are in defined (40km default) range
-        # grids_in_range.difference_update({None})     # get rid of None
-        #
-        # pool_range.terminate()  # Important! Release Pool Resource!
-
-        # let grids_in_range be all
-        grids_in_range = grids
-
-        # Step 2. Based on the list of grid, calculate the Rx signals
-        # List all pairs of given CBSD and in-range grid, for multiprocessing query
-        query = [(cbsd, grids.get(g_index)) for g_index in grids_in_range]
-        pool_signal = mp.Pool()
-        signals = []
+        # Create Loss Map of {Grid_index: Path_loss} (array in grid order), kept independent of the transmitter power
+        return Coverage.from_items(grid_indexes, losses)
 
-        # Based on Propagation Model, call the functions to get the coverage map for the given CBSD
-        if pm == "itm":   # Use ITM Model
-            signals = pool_signal.map(itm.get_rx_signal_point, query)
 
-        elif pm == "hybrid":   # Use Hybrid Model
-            signals = pool_signal.map(hybrid.get_rx_signal_point, query)
+# Function (for Multi-Processing with a SharedStore) to get propagation loss of a block of grids of a CBSD
+def get_loss_shared((i, targets, pm)):
+    """
+    Input:
+            i:          index of the CBSD in the store
+                :type i: int
+
+            targets:    indexes of the grids in the store
+                :type targets: np.ndarray[int]
+
+            pm:         Propagation Model ("itm", "hybrid")
+                :type pm:   str
+
+    Post-Condition:
+            the losses are written to row i of the loss matrix of the store
+    """
+    store = gaa_shared.get_store()
+    store.losses[i, targets] = get_loss_block((store.get_cbsd(i), store.grids[targets, 0], store.grids[targets, 1], pm))
+
+
+# Function (for Multi-Processing with a SharedStore) to get the Path Loss Map of a CBSD
+def get_coverage_shared((i, pm, mode)):
+    """
+    Input:
+            i:          index of the CBSD in the store
+                :type i: int
+
+            pm:         Propagation Model ("itm", "hybrid")
+                :type pm:   str
+
+            mode:       How the grids are evaluated ("radial", "adaptive"), see get_coverage()
+                :type mode: str
+
+    Post-Condition:
+            the losses are written to row i of the loss matrix of the store
+    """
+    store = gaa_shared.get_store()
+    store.losses[i] = get_coverage_losses(store.get_cbsd(i), np.asarray(store.grids), pm, mode, parallel=False)
+
+
+# Function (for Multi-Processing with a SharedStore) to get the propagation loss of a directed link between CBSDs
+def get_link_loss_shared((tx, rx, slot, pm)):
+    """
+    Input:
+            tx, rx:     indexes of the transmitter and the receiver in the store
+                :type tx: int
+                :type rx: int
+
+            slot:       position in the result buffer of the store
+                :type slot: int
+
+            pm:         Propagation Model ("freespace", "itm", "hybrid")
+                :type pm:   str
+
+    Post-Condition:
+            the loss is written to the result buffer of the store
+    """
+    store = gaa_shared.get_store()
+    store.results[slot] = get_link_loss((store.get_cbsd(tx), store.get_cbsd(rx), pm))
+
+
+# Path Loss Maps of a list of CBSDs
+def get_coverages(cbsds, grids, pm, mode):
+    """
+    Get the Path Loss Maps of the given CBSDs (same as get_coverage of each CBSD).
+    Grids, CBSD parameters and the loss matrix are kept in a SharedStore, workers attach once and write the losses
+    into the loss matrix. In "point" mode each task is a block of grids of one CBSD, so the blocks of all CBSDs
+    share one pool; the other modes use one task per CBSD, computed serially in the worker.
+
+    Input:
+            cbsds:  the CBSDs
+                :type cbsds: List[CBSD]
+
+            grids, pm, mode:    see get_coverage()
+
+    Returns:
+            Loss Map of each CBSD, None if the model has no path loss map
+            :type return: List[Coverage]
+    """
+    if not (pm == "itm" or pm == "hybrid"):
+        return [None] * len(cbsds)
+
+    grid_indexes = sorted(grids.keys())
+    coordinates = np.array([grids.get(g_index) for g_index in grid_indexes], dtype=float).reshape(-1, 2)
+    store = gaa_shared.SharedStore.create(cbsds, coordinates)
+    pool = None
+    try:
+        if mode == "point":
+            # Free space bound of each CBSD, and the blocks of in-range grids
+            query = []
+            for i, cbsd in enumerate(cbsds):
+                grids_in_range, store.losses[i] = get_coverage_bound(cbsd, coordinates)
+                targets = np.flatnonzero(grids_in_range)
+                query.extend((i, targets[k: k + block_size], pm) for k in range(0, len(targets), block_size))
+            worker = get_loss_shared
+        else:
+            query = [(i, pm, mode) for i in range(len(cbsds))]
+            worker = get_coverage_shared    # each worker computes its CBSD in process, one level of pool
 
-        # Create Dictionary of {Grid_index: Signal_strength}
-        signal_map = {grid_i: signal for grid_i, signal in zip(grids_in_range, signals)}
-        pool_signal.terminate()     # Important! Release Pool Resource!
+        pool = mp.Pool(initializer=gaa_shared.attach, initargs=(store.directory,))
+        pool.map(worker, query)
 
-        return signal_map
+        loss_maps = [Coverage.from_items(grid_indexes, store.losses[i]) for i in range(len(cbsds))]
+    finally:
+        if pool is not None:
+            pool.terminate()
+        store.close()
+    return loss_maps
@@ -1,13 +1,28 @@
 from typing import Dict, List, Tuple, Set, FrozenSet
 from gaa_cbsd import CBSD
 from gaa_cxg import CxG
+from gaa_link_loss import LinkLoss
+from gaa_ewt import EdgeWeightTable, EdgeWeightJournal, format_ew
+from gaa_component import ComponentTree
+from gaa_spatial import SpatialIndex, DynamicSpatialIndex
 import gaa_propagation as pm
+import gaa_graph_coloring as gc
+import gaa_coloring_cache as coloring_cache
 import os
 import json
+import hashlib
+import constant
 import numpy as np
 import geopy
 import geopy.distance as gd
 import ndpool as mp
+import multiprocessing
+
+no_edge_distance = constant.no_edge_distance   # kilometer, pairs beyond this distance have no edge
+ew_chunk_size = constant.ew_chunk_size     # number of pairs per chunk of the edge weight computation
+coloring_chunks_per_process = constant.coloring_chunks_per_process  # chunks of graphs per coloring worker
+
+_sas = None     # type: SAS     # SAS attached by the current (worker) process
 
 
 # Find all unconnected sub-graphs from given graph
@@ -70,21 +85,60 @@ def color_cxg(cxg):
     return cxg.coloring()
 
 
+# Graph-Coloring a chunk of CxGs
+def color_cxg_chunk(cxgs):
+    """
+    For Multi-Processing use, one task colors several CxGs
+
+    Returns:
+        chromatic_number, color_assignment of each CxG
+            :type return: List[Tuple[int, Dict[str: int]]]
+    """
+    return [cxg.coloring() for cxg in cxgs]
+
+
+# Pool initializer, share the SAS with the worker process
+def attach_sas(sas):
+    global _sas
+    _sas = sas
+
+
+# Escalate the threshold of an unsatisfied Connected Set with the shared SAS
+def escalate_task((key, target_cs, th_step)):
+    """
+    For Multi-Processing use, the worker is attached to the SAS by attach_sas()
+
+    Returns:
+        the given key, and list of dict, the satisfied Connected Set, or the split Connected Sets (may be unsatisfied)
+            :type return: Tuple[tuple, List[dict]]
+    """
+    return key, _sas.escalate_cs(target_cs, th_step=th_step, parallel=False)
+
+
 class SAS:
     """
     The SAS that manages CBSDs and Spectrum Channels
     """
-    def __init__(self, propagation="itm", coordination="area", num_chs=8):
+    def __init__(self, propagation="itm", coordination="area", num_chs=8, coverage="point", coloring="welsh_powell"):
 
         # Configuration Parameters:
         self.propagation = propagation      # type: str     # Propagation Model, "itm"; "freespace", "Hybrid"
         self.coordination = coordination    # type: str     # Coordination, default: "area"; "point"
+        self.coverage = coverage            # type: str     # Coverage computation, default: "point"; "radial"; "adaptive"
+        self.coloring = coloring            # type: str     # Graph Coloring, default: "welsh_powell"; "dsatur"; "rlf";
+                                            #                 "smallest_last"; "exact"
 
         # CBSDs
         self.CBSDs = set()      # type: Set[CBSD]           # Set of All managed CBSDs
+        self.cbsd_index = {}    # type: Dict[str: CBSD]     # CBSD of each id
+        self.cxg_members = {}   # type: Dict[int: Set[str]] # ids of the CBSDs in each CxG
+        self.positions = {}     # type: Dict[str: int]      # stable position of each CBSD, in the order they are added
+        self.next_position = 0  # type: int                 # position of the next added CBSD
+        self.spatial = DynamicSpatialIndex()    # type: DynamicSpatialIndex     # location of each CBSD id
 
         self.grids = {}         # type: Dict[int: Tuple[float, float]]      # Target Area, used in area coordination
-        self.ew_table = {}      # type: Dict[FrozenSet[str, str]: float]  # Table of all Edge Weights
+        self.ew_table = EdgeWeightTable()   # type: EdgeWeightTable  # Table of all Edge Weights
+        self.link_loss = LinkLoss(propagation)  # type: LinkLoss    # Directed CBSD-to-CBSD losses, point coordination
 
         # Groups
         self.CSs = []           # type: List[dict]           # List of Connected Sets
@@ -92,19 +146,29 @@ class SAS:
         # GAA Resource  //Use integer for current ver. wgao 03-20-2019
         self.channels = set(range(1, 1 + num_chs))          # type: Set[int]            # Available Channels
 
-        # # Temporary List    //Use for adding individual CBSDs, To be implemented
-        # self.temp_list = []     # type: List[CBSD]          # CBSDs that are not or temporarily assigned
+        # Temporary List    //Use for adding individual CBSDs
+        self.temp_list = []     # type: List[CBSD]          # CBSDs added or changed since the last graph coloring
+
+        # Process pool for graph coloring and escalation, started on first use and reused
+        self.pool = None        # type: mp.Pool
+        self.pool_state = None  # type: tuple   # state of the SAS the workers are forked with (see get_pool_state)
 
     # # Reset SAS members and assignments:
     # Reset all
     def reset_all(self):    # chs for available channels
         self.CBSDs = set()
+        self.cbsd_index = {}
+        self.cxg_members = {}
+        self.positions = {}
+        self.next_position = 0
+        self.spatial = DynamicSpatialIndex()
+        self.link_loss = LinkLoss(self.propagation)
         self.reset_ew_table()
         self.clear_temp_list()
 
     # Reset Edge Weight Table
     def reset_ew_table(self):
-        self.ew_table = {}
+        self.ew_table = EdgeWeightTable()
         self.reset_CS()     # Connected Sets assignment will be reset as well
 
     # Reset Connected Sets Assignment
@@ -199,7 +263,7 @@ class SAS:
                 cbsd_object.set_state()
 
             # Add to the set
-            self.CBSDs.add(cbsd_object)
+            self.index_cbsd(cbsd_object)
 
         # if SAS is set using area coordination, generate Grids with given area information
         if self.coordination == "area":
@@ -223,6 +287,10 @@ class SAS:
         xs = np.arange(float(-width + grid_size)/2, float(width + grid_size)/2, grid_size)
         ys = np.arange(float(-length + grid_size)/2, float(length + grid_size)/2, grid_size)
 
+        # Path loss maps computed for the previous grids are no longer valid
+        for cbsd in self.CBSDs:
+            cbsd.set_loss(None)
+
         # Convert to coordinate
         index = 1
         start = geopy.Point(lat0, lon0)
@@ -237,34 +305,44 @@ class SAS:
                 index += 1
 
     # For Area Coordination, Create Coverage map for all CBSDs
-    def create_coverage(self):
+    def create_coverage(self, update_all=False):
+        """
+        Create the path loss maps of the CBSDs, the coverage (Rx) maps are derived from them with TxPower.
+        Path loss does not depend on transmitter power, so only CBSDs without a valid map
+        (new, or moved/changed height since the last computation) are evaluated again.
+
+        Input:
+            update_all:     if True, recompute the maps of all CBSDs
+                :type update_all: bool
 
-        # Create query for multi-processing call
-        query = zip(self.CBSDs,                             # CBSD
-                    [self.grids] * len(self.CBSDs),         # Grid
-                    [self.propagation] * len(self.CBSDs)    # Propagation Model to use
-                    )
+        Post-Condition:
+            Every CBSD has a path loss map for the current grids
+        """
+        targets = [cbsd for cbsd in self.CBSDs if update_all or not cbsd.has_loss()]
 
-        # Call functions to get all CBSDs' coverage
-        pool = mp.Pool()
-        signal_maps = pool.map(pm.get_coverage, query)
-        pool.terminate()
+        if len(targets) > 0:
+            # Call functions to get all CBSDs' path loss maps (workers share the grids and the loss matrix)
+            loss_maps = pm.get_coverages(targets, self.grids, self.propagation, self.coverage)
 
-        # set CBSDs' coverage with above result
-        for cbsd, signal_map in zip(self.CBSDs, signal_maps):
-            cbsd.set_coverage(signal_map)
+            # set CBSDs' path loss with above result
+            for cbsd, loss_map in zip(targets, loss_maps):
+                cbsd.set_loss(loss_map)
 
         print "Coverage Maps Created"
 
     # Create Edge Weight Table for all managed CBSDs
-    def create_ew_table(self):
+    def create_ew_table(self, journal_file=None):
         """
         Reset and Create Edge Weight Table from the beginning (for all CBSDs)
         Existing Edge Weight Table will be dropped
 
         Inputs:
-            Min_Edge_threshold:     The threshold of edge weight where 2 CBSDs are considered to have potential interference
-                :type Min_Edge_threshold: float, default 0
+            journal_file:   file (.ewj) to record the finished chunks of pairs, None if not needed
+                            If the journal of an interrupted computation (of the same inputs) exists,
+                            the computation resumes after its last finished chunk.
+                            When finished, the table is saved to <journal_file without extension>.ewt
+                            and the journal is removed.
+                :type journal_file: str
 
         Pre-Condition:
             CBSDs data have been loaded to SAS, Stored in self.CBSDs
@@ -275,38 +353,459 @@ class SAS:
         # Reset Edge Weight Table
         self.reset_ew_table()
 
-        # If Area Coordination, call method to create coverage for all CBSDs
-        if self.coordination == "area":
+        # If Area Coordination, call method to create coverage for all CBSDs (reuse valid path loss maps)
+        if self.coordination == "area" and self.propagation != "freespace":
             self.create_coverage()
 
-        # Create all pairs of CBSDs in the list: C(n, 2)
-        pairs = []  # type: List[Tuple[CBSD, CBSD]]
-        all_cbsds = self.CBSDs.copy()
-        while len(all_cbsds) >= 2:
-            i = all_cbsds.pop()
-            for j in all_cbsds:
-                pairs.append((i, j))
-
-        # Apply Propagation Model to get edge weight for each pair (with help of multiprocessing)
-        p = mp.Pool()     # compute in parallel
-        ret = p.map(pm.get_ew, zip(pairs,
-                                   [self.propagation] * len(pairs),
-                                   [self.coordination] * len(pairs)
-                                   )
-        )   # type: List[float]
+        # Models with matrix mode compute all edges in one pass, without per pair multiprocessing:
+        # free space from the distance matrix, area coordination from the packed coverage masks
+        edges = pm.get_ew_edges(list(self.CBSDs), self.propagation, self.coordination)
+        if edges is not None:
+            self.ew_table = EdgeWeightTable.from_edges(*zip(*edges)) if len(edges) > 0 else EdgeWeightTable()
+        else:
+            self.ew_table = self.create_ew_table_chunks(journal_file)
 
-        p.terminate()
+        # Save the merged table next to the journal
+        if journal_file is not None:
+            with open(os.path.splitext(journal_file)[0] + ".ewt", "w") as f:
+                f.write(self.get_ew_table_content())
+            if os.path.exists(journal_file):
+                os.remove(journal_file)
 
-        # Convert pairs to frozensets of CBSDs' id (hashable)
-        keysets = []
-        for pair in pairs:
-            keysets.append(frozenset((pair[0].id, pair[1].id)))
+    # Compute the Edge Weight Table chunk by chunk
+    def create_ew_table_chunks(self, journal_file=None):
+        """
+        Compute the edge weights of the pairs within no_edge_distance, in ordered chunks of pairs
+        (generated lazily from a spatial index), so memory is bounded by the chunk size.
+        Each finished chunk is committed to the journal (if given), finished chunks are skipped on resume
+        (in point coordination, only their link losses are computed again, from the loss cache if enabled).
+
+        Input:
+            journal_file:   file (.ewj) of the journal, None if not needed
+                :type journal_file: str
+
+        Returns:
+            EdgeWeightTable
+        """
+        cbsds = sorted(self.CBSDs, key=lambda x: x.id)  # type: List[CBSD]
+        index = SpatialIndex([cbsd.latitude for cbsd in cbsds], [cbsd.longitude for cbsd in cbsds])
+
+        journal = None
+        ewt = EdgeWeightTable()
+        if journal_file is not None:
+            journal = EdgeWeightJournal(journal_file, self.get_ew_fingerprint())
+            ewt = journal.table
+        done = journal.chunks if journal is not None else 0
+
+        # Point Coordination computes each directed CBSD-to-CBSD loss once (reuse existing ones),
+        # then derives edge weights from the link loss matrix without calling the propagation model again
+        if self.coordination != "area":
+            self.link_loss.check_geometry(cbsds)
+            p = None
+        else:
+            p = mp.Pool()     # compute in parallel
+
+        rows_all, cols_all, ews_all = [], [], []
+        try:
+            for chunk, (rows, cols) in enumerate(index.get_pairs(chunk_size=ew_chunk_size)):
+                if chunk < done:
+                    # Committed by an interrupted run, the link losses of the pairs are still needed
+                    # (point coordination, e.g. by add_cbsd and the evaluation)
+                    if self.coordination != "area":
+                        self.link_loss.update_pairs(cbsds, rows, cols)
+                    continue
+
+                if self.coordination != "area":
+                    self.link_loss.update_pairs(cbsds, rows, cols)
+                    ret = [pm.get_ew_link((cbsds[i], cbsds[j]),
+                                          (self.link_loss.get(cbsds[j].id, cbsds[i].id),
+                                           self.link_loss.get(cbsds[i].id, cbsds[j].id)),
+                                          self.propagation)
+                           for i, j in zip(rows, cols)]     # type: List[float]
+                else:
+                    # Apply Propagation Model to get edge weight for each pair (with help of multiprocessing)
+                    ret = p.map(pm.get_ew, [((cbsds[i], cbsds[j]), self.propagation, self.coordination)
+                                            for i, j in zip(rows, cols)])   # type: List[float]
+
+                # Keep only ew > 0
+                ret = np.array(ret, dtype=np.float32)
+                keep = ret > 0
+                rows, cols, ret = rows[keep], cols[keep], ret[keep]
+                if journal is not None:
+                    journal.append(chunk, [cbsds[i].id for i in rows], [cbsds[j].id for j in cols], ret)
+                rows_all.append(rows)
+                cols_all.append(cols)
+                ews_all.append(ret)
+        finally:
+            if p is not None:
+                p.terminate()
+            if journal is not None:
+                journal.close()
 
         # Create Edge Weight Table for all edge weight pairs
-        ewt = dict(zip(keysets, ret))
-        print len([val for val in ewt.values() if val > 0])
-        ewt = {key: val for key, val in ewt.items() if val > 0}     # Keep only ew > 0
-        self.ew_table = ewt
+        if len(ews_all) > 0:
+            positions = np.array([ewt.add_id(cbsd.id) for cbsd in cbsds], dtype=np.int32)
+            ewt.set_edges(positions[np.concatenate(rows_all)], positions[np.concatenate(cols_all)],
+                          np.concatenate(ews_all))
+        return ewt
+
+    # Fingerprint of the inputs of the Edge Weight Table computation
+    def get_ew_fingerprint(self):
+        """
+        :return: str, sha1 of the SAS settings and the geometry and power of all CBSDs
+        """
+        content = json.dumps([self.propagation, self.coordination, self.coverage, no_edge_distance, ew_chunk_size,
+                              sorted([(str(cbsd.id), cbsd.latitude, cbsd.longitude, cbsd.height, cbsd.TxPower,
+                                       bool(cbsd.indoor), str(cbsd.region_type)) for cbsd in self.CBSDs])])
+        return hashlib.sha1(content).hexdigest()
+
+    # # Incremental Operations on individual CBSDs:
+    # Find a CBSD by id
+    def get_cbsd(self, cbsd_id):
+        """
+        :type cbsd_id: str
+        :return: the CBSD object, None if not managed by the SAS
+        """
+        return self.cbsd_index.get(cbsd_id)
+
+    # Add a CBSD to self.CBSDs and the indexes
+    def index_cbsd(self, cbsd):
+        """
+        :type cbsd: CBSD
+        """
+        if cbsd.id in self.cbsd_index:
+            self.unindex_cbsd(self.cbsd_index.get(cbsd.id))     # replace the CBSD of the same id, keep its position
+        self.CBSDs.add(cbsd)
+        self.cbsd_index[cbsd.id] = cbsd
+        self.cxg_members.setdefault(cbsd.CxG, set()).add(cbsd.id)
+        self.spatial.add(cbsd.id, cbsd.latitude, cbsd.longitude)
+        if cbsd.id not in self.positions:
+            self.positions[cbsd.id] = self.next_position
+            self.next_position += 1
+
+    # Remove a CBSD from self.CBSDs and the indexes
+    def unindex_cbsd(self, cbsd):
+        """
+        :type cbsd: CBSD
+        """
+        self.CBSDs.discard(cbsd)
+        self.cbsd_index.pop(cbsd.id, None)
+        self.positions.pop(cbsd.id, None)
+        self.spatial.remove(cbsd.id)
+        members = self.cxg_members.get(cbsd.CxG, set())
+        members.discard(cbsd.id)
+        if len(members) == 0:
+            self.cxg_members.pop(cbsd.CxG, None)
+
+    # Assign a CBSD to a CxG
+    def set_cxg(self, cbsd_id, cxg_id=0):
+        """
+        Use this (instead of CBSD.set_cxg) for managed CBSDs, to keep the CxG index consistent
+
+        :type cbsd_id: str
+        :type cxg_id: int
+        """
+        cbsd = self.cbsd_index.get(cbsd_id)
+        members = self.cxg_members.get(cbsd.CxG, set())
+        members.discard(cbsd_id)
+        if len(members) == 0:
+            self.cxg_members.pop(cbsd.CxG, None)
+        cbsd.set_cxg(cxg_id)
+        self.cxg_members.setdefault(cxg_id, set()).add(cbsd_id)
+
+    # Get the ids of the CBSDs in a CxG
+    def get_cxg_members(self, cxg_id):
+        """
+        :type cxg_id: int
+        :return: Set[str]
+        """
+        return self.cxg_members.get(cxg_id, set())
+
+    # Find the CBSDs within no_edge_distance of a location
+    def get_cbsds_in_range(self, lat, lon, exclude=None):
+        """
+        Input:
+            lat, lon:   coordinate of the location
+                :type lat: float
+                :type lon: float
+
+            exclude:    id of a CBSD to leave out (usually the CBSD at the location)
+                :type exclude: str
+
+        Returns:
+            CBSDs in range, sorted by id
+            :type return: List[CBSD]
+        """
+        return [self.cbsd_index.get(cbsd_id) for cbsd_id in self.spatial.get_neighbors(lat, lon) if cbsd_id != exclude]
+
+    # Remove the edges of a CBSD from the Edge Weight Table
+    def remove_ew_row(self, cbsd_id, lat, lon):
+        """
+        Input:
+            cbsd_id:    id of the CBSD
+                :type cbsd_id: str
+
+            lat, lon:   coordinate the edges were computed at (edges only exist within no_edge_distance)
+                :type lat: float
+                :type lon: float
+
+        Returns:
+            ids of the CBSDs that had an edge with the given CBSD
+            :type return: Set[str]
+        """
+        removed = set()
+        for other in self.get_cbsds_in_range(lat, lon, exclude=cbsd_id):
+            if self.ew_table.pop(frozenset((cbsd_id, other.id)), None) is not None:
+                removed.add(other.id)
+        return removed
+
+    # Compute the edges of a CBSD against the CBSDs in range
+    def update_ew_row(self, cbsd):
+        """
+        Compute coverage (area coordination) or link losses (point coordination) of the given CBSD only,
+        then its edge weights against the CBSDs within no_edge_distance.
+
+        Input:
+            cbsd:   a CBSD managed by the SAS
+                :type cbsd: CBSD
+
+        Post-Condition:
+            the edges of the CBSD (ew > 0) are in the Edge Weight Table
+
+        Returns:
+            ids of the CBSDs that have an edge with the given CBSD
+            :type return: Set[str]
+        """
+        others = self.get_cbsds_in_range(cbsd.latitude, cbsd.longitude, exclude=cbsd.id)
+
+        # Area Coordination, coverage is created only for the CBSDs without a valid path loss map
+        if self.coordination == "area" and self.propagation != "freespace":
+            self.create_coverage()
+            ews = pm.get_ew_row(cbsd, others, self.propagation, self.coordination)
+
+        # Point Coordination, only the links between the given CBSD and the CBSDs in range are computed
+        elif self.coordination != "area" and self.propagation != "freespace":
+            self.link_loss.check_geometry([cbsd] + others)
+            self.link_loss.update_pairs([cbsd] + others, np.zeros(len(others), dtype=int),
+                                        np.arange(1, len(others) + 1))
+            ews = [pm.get_ew_link((cbsd, other),
+                                  (self.link_loss.get(other.id, cbsd.id), self.link_loss.get(cbsd.id, other.id)),
+                                  self.propagation)
+                   for other in others]
+
+        else:
+            ews = pm.get_ew_row(cbsd, others, self.propagation, self.coordination)
+
+        added = set()
+        for other, ew in zip(others, ews):
+            if ew > 0:
+                self.ew_table[frozenset((cbsd.id, other.id))] = float(ew)
+                added.add(other.id)
+        return added
+
+    # Find Connected Sets that involve any of the given CBSDs
+    def get_dirty_cs(self, cbsd_ids):
+        """
+        :type cbsd_ids: Set[str]
+        :return: indexes of the Connected Sets in self.CSs that need to be graph colored again
+        :type return: List[int]
+        """
+        return [i for i, cs in enumerate(self.CSs) if any(cbsd_id in cs.get("members") for cbsd_id in cbsd_ids)]
+
+    # Add a CBSD to the SAS
+    def add_cbsd(self, cbsd):
+        """
+        Add a CBSD and compute only its row of the Edge Weight Table
+
+        Input:
+            cbsd:   the CBSD to add
+                :type cbsd: CBSD
+
+        Post-Condition:
+            The CBSD is in self.CBSDs and self.temp_list (not graph colored yet), its edges are in self.ew_table
+
+        Returns:
+            indexes of the Connected Sets (in self.CSs) that became dirty
+            :type return: List[int]
+        """
+        self.index_cbsd(cbsd)
+        self.temp_list.append(cbsd)
+        return self.get_dirty_cs(self.update_ew_row(cbsd))
+
+    # Remove a CBSD from the SAS
+    def remove_cbsd(self, cbsd_id):
+        """
+        Remove a CBSD and its edges
+
+        Input:
+            cbsd_id:    id of the CBSD to remove
+                :type cbsd_id: str
+
+        Post-Condition:
+            The CBSD is removed from self.CBSDs, self.temp_list, self.ew_table, the link losses and its Connected Set
+
+        Returns:
+            indexes of the Connected Sets (in self.CSs) that became dirty
+            :type return: List[int]
+        """
+        cbsd = self.get_cbsd(cbsd_id)
+        if cbsd is None:
+            return []
+
+        neighbors = self.remove_ew_row(cbsd_id, cbsd.latitude, cbsd.longitude)
+        dirty = self.get_dirty_cs(neighbors | {cbsd_id})
+
+        self.unindex_cbsd(cbsd)
+        self.temp_list = [item for item in self.temp_list if item.id != cbsd_id]
+        self.link_loss.remove_cbsd(cbsd_id)
+        for cs in self.CSs:
+            cs.get("members").pop(cbsd_id, None)
+        return dirty
+
+    # Move or change a CBSD
+    def update_cbsd(self, cbsd_id, lat=None, lon=None, height=None, tx_power=None):
+        """
+        Change the location, height or transmitter power of a CBSD, and recompute only its row of the
+        Edge Weight Table. The path loss map (or link losses) is computed again only if the link geometry changed.
+
+        Input:
+            cbsd_id:    id of the CBSD to change
+                :type cbsd_id: str
+
+            lat, lon, height, tx_power:     new values, None to keep
+                :type lat: float
+                :type lon: float
+                :type height: float
+                :type tx_power: float
+
+        Post-Condition:
+            The CBSD is changed and in self.temp_list, its edges in self.ew_table are updated
+
+        Returns:
+            indexes of the Connected Sets (in self.CSs) that became dirty
+            :type return: List[int]
+        """
+        cbsd = self.get_cbsd(cbsd_id)
+        if cbsd is None:
+            return []
+
+        # Drop the edges computed at the previous location
+        neighbors = self.remove_ew_row(cbsd_id, cbsd.latitude, cbsd.longitude)
+
+        if lat is not None:
+            cbsd.latitude = lat
+        if lon is not None:
+            cbsd.longitude = lon
+        if height is not None:
+            cbsd.height = height
+        if tx_power is not None:
+            cbsd.set_power(tx_power)
+        self.spatial.add(cbsd.id, cbsd.latitude, cbsd.longitude)
+
+        if cbsd not in self.temp_list:
+            self.temp_list.append(cbsd)
+        neighbors |= self.update_ew_row(cbsd)
+        return self.get_dirty_cs(neighbors | {cbsd_id})
+
+    # Color a CBSD added or changed since the last graph coloring
+    def recolor_cbsd(self, cbsd_id):
+        """
+        Color a CBSD added (add_cbsd) or changed (update_cbsd) after graph coloring, keeping the colors of the
+        other CBSDs where possible. If the CBSD joins one Connected Set, it takes a free color of its CxG
+        (in the set), otherwise colors are swapped along a bounded Kempe chain, otherwise it takes a new color
+        if the set has channels left. Only if all fail, or if the CBSD connects several Connected Sets,
+        the involved sets are graph colored again. If the Connected Set the CBSD leaves is no longer connected
+        (at its threshold), its connected sets are graph colored again.
+
+        Input:
+            cbsd_id:    id of the CBSD
+                :type cbsd_id: str
+
+        Pre-Condition:
+            self.CSs is not empty (graph-coloring has been performed), the CBSD's row of the EW table is updated
+
+        Post-Condition:
+            The CBSD is a member of a Connected Set in self.CSs, and removed from self.temp_list.
+            Connected Sets left without members are removed from self.CSs.
+            The process pool is kept for the next call, stop it with close_pool (or use the SAS in a with statement)
+
+        Returns:
+            indexes of the Connected Sets (in self.CSs) whose color assignment changed
+            :type return: List[int]
+        """
+        cbsd = self.get_cbsd(cbsd_id)
+        self.temp_list = [item for item in self.temp_list if item.id != cbsd_id]
+
+        # Leave the previous Connected Set, split it if the CBSD connected it
+        changed = []    # type: List[dict]     # Connected Sets whose color assignment changed
+        for k in [k for k, cs in enumerate(self.CSs) if cbsd_id in cs.get("members")]:
+            members = self.CSs[k].get("members")
+            members.pop(cbsd_id)
+            th = self.CSs[k].get("edge_threshold")
+            if len(members) > 0 and len(self.get_connected_sets(set(members.keys()), th)) > 1:
+                split = self.graph_coloring_until_satisfied(set(members.keys()), th_start=th)
+                members.clear()
+                self.CSs.extend(split)
+                changed.extend(split)
+        self.CSs = [cs for cs in self.CSs if len(cs.get("members")) > 0]
+
+        # Connected Sets the CBSD has an edge with (above the threshold of the set)
+        indptr, indices, data = self.ew_table.get_csr()
+        i = self.ew_table.index.get(cbsd_id)
+        neighbors = [] if i is None else zip([self.ew_table.ids[j] for j in indices[indptr[i]: indptr[i + 1]]],
+                                             data[indptr[i]: indptr[i + 1]])
+        touched = [k for k, cs in enumerate(self.CSs)
+                   if any(nb in cs.get("members") and ew > np.float32(cs.get("edge_threshold"))
+                          for nb, ew in neighbors)]
+
+        # Isolated: a singleton Connected Set at the threshold above all its edges
+        if len(touched) == 0:
+            th = float(max([ew for _, ew in neighbors])) if len(neighbors) > 0 else 0.0
+            self.CSs.append({"edge_threshold": th, "members": {cbsd_id: 1}, "chromatic": 1})
+            changed.append(self.CSs[-1])
+
+        # Join one Connected Set: local repair within the CBSDs of the same CxG in the set
+        elif len(touched) == 1:
+            target_cs = self.CSs[touched[0]]
+            th = target_cs.get("edge_threshold")
+            members = target_cs.get("members")
+            colors = {key: val for key, val in members.items() if self.cbsd_index.get(key).CxG == cbsd.CxG}
+            palette = sorted(set(colors.values()))
+
+            def get_neighbors(x):
+                return {y for y in self.ew_table.get_neighbors(x, th) if y in colors or y == cbsd_id}
+
+            # A color of the CxG (free or freed by a Kempe chain), a new color while channels are left,
+            # otherwise the whole set is graph colored again
+            if gc.kempe_insert(cbsd_id, colors, palette, get_neighbors):
+                members.update(colors)
+            elif target_cs.get("chromatic") < len(self.channels):
+                target_cs["chromatic"] += 1
+                members[cbsd_id] = target_cs.get("chromatic")
+            else:
+                members[cbsd_id] = 0
+                self.coloring_cs(target_cs)
+
+            if not self.is_unsatisfied(target_cs):
+                changed.append(target_cs)
+            else:
+                self.CSs.pop(touched[0])
+                result = self.escalate_all([target_cs])
+                self.CSs.extend(result)
+                changed.extend(result)
+
+        # Joining several Connected Sets: graph color them together again
+        else:
+            cbsd_ids = {cbsd_id}
+            for k in touched:
+                cbsd_ids.update(self.CSs[k].get("members").keys())
+            th_start = min([self.CSs[k].get("edge_threshold") for k in touched])
+            self.CSs = [cs for k, cs in enumerate(self.CSs) if k not in touched]
+            result = self.graph_coloring_until_satisfied(cbsd_ids, th_start=th_start)
+            self.CSs.extend(result)
+            changed.extend(result)
+
+        return [k for k, cs in enumerate(self.CSs) if any(cs is item for item in changed)]
 
     # Coloring the CBSDs interference graph
     def graph_coloring_all_until_satisfied(self, th_start=0.0, th_step=0.02):
@@ -325,10 +824,15 @@ class SAS:
             Edge Weight Table is created and updated for current list of CBSDs
 
         Post-Condition:
-            All CBSDs are graph colored and the result are stored in self.CSs include the members and threshold
+            All CBSDs are graph colored and the result are stored in self.CSs include the members and threshold,
+            the process pool is stopped
         """
         all_cbsd_ids = {item.id for item in self.CBSDs}
-        self.CSs = self.graph_coloring_until_satisfied(all_cbsd_ids, th_start=th_start, th_step=th_step)
+        try:
+            self.CSs = self.graph_coloring_until_satisfied(all_cbsd_ids, th_start=th_start, th_step=th_step)
+        finally:
+            self.close_pool()
+        self.clear_temp_list()
 
     # Coloring a given CBSDs set with known ew table
     def graph_coloring_until_satisfied(self, cbsd_ids, th_start=0.0, th_step=0.02):
@@ -354,65 +858,146 @@ class SAS:
                 :type return: List[dict]
 
         """
-        satisfied_CSs = []      # List to store CSs that has been graph colored and satisfies the requirement
         th_start = min(th_start, 1.0)   # threshold will not exceed 1.0
 
-        # # Step 1: Based on the edge threshold, create Connected Sets of given CBSDs
-        # Select the edges between involved CBSDs whose value >= edge threshold
-        effective_edges = {k for k in self.ew_table.keys()
-                           if k.issubset(cbsd_ids) and self.ew_table.get(k) > th_start
-                           }
+        # # Step 1: Based on the edge threshold, create and graph color the Connected Sets of given CBSDs
+        CSs = self.graph_coloring_at(cbsd_ids, th=th_start)
 
-        # Initialize neighbor list for every involved CBSD
-        neighbors = {}
-        for cbsd in cbsd_ids:
-            neighbors[cbsd] = set()
+        # # Step 2. Keep the satisfied ones, and repeat the rest with increased threshold
+        # # Step 3. Return list of satisfied CS
+        return self.escalate_all(CSs, th_step=th_step)
 
-        # For the CBSD pair in every egde, add each other as the neighbor
-        for key in effective_edges:
-            tmp = list(key)
-            neighbors[tmp[0]].add(tmp[1])
-            neighbors[tmp[1]].add(tmp[0])
+    # Increase the thresholds of the unsatisfied Connected Sets in parallel
+    def escalate_all(self, CSs, th_step=0.02):
+        """
+        Worklist of the unsatisfied Connected Sets, each is escalated as an independent task on the process pool
+        (largest first), a single set is escalated in the current process. The split connected sets that are still
+        unsatisfied are added back to the worklist, and escalated in the next round.
 
-        # Find all sub_graphs where each represents a connected set (call the methods defined in this file)
-        sub_graphs = get_sub_graph_BFS(neighbors, effective_edges)
+        Input:
+            CSs:        graph colored Connected Sets
+                :type CSs: List[dict]
 
-        CSs = []
-        for sub_graph in sub_graphs:
-            members = dict.fromkeys(sub_graph, 0)
-            one_CS = {"edge_threshold": th_start,       # Record the threshold used (no exceeds 1.0)
-                      "members": members,               # Record members (CBSD ids), set color 0
-                      "chromatic": 0                    # Initialize chromatic to 0
-                      }
-            CSs.append(one_CS)
+            th_step:    grid of the thresholds
+                :type th_step: float
 
-        # # Step 2. Graph Coloring each Connected Set.
-        # # Keep the satisfied ones, and repeat the rest with increased threshold
-        for each_CS in CSs:
-            each_CS = self.coloring_cs(each_CS)
-
-            # if not satisfied, call the graph coloring method recursively with increased threshold
-            if each_CS.get("chromatic") > len(self.channels) and each_CS.get("edge_threshold") < 1.0:
-                # Find minimum edge weight value that is larger than the current threshold
-                next_ew = min(val for k, val in self.ew_table.items()
-                              if k.issubset(each_CS.get("members").keys()) and val > th_start)
-
-                # keep increase next threshold until it exceeds the next minimum edge weight (to save time)
-                next_th = th_start
-                while next_ew > next_th:
-                    next_th += th_step
-                result = self.graph_coloring_until_satisfied(set(each_CS.get("members").keys()),
-                                                             th_start=next_th,
-                                                             th_step=th_step
-                                                             )
-                satisfied_CSs.extend(result)
-
-            # Append satisfied CS to the list
+        Returns:
+            List of dict, the satisfied Connected Sets, in the order of the given sets
+            (the split sets of a set take its place, in the order they are split)
+                :type return: List[dict]
+        """
+        # Key of each Connected Set: its position, followed by the position in the split sets of each escalation
+        done = {}       # type: Dict[tuple: dict]
+        worklist = []   # type: List[Tuple[tuple, dict]]
+        for k, each_CS in enumerate(CSs):
+            if self.is_unsatisfied(each_CS):
+                worklist.append(((k,), each_CS))
             else:
-                satisfied_CSs.append(each_CS)
+                done[(k,)] = each_CS
+
+        while len(worklist) > 0:
+            # A single set in the current process (its CxGs colored on the pool), otherwise on the pool,
+            # workers share this SAS (forked) and color the sets in process. The largest sets are submitted first
+            if len(worklist) == 1:
+                key, each_CS = worklist[0]
+                results = [(key, self.escalate_cs(each_CS, th_step=th_step))]
+            else:
+                worklist.sort(key=lambda x: (-len(x[1].get("members")), x[0]))
+                tasks = [(key, each_CS, th_step) for key, each_CS in worklist]
+                results = self.get_pool(attached=True).imap_unordered(escalate_task, tasks)
+
+            # Collect the tasks as they finish
+            worklist = []
+            for key, result in results:
+                for k, each_CS in enumerate(result):
+                    if self.is_unsatisfied(each_CS):
+                        worklist.append((key + (k,), each_CS))
+                    else:
+                        done[key + (k,)] = each_CS
 
-        # # Step 3. Return list of satisfied CS
-        return satisfied_CSs
+        return [done.get(key) for key in sorted(done.keys())]
+
+    # Check if a graph colored Connected Set needs more channels than available (and can be escalated)
+    def is_unsatisfied(self, target_cs):
+        return target_cs.get("chromatic") > len(self.channels) and target_cs.get("edge_threshold") < 1.0
+
+    # Increase the threshold of an unsatisfied Connected Set until satisfied
+    def escalate_cs(self, target_cs, th_step=0.02, parallel=True):
+        """
+        Find the minimum threshold (on the th_step grid) at which the Connected Set is satisfied.
+
+        The candidate thresholds are the grid points that first exceed each distinct edge weight of the set
+        (thresholds between them give the same graph). While the set stays connected, the minimum satisfied
+        candidate is found by binary search with graph coloring as the check. Each check starts from the coloring
+        of the highest unsatisfied threshold so far (warm start, see color_css_cxgs). If no candidate before the set
+        splits is satisfied, the split connected sets are graph colored at the split threshold.
+
+        Input:
+            target_cs:  unsatisfied Connected Set, colored at its "edge_threshold"
+                :type target_cs: dict
+
+            th_step:    grid of the thresholds
+                :type th_step: float
+
+            parallel:   color the CxGs of each set in parallel
+                :type parallel: bool
+
+        Returns:
+            List of dict, the satisfied Connected Set, or the split Connected Sets (may be unsatisfied)
+                :type return: List[dict]
+        """
+        cbsd_ids = set(target_cs.get("members").keys())
+        th = target_cs.get("edge_threshold")
+
+        # Sorted distinct edge weights of the set above the current threshold
+        rows, cols, ews = self.ew_table.get_edges(cbsd_ids, th)
+        weights = np.unique(ews)
+
+        # No edges left, the set needs more channels for its CxGs alone: a higher threshold does not help
+        if len(weights) == 0:
+            result = dict(target_cs)
+            result["edge_threshold"] = 1.0
+            return [result]
+
+        # Threshold the set splits at: the lowest merge of its component tree
+        tree = ComponentTree(self.ew_table.ids, rows, cols, ews)
+        split_ew = tree.height[len(tree.ids):].min()
+
+        # Candidate thresholds: the first grid point (not exceeds 1.0) that reaches each distinct edge weight
+        candidates = []
+        next_th = th
+        for ew in weights.astype(float):
+            while ew > next_th:
+                next_th += th_step
+            if len(candidates) == 0 or candidates[-1] != min(next_th, 1.0):
+                candidates.append(min(next_th, 1.0))
+
+        # Candidates before the split, the set stays connected
+        connected = [x for x in candidates if np.float32(x) < split_ew]
+
+        # Binary search the minimum satisfied candidate, each coloring starts from the unsatisfied coloring
+        # of the highest threshold below (still valid with fewer edges)
+        colored = {}
+        warm = target_cs.get("members")
+        low, high = 0, len(connected)
+        while low < high:
+            mid = (low + high) // 2
+            one_CS = {"edge_threshold": connected[mid], "members": dict.fromkeys(cbsd_ids, 0), "chromatic": 0}
+            colored[mid] = self.coloring_cs(one_CS, parallel=parallel, warm=warm)
+            if colored[mid].get("chromatic") <= len(self.channels):
+                high = mid
+            else:
+                low = mid + 1
+                warm = colored[mid].get("members")
+        if low < len(connected):
+            return [colored[low]]
+
+        # Not satisfied before the split, graph color the split connected sets (to be escalated on their own)
+        if len(connected) < len(candidates):
+            return self.graph_coloring_at(cbsd_ids, th=candidates[len(connected)], parallel=parallel, warm=warm)
+
+        # The threshold reaches 1.0 before the split
+        return [colored[len(connected) - 1]] if len(connected) > 0 else [target_cs]
 
     # Coloring the CBSDs interference graph
     def graph_coloring_all_at(self, th=0.0):
@@ -427,13 +1012,18 @@ class SAS:
             Edge Weight Table is created and updated for current list of CBSDs
 
         Post-Condition:
-            All CBSDs are graph colored and the result are stored in self.CSs include the members and threshold
+            All CBSDs are graph colored and the result are stored in self.CSs include the members and threshold,
+            the process pool is stopped
         """
         all_cbsd_ids = {item.id for item in self.CBSDs}
-        self.CSs = self.graph_coloring_at(all_cbsd_ids, th=th)
+        try:
+            self.CSs = self.graph_coloring_at(all_cbsd_ids, th=th)
+        finally:
+            self.close_pool()
+        self.clear_temp_list()
 
     # Coloring a given CBSDs set with known ew table at a fixed threshold
-    def graph_coloring_at(self, cbsd_ids, th=0.0):
+    def graph_coloring_at(self, cbsd_ids, th=0.0, parallel=True, warm=None):
         """
         Perform Graph Coloring to the given set of CBSDs based on the Edge Weight Table, until the chromatic number
         of each connected set is no greater than the number of available channel.
@@ -445,6 +1035,12 @@ class SAS:
             th:         initial edge threshold used to create edges
                 :type th: float
 
+            parallel:   color the CxGs of each set in parallel
+                :type parallel: bool
+
+            warm:       color assignment of the CBSDs valid at a lower threshold to start from, None from scratch
+                :type warm: Dict[str: int]
+
         Pre-Condition:
             Edge Weight Table is created and updated for current list of CBSDs
 
@@ -456,24 +1052,7 @@ class SAS:
         colored_CSs = []      # List to store CSs that has been graph colored
 
         # # Step 1: Based on the edge threshold, create Connected Sets of given CBSDs
-        # Select the edges between involved CBSDs whose value >= edge threshold
-        effective_edges = {k for k in self.ew_table.keys()
-                           if k.issubset(cbsd_ids) and self.ew_table.get(k) > th
-                           }
-
-        # Initialize neighbor list for every involved CBSD
-        neighbors = {}
-        for cbsd in cbsd_ids:
-            neighbors[cbsd] = set()
-
-        # For the CBSD pair in every egde, add each other as the neighbor
-        for key in effective_edges:
-            tmp = list(key)
-            neighbors[tmp[0]].add(tmp[1])
-            neighbors[tmp[1]].add(tmp[0])
-
-        # Find all sub_graphs where each represents a connected set (call the methods defined in this file)
-        sub_graphs = get_sub_graph_BFS(neighbors, effective_edges)
+        sub_graphs = self.get_connected_sets(cbsd_ids, th)
 
         CSs = []
         for sub_graph in sub_graphs:
@@ -484,16 +1063,40 @@ class SAS:
                       }
             CSs.append(one_CS)
 
-        # # Step 2. Graph Coloring each Connected Set.
-        for each_CS in CSs:
-            each_CS = self.coloring_cs(each_CS)
+        # # Step 2. Graph Coloring each Connected Set, the CxGs of all sets are colored in one batch
+        cxgs = [self.get_cxgs(each_CS) for each_CS in CSs]
+        for each_CS, ret in zip(CSs, self.color_css_cxgs(cxgs, parallel=parallel, warm=warm)):
+            each_CS = self.set_cs_coloring(each_CS, ret)
             colored_CSs.append(each_CS)
 
         # # Step 3. Return list of satisfied CS
         return colored_CSs
 
+    # Find the Connected Sets of given CBSDs at an edge threshold
+    def get_connected_sets(self, cbsd_ids, th=0.0):
+        """
+        Input:
+            cbsd_ids:   id of the CBSDs
+                :type cbsd_ids: Set[str]
+
+            th:         edge threshold, CBSDs are connected by the edges whose value > th
+                :type th: float
+
+        Returns:
+            List of sets of CBSD ids, each is a connected set of the sub-graph of the given CBSDs
+                :type return: List[Set[str]]
+        """
+        # Query the component tree of the Edge Weight Table (built once for each version of the table)
+        tree = self.ew_table.get_tree()
+        if tree.is_closed(cbsd_ids, th):
+            return tree.connected_sets(th, cbsd_ids)
+
+        # The given CBSDs cut through a connected set of the whole graph, use the edges between them only
+        rows, cols, ews = self.ew_table.get_edges(cbsd_ids, th)
+        return ComponentTree(self.ew_table.ids, rows, cols, ews).connected_sets(th, cbsd_ids)
+
     # Graph Coloring selected Connected Set(s)
-    def coloring_cs(self, target_cs):
+    def coloring_cs(self, target_cs, parallel=True, warm=None):
         """
         Perform Graph Coloring to connected set(s) with given threshold (initial and incremental) until satisfied
 
@@ -501,27 +1104,220 @@ class SAS:
             target_cs:  Target Connected Set include members list and threshold used
                 :type target_cs: dict
 
+            parallel:   color the CxGs in parallel, False to color in the current process
+                :type parallel: bool
+
+            warm:       color assignment of the members to start from (see color_css_cxgs), None from scratch
+                :type warm: Dict[str: int]
+
         Returns:
             colored connected sets
         """
+        cxgs = self.get_cxgs(target_cs)
+        return self.set_cs_coloring(target_cs, self.color_css_cxgs([cxgs], parallel=parallel, warm=warm)[0])
+
+    # Create the CxG subgraphs of a Connected Set
+    def get_cxgs(self, target_cs):
+        """
+        Input:
+            target_cs:  Target Connected Set include members list and threshold used
+                :type target_cs: dict
+
+        Returns:
+            CxG objects with the member CBSDs and the edges (above the threshold) of each CxG in the set
+                :type return: List[CxG]
+        """
         # Find member CBSDs in the target connected set
         members = target_cs.get("members")      # type: dict
 
-        # Distinguish by CxG assignment, Create CxG objects
-        CxG_ids = {cbsd.CxG for cbsd in self.CBSDs if cbsd.id in members.keys()}
+        # Distinguish by CxG assignment (members in the order of their positions), Create CxG objects
+        cbsds_of_cxgs = {}      # type: Dict[int: List[str]]
+        for cbsd_id in sorted([x for x in members.keys() if x in self.cbsd_index], key=self.positions.get):
+            cbsds_of_cxgs.setdefault(self.cbsd_index.get(cbsd_id).CxG, []).append(cbsd_id)
         cxgs = []
-        for cxg_id in CxG_ids:
-            one_cxg = CxG(cxg_id)       # Create CxG object
-            # Find all CBSDs in the Connected Set with current CxG number
-            cbsds_of_cxg = [cbsd.id for cbsd in self.CBSDs if cbsd.id in members.keys() and cbsd.CxG == cxg_id]
-            one_cxg.add_cbsd(cbsds_of_cxg)
+        for cxg_id in sorted(cbsds_of_cxgs.keys()):
+            one_cxg = CxG(cxg_id, self.coloring)    # Create CxG object
+            # All CBSDs in the Connected Set with current CxG number
+            one_cxg.add_cbsd(cbsds_of_cxgs.get(cxg_id))
             one_cxg.set_edges(self.ew_table, target_cs.get("edge_threshold"))
             cxgs.append(one_cxg)
+        return cxgs
+
+    # Graph Color CxG subgraphs (of one or more Connected Sets)
+    def color_cxgs(self, cxgs, parallel=True):
+        """
+        Graphs without edges are colored in the current process. The others are looked up in the coloring cache
+        (gaa_coloring_cache, by the fingerprint of each CxG), the rest are batched into size-balanced chunks
+        on the process pool of the SAS (started once and reused) and cached
+
+        Input:
+            cxgs:       CxG objects with CBSDs and edges set
+                :type cxgs: List[CxG]
+
+            parallel:   use the process pool, False to color all in the current process
+                :type parallel: bool
+
+        Returns:
+            chromatic_number, color_assignment of each CxG (in the given order)
+                :type return: List[Tuple[int, Dict[str: int]]]
+        """
+        ret = [None] * len(cxgs)    # type: List[Tuple[int, Dict[str: int]]]
+        cache = coloring_cache.get_cache()
+        keys = {}   # type: Dict[int: str]     # fingerprint of each CxG colored (not cached yet)
+        heavy = []
+        for k, cxg in enumerate(cxgs):
+            if len(cxg.edges) == 0:
+                ret[k] = color_cxg(cxg)
+                continue
+            if cache is not None:
+                key = cxg.get_fingerprint()
+                colors = cache.lookup(key)
+                if colors is not None:
+                    cxg.chromatic = len(set(colors.values()))
+                    ret[k] = (cxg.chromatic, colors)
+                    continue
+                keys[k] = key
+            if parallel:
+                heavy.append(k)
+            else:
+                ret[k] = color_cxg(cxg)
+
+        # A single graph is not worth the transfer to the pool
+        if len(heavy) == 1:
+            ret[heavy[0]] = color_cxg(cxgs[heavy[0]])
+        elif len(heavy) > 1:
+            # Longest processing time first: the largest graph goes to the lightest chunk
+            p = self.get_pool()
+            num_chunks = min(len(heavy), multiprocessing.cpu_count() * coloring_chunks_per_process)
+            chunks = [[] for _ in range(num_chunks)]
+            loads = [0] * num_chunks
+            for k in sorted(heavy, key=lambda x: -(len(cxgs[x].CBSDs) + len(cxgs[x].edges))):
+                lightest = loads.index(min(loads))
+                chunks[lightest].append(k)
+                loads[lightest] += len(cxgs[k].CBSDs) + len(cxgs[k].edges)
+            results = p.map(color_cxg_chunk, [[cxgs[k] for k in chunk] for chunk in chunks])
+            for chunk, result in zip(chunks, results):
+                for k, item in zip(chunk, result):
+                    ret[k] = item
+
+        # Cache the new results
+        for k, key in keys.items():
+            cache.insert(key, ret[k][1])
+        return ret
+
+    # Graph Color the CxG subgraphs of Connected Sets, starting from a previous coloring
+    def color_css_cxgs(self, cxgs, parallel=True, warm=None):
+        """
+        With a warm start, the CxGs are colored by eliminating the highest color classes of the given assignment
+        (gaa_graph_coloring.reduce_colors), e.g. of a lower threshold when escalating. The CxGs of the sets still
+        unsatisfied are also colored from scratch, and the coloring with fewer colors is kept for each CxG.
+
+        Input:
+            cxgs:       CxG objects of each Connected Set
+                :type cxgs: List[List[CxG]]
+
+            parallel:   use the process pool, False to color all in the current process
+                :type parallel: bool
+
+            warm:       color assignment valid for the edges of the sets (any threshold not above theirs),
+                        None to color from scratch
+                :type warm: Dict[str: int]
+
+        Returns:
+            chromatic_number, color_assignment of each CxG of each set
+                :type return: List[List[Tuple[int, Dict[str: int]]]]
+        """
+        flat = [cxg for item in cxgs for cxg in item]
+        for cxg in flat:
+            cxg.set_warm_start(warm)
+        ret = self.color_cxgs(flat, parallel=parallel)
+        if warm is None:
+            return self.split_by_sets(ret, cxgs)
+
+        # Color the CxGs of the unsatisfied sets from scratch
+        cold = []
+        for positions in self.split_by_sets(range(len(flat)), cxgs):
+            if sum([ret[k][0] for k in positions]) > len(self.channels):
+                cold.extend(positions)
+        for k in cold:
+            flat[k].set_warm_start(None)
+        for k, item in zip(cold, self.color_cxgs([flat[k] for k in cold], parallel=parallel)):
+            if item[0] < ret[k][0]:
+                ret[k] = item
+        return self.split_by_sets(ret, cxgs)
+
+    # Split the results of CxGs by their Connected Sets
+    @staticmethod
+    def split_by_sets(ret, cxgs):
+        """
+        :type ret: List    # one item for each CxG of all sets
+        :type cxgs: List[List[CxG]]
+        :return: the items of each set
+        """
+        position = 0
+        result = []
+        for item in cxgs:
+            result.append(ret[position: position + len(item)])
+            position += len(item)
+        return result
+
+    # Get the process pool (started on first use)
+    def get_pool(self, attached=False):
+        """
+        The workers are forked with this SAS attached (see attach_sas)
+
+        Input:
+            attached:   the tasks use the SAS of the workers, restart the pool if the SAS changed since it started
+                :type attached: bool
+
+        :return: multiprocessing.pool.Pool
+        """
+        if attached and self.pool is not None and self.pool_state != self.get_pool_state():
+            self.close_pool()
+        if self.pool is None:
+            self.pool = mp.Pool(initializer=attach_sas, initargs=(self,))
+            self.pool_state = self.get_pool_state()
+        return self.pool
+
+    # Get the state of the SAS used by the escalation of Connected Sets
+    def get_pool_state(self):
+        """
+        :return: Edge Weight Table (and its version), available channels, coloring and CxG of each CBSD
+        :type return: tuple
+        """
+        return (id(self.ew_table), self.ew_table.version, tuple(sorted(self.channels)), self.coloring,
+                tuple(sorted((cbsd_id, cbsd.CxG, self.positions.get(cbsd_id))
+                             for cbsd_id, cbsd in self.cbsd_index.items())))
+
+    # Stop the process pool
+    def close_pool(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+            self.pool_state = None
+
+    # Use the SAS in a with statement to stop the process pool at the end (e.g. of a series of recolor_cbsd)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_pool()
+        return False
+
+    # Update a Connected Set with the coloring of its CxGs
+    def set_cs_coloring(self, target_cs, ret):
+        """
+        Input:
+            target_cs:  Target Connected Set
+                :type target_cs: dict
 
-        # Graph Color each CxG in parallel:
-        p = mp.Pool()
-        ret = p.map(color_cxg, cxgs)    # type: List[int, Dict[str: int]]
-        p.terminate()
+            ret:        chromatic_number, color_assignment of each CxG of the set
+                :type ret: List[Tuple[int, Dict[str: int]]]
+
+        Returns:
+            colored connected set
+        """
+        members = target_cs.get("members")      # type: dict
 
         # Fetch chromatic numbers and color_assignments from the result
         chromatic_numbers, color_assignments = zip(*ret)
@@ -570,7 +1366,7 @@ class SAS:
             members = cs.get("members")     # type: dict    # Color Assignment
             chs_per_color = int(len(available_channels) / cn)        # number of channels per color
 
-            member_objs = [x for x in self.CBSDs if x.id in members.keys()]
+            member_objs = [self.cbsd_index.get(x) for x in members.keys() if x in self.cbsd_index]
             for cbsd_obj in member_objs:
                 color = members.get(cbsd_obj.id)
 
@@ -626,12 +1422,10 @@ class SAS:
         :return: str
         """
         content = "# " + self.propagation + "\n"    # First line indicates the propagation model used
-        for pair in self.ew_table.keys():
-            line = ""
-            for n in pair:
-                line += str(n) + ", "
-            line += str(self.ew_table[pair]) + "\n"
-            content += line
+        ids = self.ew_table.ids
+        rows, cols, ews = self.ew_table.get_edges()
+        content += "".join([str(ids[i]) + ", " + str(ids[j]) + ", " + format_ew(ew) + "\n"
+                            for i, j, ew in zip(rows, cols, ews)])
         return content
 
     # Export CBSDs status to the File
@@ -655,6 +1449,7 @@ class SAS:
                 <filename>.ewt      Edge Weight Table
                 <filename>.cvg      CBSD Coverage Map (area coordination only)
                 <filename>.area     Area info with grid coordinates
+                <filename>.lnk      Link losses between CBSDs (point coordination only)
         """
         # CBSD states
         cbsd_content = self.get_cbsd_content()
@@ -675,15 +1470,18 @@ class SAS:
         outfile2 = filename + ".ewt"
         outfile3 = filename + ".cvg"
         outfile4 = filename + ".area"
+        outfile5 = filename + ".lnk"
         while os.path.exists(outfile1)\
                  or os.path.exists(outfile2)\
                  or os.path.exists(outfile3)\
-                 or os.path.exists(outfile4):
+                 or os.path.exists(outfile4)\
+                 or os.path.exists(outfile5):
             index += 1
             outfile1 = filename + "-" + str(index) + ".cbsd"
             outfile2 = filename + "-" + str(index) + ".ewt"
             outfile3 = filename + "-" + str(index) + ".cvg"
             outfile4 = filename + "-" + str(index) + ".area"
+            outfile5 = filename + "-" + str(index) + ".lnk"
 
         # Store CBSD data
         f = open(outfile1, "w")
@@ -702,6 +1500,10 @@ class SAS:
             # Store area data
             f = open(outfile4, "w")
             json.dump(self.grids, f)
+        else:
+            # Store link losses
+            f = open(outfile5, "w")
+            json.dump(self.link_loss.get_content(), f)
 
     # Import CBSDs status from the file
     def import_states(self, input_file):
@@ -724,6 +1526,8 @@ class SAS:
                 <filename>.ewt      Edge Weight Table
                 <filename>.cvg      CBSD Coverage Map (area coordination only)
                 <filename>.area     Area info with grid coordinates
+                <filename>.lnk      Link losses between CBSDs (point coordination only),
+                                    computed again if not exists
         """
 
         # remove extension:
@@ -743,6 +1547,7 @@ class SAS:
         ewt_file = fname + ".ewt"
         cvg_file = fname + ".cvg"
         area_file = fname + ".area"
+        lnk_file = fname + ".lnk"
 
         # try to import CBSD first
         if os.path.exists(cbsd_file):
@@ -765,7 +1570,7 @@ class SAS:
                 cbsd_obj.set_state(tx_power=cbsd_item.get("tx_power"),
                                    cxg_id=cbsd_item.get("CxG")
                                    )
-                self.CBSDs.add(cbsd_obj)
+                self.index_cbsd(cbsd_obj)
 
             # try to import Edge Weight Table
             if os.path.exists(ewt_file):
@@ -773,10 +1578,12 @@ class SAS:
                 f = open(ewt_file)
                 self.propagation = f.readline()[2:].rstrip()
                 f.close()
+                self.link_loss = LinkLoss(self.propagation)
 
                 # Read the rest of the ewt file for "pair: ew"
                 p1s, p2s, ews = np.loadtxt(ewt_file, dtype="int, int, float", delimiter=', ', comments="#", unpack=True)
-                self.ew_table = dict(zip([frozenset((str(i), str(j))) for i, j in zip(p1s, p2s)], ews))
+                self.ew_table = EdgeWeightTable.from_edges(np.atleast_1d(p1s).astype(str), np.atleast_1d(p2s).astype(str),
+                                                           np.atleast_1d(ews))
 
             if os.path.exists(cvg_file):
                 # Read the cvg file for (cbsd; coverage_map)
@@ -793,6 +1600,13 @@ class SAS:
                     gr = json.load(f)
                 self.grids = {int(k): v for k, v in gr.items()}         # Ensure use int keys (grid_id)
 
+            # try to import link losses, needed by point coordination (e.g. add_cbsd and the evaluation)
+            if os.path.exists(lnk_file):
+                with open(lnk_file) as f:
+                    self.link_loss.set_content(json.load(f), self.CBSDs)
+            elif self.coordination != "area" and os.path.exists(ewt_file):
+                self.link_loss.update(self.CBSDs)
+
     # Import Graph Coloring Result from the file
     def import_cs(self, input_file):
         """
@@ -897,46 +1711,37 @@ class SAS:
 
         """
 
-        # Find effective edges based on given edge threshold
-        effective_edges = {k for k in self.ew_table.keys()
-                           if self.ew_table.get(k) > et
-                           }
+        # Edges between the managed CBSDs, with the CxG of both ends
+        ids = self.ew_table.ids
+        cxgs = {cbsd_id: cbsd.CxG for cbsd_id, cbsd in self.cbsd_index.items()}
+        rows, cols, ews = self.ew_table.get_edges(cxgs.keys())
+        cxg_rows = np.array([cxgs.get(ids[i]) for i in rows])
+        cxg_cols = np.array([cxgs.get(ids[j]) for j in cols])
 
-        # Initialize neighbor list for every involved CBSD
-        neighbors = {}
-        for cbsd in self.CBSDs:
-            neighbors[cbsd.id] = set()
+        # Initialize neighbor list (effective edges, ew > et)
+        # and potential neighbor list (inter-cxg edges whose ew <= threshold, ignored but existing interference)
+        neighbors = {cbsd_id: set() for cbsd_id in self.cbsd_index}
+        potential_neighbors = {cbsd_id: set() for cbsd_id in self.cbsd_index}
 
         # For the CBSD pair in every edge, add each other as the neighbor
-        for key in effective_edges:
-            tmp = list(key)
-            neighbors[tmp[0]].add(tmp[1])
-            neighbors[tmp[1]].add(tmp[0])
+        effective = ews > np.float32(et)
+        potential = ~effective & (cxg_rows != cxg_cols)
+        for i, j in zip(rows[effective], cols[effective]):
+            neighbors[ids[i]].add(ids[j])
+            neighbors[ids[j]].add(ids[i])
+        for i, j in zip(rows[potential], cols[potential]):
+            potential_neighbors[ids[i]].add(ids[j])
+            potential_neighbors[ids[j]].add(ids[i])
 
         # Create empty dict to return
         ret = {}
 
-        for each_cbsd in self.CBSDs:
+        for cbsd_id, cxg_id in cxgs.items():
             # find all distinct CxGs the selected cbsd and its neighbors belong to
-            cluster_cxg = {nb_cbsd.CxG for nb_cbsd in self.CBSDs
-                           if nb_cbsd.id in neighbors[each_cbsd.id]}
-            cluster_cxg.add(each_cbsd.CxG)
-
-            # find all inter-cxg pairs of the current cbsd
-            inter_cxg_pairs = [frozenset((each_cbsd.id, x.id)) for x in self.CBSDs if x.CxG != each_cbsd.CxG]
-
-            # Find all inter-cxg pairs whose ew <= threshold (ignored but existing interference)
-            potential_ix_pairs = [k for k in set(inter_cxg_pairs).intersection(self.ew_table.keys())
-                                  if self.ew_table.get(k) <= et
-                                  ]
-
-            # Find all other end of the above potential pairs
-            potential_neighbors = {each_cbsd.id}
-            for each_pair in potential_ix_pairs:
-                potential_neighbors.update(each_pair)
-            potential_neighbors.remove(each_cbsd.id)
+            cluster_cxg = {cxgs.get(nb_id) for nb_id in neighbors[cbsd_id]}
+            cluster_cxg.add(cxg_id)
 
             # update the dict to return
-            ret[each_cbsd.id] = (len(cluster_cxg), potential_neighbors)
+            ret[cbsd_id] = (len(cluster_cxg), potential_neighbors[cbsd_id])
 
         return ret
@@ -0,0 +1,149 @@
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+from gaa_cbsd import CBSD
+from typing import List
+
+# Layout of each row of the CBSD parameter table,
+# strings are indexes into the lookup tables of the store (meta.json), no_string for None
+cbsd_type = np.dtype([("id", "<i4"), ("latitude", "<f8"), ("longitude", "<f8"), ("height", "<f8"),
+                      ("power", "<f8"), ("power_max", "<f8"), ("indoor", "?"), ("region_type", "<i4"), ("cat", "<i4")])
+no_string = -1      # index of None in the string fields
+
+_store = None   # type: SharedStore    # store attached by the current (worker) process
+
+
+# Shared Store for multiprocessing
+class SharedStore(object):
+    """
+    Grid coordinates, CBSD parameters, the path loss matrix (CBSD x grid) and a result buffer,
+    kept in memory-mapped files of a temporary directory.
+
+    The parent process creates the store, workers attach once (pool initializer) and address
+    CBSDs and grids by integer index. Workers write their results into the shared buffers,
+    so neither the inputs nor the results are pickled per task.
+    """
+    def __init__(self, directory, mode="r+"):
+        """
+        Attach to an existing store
+
+        Input:
+            directory:  directory of the store
+                :type directory: str
+
+            mode:       mode of the memory maps ("r+", "r")
+                :type mode: str
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.num_cbsds = meta.get("num_cbsds")
+        self.num_grids = meta.get("num_grids")
+        self.num_results = meta.get("num_results")
+        self.strings = meta.get("strings")      # type: List[str]   # lookup table of the string fields
+
+        self.cbsds = self.open("cbsds.dat", cbsd_type, mode, (self.num_cbsds,))
+        self.grids = self.open("grids.dat", np.float64, mode, (self.num_grids, 2))
+        self.losses = self.open("losses.dat", np.float32, mode, (self.num_cbsds, self.num_grids))
+        self.results = self.open("results.dat", np.float64, mode, (self.num_results,))
+
+        self.cache = {}     # type: Dict[int: CBSD]     # CBSD objects rebuilt from the parameter table
+
+    # Map a file of the store, empty arrays have no file
+    def open(self, name, dtype, mode, shape):
+        if np.prod(shape) == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, name), dtype=dtype, mode=mode, shape=shape)
+
+    # Create a store
+    @staticmethod
+    def create(cbsds, coordinates=None, num_results=0):
+        """
+        Input:
+            cbsds:          CBSDs, the position in the list is the index of the CBSD
+                :type cbsds: List[CBSD]
+
+            coordinates:    (lat, lon) of each grid, in the order of grid index. None if no grid is needed
+                :type coordinates: np.ndarray[float]    # shape (n, 2)
+
+            num_results:    size of the result buffer
+                :type num_results: int
+
+        Returns:
+            SharedStore, the loss matrix is filled with NaN and the result buffer with 0
+        """
+        directory = tempfile.mkdtemp(prefix="gaa_shared_")
+        coordinates = np.zeros((0, 2)) if coordinates is None else np.asarray(coordinates, dtype=float)
+
+        # Lookup table of the ids, region types and categories (strings of any length)
+        strings = sorted({value for cbsd in cbsds for value in (cbsd.id, cbsd.region_type, cbsd.antenna_cat)
+                          if value is not None})
+        meta = {"num_cbsds": len(cbsds), "num_grids": len(coordinates), "num_results": int(num_results),
+                "strings": strings}
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        # Allocate the files
+        for name, itemsize in [("cbsds.dat", cbsd_type.itemsize * len(cbsds)),
+                               ("grids.dat", 16 * len(coordinates)),
+                               ("losses.dat", 4 * len(cbsds) * len(coordinates)),
+                               ("results.dat", 8 * int(num_results))]:
+            if itemsize > 0:
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.truncate(itemsize)
+
+        store = SharedStore(directory)
+        position = {value: k for k, value in enumerate(strings)}
+        for i, cbsd in enumerate(cbsds):
+            store.cbsds[i] = (position.get(cbsd.id, no_string), cbsd.latitude, cbsd.longitude, cbsd.height,
+                              cbsd.TxPower, cbsd.TxPowerMax, bool(cbsd.indoor),
+                              position.get(cbsd.region_type, no_string), position.get(cbsd.antenna_cat, no_string))
+        store.grids[:] = coordinates
+        store.losses[:] = np.nan
+        return store
+
+    # Get the CBSD object of an index (parameters only, no coverage)
+    def get_cbsd(self, i):
+        """
+        :type i: int
+        :return: CBSD
+        """
+        if i not in self.cache:
+            row = self.cbsds[i]
+            cbsd = CBSD(self.get_string(row["id"]), float(row["latitude"]), float(row["longitude"]),
+                        float(row["height"]), float(row["power_max"]), self.get_string(row["region_type"]),
+                        bool(row["indoor"]), self.get_string(row["cat"]))
+            cbsd.set_power(float(row["power"]))
+            self.cache[i] = cbsd
+        return self.cache.get(i)
+
+    # Get the string of an index of the lookup table
+    def get_string(self, k):
+        """
+        :type k: int
+        :return: the string, None for no_string
+        :type return: str
+        """
+        return None if k == no_string else str(self.strings[k])
+
+    # Remove the store
+    def close(self):
+        self.cbsds = self.grids = self.losses = self.results = None
+        self.cache = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Pool initializer, attach the worker process to a store
+def attach(directory):
+    global _store
+    _store = SharedStore(directory)
+
+
+# Get the store attached by the current process
+def get_store():
+    """
+    :return: SharedStore
+    """
+    return _store
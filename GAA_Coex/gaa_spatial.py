@@ -0,0 +1,224 @@
+import constant
+import geopy.distance
+import numpy as np
+import propagation_model.free_space as fs
+from typing import Dict, List, Set, Tuple
+
+no_edge_distance = constant.no_edge_distance   # kilometer, pairs beyond this distance are not generated
+pair_chunk_size = constant.ew_chunk_size    # number of pairs yielded at once
+pair_block_size = 2000000   # maximum number of distances computed at once
+
+
+# Get the cube of each location
+def get_cubes(lats, lons, cell):
+    """
+    Input:
+        lats, lons: coordinates of the locations
+        cell:       kilometer, side of the cubes
+
+    Returns:
+        np.ndarray[int] of shape (n, 3)
+    """
+    lat, lon = np.radians(lats), np.radians(lons)
+    xyz = geopy.distance.EARTH_RADIUS * np.column_stack((np.cos(lat) * np.cos(lon),
+                                                         np.cos(lat) * np.sin(lon),
+                                                         np.sin(lat)))
+    return np.floor(xyz / cell).astype(np.int64)
+
+
+# Get the side of the cubes for a cutoff distance: its chord
+def get_cell(cutoff):
+    radius = geopy.distance.EARTH_RADIUS
+    return 2 * radius * np.sin(min(cutoff / (2.0 * radius), np.pi / 2))
+
+
+# Spatial Index of CBSD locations
+class SpatialIndex(object):
+    """
+    Grid-bucket hash of locations for finding the pairs (or neighbors) within a cutoff distance.
+
+    Locations are projected to 3D (Earth-centered) coordinates, where the straight-line (chord) distance
+    grows with the great-circle distance. The space is divided into cubes whose side is the chord of the cutoff,
+    so two locations within the cutoff are always in the same or adjacent (26 neighbors) cubes.
+    Works the same at any latitude and across the date line.
+    """
+    def __init__(self, lats, lons, cutoff=no_edge_distance):
+        """
+        Input:
+            lats, lons:     coordinates of the locations, the position in the list is the index of the location
+                :type lats: List[float]
+                :type lons: List[float]
+
+            cutoff:         kilometer, pairs at this distance or farther are not in range
+                :type cutoff: float
+        """
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.cutoff = cutoff
+
+        # Side of the cubes: chord of the cutoff distance
+        self.cell = get_cell(cutoff)
+
+        # Cube of each location
+        self.keys = self.get_keys(self.lats, self.lons)
+
+        # Buckets {cube: indexes of the locations in the cube (ascending)}
+        self.buckets = {}   # type: Dict[Tuple[int, int, int]: np.ndarray]
+        if len(self.keys) > 0:
+            order = np.lexsort(self.keys.T[::-1])
+            cubes, starts = np.unique(self.keys[order], axis=0, return_index=True)
+            for cube, members in zip(cubes, np.split(order, starts[1:])):
+                self.buckets[tuple(cube)] = np.sort(members)
+
+    # Get the cube of each location
+    def get_keys(self, lats, lons):
+        """
+        :return: np.ndarray[int] of shape (n, 3)
+        """
+        return get_cubes(lats, lons, self.cell)
+
+    # Get the adjacent cubes (including itself)
+    @staticmethod
+    def get_adjacent(cube):
+        return [(cube[0] + dx, cube[1] + dy, cube[2] + dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+    # Get all pairs within the cutoff distance, lazily in chunks
+    def get_pairs(self, chunk_size=pair_chunk_size):
+        """
+        Generate the index pairs (i < j) of the locations within the cutoff distance.
+        Only locations in the same or adjacent cubes are compared. The order of the pairs is deterministic.
+
+        Input:
+            chunk_size: number of pairs per chunk (only the last chunk may be smaller)
+                :type chunk_size: int
+
+        Returns:
+            Generator of (rows, cols): index arrays of the pairs in the chunk
+                :type return: Iterator[Tuple[np.ndarray[int], np.ndarray[int]]]
+        """
+        rows, cols, count = [], [], 0
+        for cube in sorted(self.buckets.keys()):
+            members = self.buckets.get(cube)
+
+            # Compare with itself and the adjacent cubes after it (each pair of cubes once)
+            for other in self.get_adjacent(cube):
+                if other < cube or other not in self.buckets:
+                    continue
+                others = self.buckets.get(other)
+
+                for i, j in self.get_pairs_between(members, others, same=(other == cube)):
+                    rows.append(i)
+                    cols.append(j)
+                    count += len(i)
+                    while count >= chunk_size:
+                        rows, cols = np.concatenate(rows), np.concatenate(cols)
+                        yield rows[:chunk_size], cols[:chunk_size]
+                        rows, cols, count = [rows[chunk_size:]], [cols[chunk_size:]], count - chunk_size
+
+        if count > 0:
+            yield np.concatenate(rows), np.concatenate(cols)
+
+    # Get the pairs within the cutoff distance between two groups of locations
+    def get_pairs_between(self, members, others, same=False):
+        """
+        Input:
+            members, others:    indexes of the locations of both groups
+                :type members: np.ndarray[int]
+                :type others: np.ndarray[int]
+
+            same:   True if both groups are the same (only pairs i < j are returned)
+                :type same: bool
+
+        Returns:
+            Generator of (rows, cols) with rows < cols, in blocks of at most pair_block_size distances
+        """
+        block = max(1, pair_block_size // max(len(others), 1))
+        for start in range(0, len(members), block):
+            rows = members[start: start + block]
+            distance = fs.get_distance_array(self.lats[rows, None], self.lons[rows, None],
+                                             self.lats[None, others], self.lons[None, others])
+            bi, bj = np.nonzero(distance < self.cutoff)
+            i, j = rows[bi], others[bj]
+            keep = i < j if same else i != j
+            yield np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep])
+
+    # Get the locations within the cutoff distance of a location
+    def get_neighbors(self, lat, lon):
+        """
+        Input:
+            lat, lon:   coordinate of the location (not necessarily in the index)
+                :type lat: float
+                :type lon: float
+
+        Returns:
+            indexes of the locations within the cutoff distance (ascending)
+            :type return: np.ndarray[int]
+        """
+        cube = tuple(self.get_keys(np.array([lat]), np.array([lon]))[0])
+        candidates = [self.buckets.get(other) for other in self.get_adjacent(cube) if other in self.buckets]
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=int)
+        candidates = np.sort(np.concatenate(candidates))
+        distance = fs.get_distance_array(lat, lon, self.lats[candidates], self.lons[candidates])
+        return candidates[distance < self.cutoff]
+
+
+# Spatial Index of CBSD locations that changes with the CBSDs
+class DynamicSpatialIndex(object):
+    """
+    The same cubes as SpatialIndex, keyed by id, so locations are added, moved and removed one at a time
+    """
+    def __init__(self, cutoff=no_edge_distance):
+        """
+        Input:
+            cutoff:     kilometer, locations at this distance or farther are not in range
+                :type cutoff: float
+        """
+        self.cutoff = cutoff
+        self.cell = get_cell(cutoff)
+        self.locations = {}     # type: Dict[str: tuple]    # (lat, lon, cube) of each id
+        self.buckets = {}       # type: Dict[Tuple[int, int, int]: Set[str]]   # ids in each cube
+
+    # Add a location, or move it if the id exists
+    def add(self, key, lat, lon):
+        """
+        :type key: str
+        :type lat: float
+        :type lon: float
+        """
+        self.remove(key)
+        cube = tuple(get_cubes(np.array([lat]), np.array([lon]), self.cell)[0].tolist())
+        self.locations[key] = (lat, lon, cube)
+        self.buckets.setdefault(cube, set()).add(key)
+
+    # Remove a location
+    def remove(self, key):
+        """
+        :type key: str
+        """
+        if key not in self.locations:
+            return
+        cube = self.locations.pop(key)[2]
+        self.buckets.get(cube).discard(key)
+        if len(self.buckets.get(cube)) == 0:
+            self.buckets.pop(cube)
+
+    # Get the ids within the cutoff distance of a location
+    def get_neighbors(self, lat, lon):
+        """
+        Input:
+            lat, lon:   coordinate of the location (not necessarily in the index)
+                :type lat: float
+                :type lon: float
+
+        Returns:
+            ids of the locations within the cutoff distance (sorted)
+            :type return: List[str]
+        """
+        cube = tuple(get_cubes(np.array([lat]), np.array([lon]), self.cell)[0].tolist())
+        candidates = sorted(key for other in SpatialIndex.get_adjacent(cube) for key in self.buckets.get(other, ()))
+        if len(candidates) == 0:
+            return []
+        distance = fs.get_distance_array(lat, lon, np.array([self.locations[key][0] for key in candidates]),
+                                         np.array([self.locations[key][1] for key in candidates]))
+        return [key for key, d in zip(candidates, distance) if d < self.cutoff]
@@ -6,6 +6,7 @@ import numpy as np
 I_max = constant.I_max      # Upper bound for calculating Point Interference Coordination
 I_min = constant.I_min      # Lower bound for calculating Point Interference Coordination
 rx_power_min = constant.rx_power_min    # minimum rx power for calculating IM in area interference coordination
+no_edge_distance = constant.no_edge_distance    # kilometer, edge is not considered for distance greater than this
 tx_frequency = constant.lb_channels_frequency   # signal frequency for calculating propagation
 
 
@@ -71,6 +72,73 @@ def get_distance(cbsd1, cbsd2):
     return geopy.distance.vincenty(coodinate1, coodinate2).km
 
 
+# Calculate distances (km) from one location to arrays of locations
+def get_distance_array(lat, lon, lats, lons):
+    """
+    Vectorized great-circle (haversine) distance, used where a Vincenty call per point is too slow.
+    Inputs broadcast against each other as in NumPy.
+
+    :param lat: latitude(s) of the origin
+    :param lon: longitude(s) of the origin
+    :param lats: latitudes of the destinations
+    :param lons: longitudes of the destinations
+    :return: distances in km, np.ndarray
+    """
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * geopy.distance.EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+# Calculate initial bearings (degree, clockwise from north) from one location to arrays of locations
+def get_bearing_array(lat, lon, lats, lons):
+    lat1, lat2 = np.radians(lat), np.radians(lats)
+    dlon = np.radians(lons) - np.radians(lon)
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+# Calculate destinations from one location with arrays of bearings (degree) and distances (km)
+def get_destination_array(lat, lon, bearings, distances):
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    theta = np.radians(bearings)
+    delta = np.asarray(distances, dtype=float) / geopy.distance.EARTH_RADIUS
+    lat2 = np.arcsin(np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(theta))
+    lon2 = lon1 + np.arctan2(np.sin(theta) * np.sin(delta) * np.cos(lat1), np.cos(delta) - np.sin(lat1) * np.sin(lat2))
+    return np.degrees(lat2), np.degrees(lon2)
+
+
+# Calculate propagation loss with given distance (vectorized)
+def get_loss_km_mhz(freq, distance):
+    return np.log10(np.maximum(distance, 1e-3) * freq) * 20 + 32.44
+
+
+# Get the propagation loss from a cbsd to a batch of locations
+def get_loss_batch(cbsd, lats, lons, heights=None):
+    """
+    This Method returns the free space propagation loss of a CBSD to a batch of locations.
+    Heights are accepted for API compatibility with the other models, but free space ignores them.
+
+    Input:
+            cbsd:  a cbsd object (the transmitter)
+                :type cbsd CBSD
+
+            lats, lons:  latitudes and longitudes of the receiver locations
+                :type lats  np.ndarray[float]
+                :type lons  np.ndarray[float]
+
+            heights:  AGL of the receiver locations (not used)
+                :type heights   np.ndarray[float]
+    Returns:
+            Propagation loss (dB) at each location, in the same order as the input
+                :type return np.ndarray[float]
+    """
+    distance = get_distance_array(cbsd.latitude, cbsd.longitude,
+                                  np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+    return get_loss_km_mhz(tx_frequency, distance)
+
+
 # Calculate transmit distance with given propagation loss
 def get_distance_km_mhz(freq, tx, rx):
     pl = tx - rx
@@ -107,3 +175,111 @@ def get_overlap(R, r, d):
     beta = np.arccos((d2 + R2 - r2) / (2.0*d*R))
     result = r2 * alpha + R2 * beta - R * np.sin(beta) * d
     return result
+
+
+# Vectorized version of get_overlap
+def get_overlap_array(R, r, d):
+    """
+    Calculate overlap areas of pairs of circles, element-wise on arrays
+
+    :param R: Radius of the First Circles
+    :param r: Radius of the Second Circles
+    :param d: Distance between two Centroids
+    :return: Overlap Areas, np.ndarray
+    """
+    R, r, d = np.broadcast_arrays(np.asarray(R, dtype=float), np.asarray(r, dtype=float), np.asarray(d, dtype=float))
+    r2, R2, d2 = r**2, R**2, d**2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = np.arccos(np.clip((d2 + r2 - R2) / (2*d*r), -1, 1))
+        beta = np.arccos(np.clip((d2 + R2 - r2) / (2*d*R), -1, 1))
+        result = r2 * alpha + R2 * beta - R * np.sin(beta) * d
+
+    # One circle is entirely enclosed in the other.
+    result = np.where(d <= np.abs(R - r), np.pi * np.minimum(R, r)**2, result)
+    # The circles don't overlap at all.
+    result = np.where(d >= r + R, 0, result)
+    return result
+
+
+# Get Edge Weights from the distances and transmitter powers of pairs of CBSDs, element-wise on arrays
+def get_ew_distance(d, power1, power2, ic):
+    """
+    :param d: distances (km) between the CBSDs of each pair, within no_edge_distance
+    :param power1: transmitter power of the first CBSDs
+    :param power2: transmitter power of the second CBSDs
+    :param ic: interference coordination  "area", "point"
+    :return: edge weights, np.ndarray
+    """
+    if ic == "area":
+        # max(IM_1, IM_2) = overlap / smaller coverage area
+        radius1 = get_distance_km_mhz(tx_frequency, power1, rx=rx_power_min)
+        radius2 = get_distance_km_mhz(tx_frequency, power2, rx=rx_power_min)
+        overlap = get_overlap_array(radius1, radius2, d)
+        return overlap / (np.pi * np.minimum(radius1, radius2)**2)
+    else:
+        # max(IM_1, IM_2) is given by the stronger interferer
+        I = np.maximum(power1, power2) - get_loss_km_mhz(tx_frequency, d)
+        return np.clip((I - I_min) / float(I_max - I_min), 0, 1.0)
+
+
+# Get Edge Weights of all pairs of CBSDs in matrix mode
+def get_ew_edges(lats, lons, powers, ic, block_size=None):
+    """
+    This Method returns the edges of all pairs of CBSDs using Free Space Propagation,
+    computed block by block as distance / edge weight matrices instead of per pair.
+
+    Input:
+            lats, lons:     coordinates of the CBSDs
+                :type lats: np.ndarray[float]
+                :type lons: np.ndarray[float]
+
+            powers:     transmitter power of the CBSDs
+                :type powers: np.ndarray[float]
+
+            ic:     interference coordination  "area", "point"
+                :type ic:    str
+
+            block_size:     number of rows of the matrix computed at once, default keeps each block ~2e7 elements
+                :type block_size:   int
+
+    Returns:
+            rows, cols, ews: indexes (rows < cols) of the CBSD pairs with ew > 0, and the edge weights
+                :type return: Tuple[np.ndarray[int], np.ndarray[int], np.ndarray[float]]
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    powers = np.asarray(powers, dtype=float)
+    n = len(lats)
+    if block_size is None:
+        block_size = max(1, int(2e7) // max(n, 1))
+
+    # Radius and area of each CBSD's coverage
+    radius = get_distance_km_mhz(tx_frequency, powers, rx=rx_power_min)
+
+    rows, cols, ews = [], [], []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+
+        # Distance matrix of the block against the rest (upper triangle only)
+        distance = get_distance_array(lats[start:stop, None], lons[start:stop, None],
+                                      lats[None, start:], lons[None, start:])
+
+        # Candidate pairs (i < j) in range, for area coordination the coverage circles must also intersect
+        candidate = np.triu(distance < no_edge_distance, k=1)
+        if ic == "area":
+            candidate &= distance < radius[start:stop, None] + radius[None, start:]
+        bi, bj = np.nonzero(candidate)
+        i = bi + start
+        j = bj + start
+        ew = get_ew_distance(distance[bi, bj], powers[i], powers[j], ic)
+
+        # Keep only pairs with ew > 0
+        keep = ew > 0
+        rows.append(i[keep])
+        cols.append(j[keep])
+        ews.append(ew[keep])
+
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(ews)
@@ -1,11 +1,39 @@
 # This is the ITM Propagation Model
 import constant
+import numpy as np
 from reference_models.propagation import wf_itm
+import loss_cache
 
 I_max = constant.I_max                  # Upper bound for calculating Point Interference Coordination
 I_min = constant.I_min                  # Lower bound for calculating Point Interference Coordination
 rx_power_min = constant.rx_power_min    # minimum rx power for calculating IM in area interference coordination
 
+
+# Get the propagation loss of the link from a cbsd to a location
+def get_loss(cbsd, lat_rx, lon_rx, height_rx, reliability=0.5):
+    """
+    Call ITM Propagation Model, through the on-disk loss cache if enabled (constant.loss_cache_file)
+
+    Input:
+            cbsd:  the transmitter
+                :type cbsd CBSD
+
+            lat_rx, lon_rx, height_rx:  coordinate and AGL of the receiver
+
+            reliability:    reliability of the propagation model
+
+    Returns:
+            Propagation loss in dB, float
+    """
+    def calc():
+        return wf_itm.CalcItmPropagationLoss(cbsd.latitude, cbsd.longitude, cbsd.height,
+                                             lat_rx, lon_rx, height_rx,
+                                             cbsd_indoor=cbsd.indoor, reliability=reliability)[0]
+
+    return loss_cache.get_loss("itm", calc, cbsd.latitude, cbsd.longitude, cbsd.height, cbsd.indoor,
+                               cbsd.region_type, lat_rx, lon_rx, height_rx, reliability)
+
+
 # Get Edge Weight of the given pair of CBSDs under determined Interference Coordination
 def get_ew(cbsdpair, ic):
     """
@@ -42,7 +70,7 @@ def get_ew(cbsdpair, ic):
 
 
 # Calculate Interference Metric using Point Coordination
-def get_im_point(cbsd1, cbsd2):
+def get_im_point(cbsd1, cbsd2, loss=None):
     """
     Call ITM propagation model to calculate Interference Metric of CBSD1 that is interferred by CBSD2
     Using Point Coordination
@@ -54,16 +82,18 @@ def get_im_point(cbsd1, cbsd2):
             cbsd2:  CBSD object that is interferring (as noise).
                 :type cbsd2:    CBSD
 
+            loss:   known propagation loss from cbsd2 to cbsd1 (e.g. from the link loss matrix), optional
+                :type loss:     float
+
     Returns:
             Interference Metrics as float
     """
     # Call ITM Propagation Model to calculate signal loss from cbsd2 at the location of cbsd1
-    loss = wf_itm.CalcItmPropagationLoss(cbsd2.latitude, cbsd2.longitude, cbsd2.height,
-                                         cbsd1.latitude, cbsd1.longitude, cbsd1.height,
-                                         cbsd_indoor=cbsd2.indoor, reliability=0.5)
+    if loss is None:
+        loss = get_loss(cbsd2, cbsd1.latitude, cbsd1.longitude, cbsd1.height)
 
     # Calculate Signal Strength by substracting loss from the transmitter power
-    Ix = cbsd2.TxPower - loss[0]
+    Ix = cbsd2.TxPower - loss
 
     # Use Global I_min, I_max to calculate the Interference Metric
     if Ix < I_min:
@@ -91,16 +121,14 @@ def get_im_area(cbsd1, cbsd2):
             Interference Metrics as float
     """
     # Filter the grid that has signal strength no less than the minimum value (-96 by default)
-    effective_coverage_1 = {grid for grid in cbsd1.coverage.keys() if cbsd1.coverage.get(grid) >= rx_power_min}
-    effective_coverage_2 = {grid for grid in cbsd2.coverage.keys() if cbsd2.coverage.get(grid) >= rx_power_min}
+    size = max(len(cbsd1.coverage.array), len(cbsd2.coverage.array))
+    effective_coverage_1 = cbsd1.coverage.mask(rx_power_min, size)
+    effective_coverage_2 = cbsd2.coverage.mask(rx_power_min, size)
 
-    # Find the overlap grids
-    overlap = effective_coverage_1.intersection(effective_coverage_2)
-
-    # calculate the areas by counting the number of grids
-    area_1 = len(effective_coverage_1)
-    area_2 = len(effective_coverage_2)
-    area_overlap = len(overlap)
+    # calculate the areas by counting the number of grids (coverage maps are aligned to the grid order)
+    area_1 = np.count_nonzero(effective_coverage_1)
+    area_2 = np.count_nonzero(effective_coverage_2)
+    area_overlap = np.count_nonzero(effective_coverage_1 & effective_coverage_2)
 
     # By definition, return IM as the fraction of overlapped area in the coverage.
     # This prevents division by 0. area_1 = 0 exists when grid size is too high.
@@ -129,11 +157,41 @@ def get_rx_signal_point((cbsd, location)):
     height_rx = 0           # Default AGL of the Rx location is set to 0
 
     # call the method in wf_itm (itm model) to calculate the propagation loss from the CBSD to the location
-    loss = wf_itm.CalcItmPropagationLoss(cbsd.latitude, cbsd.longitude, cbsd.height,
-                                         lat_rx, lon_rx, height_rx,
-                                         cbsd_indoor=cbsd.indoor, reliability=0.5)
+    loss = get_loss(cbsd, lat_rx, lon_rx, height_rx)
 
     # Calculate Signal Strength by substracting loss from the transmitter power
-    Rx_Signal = cbsd.TxPower - loss[0]
+    Rx_Signal = cbsd.TxPower - loss
 
     return Rx_Signal
+
+
+# Get the propagation loss from a cbsd to a batch of locations
+def get_loss_batch(cbsd, lats, lons, heights=None):
+    """
+    This Method returns the propagation loss of a CBSD to a batch of locations using ITM Model
+    One call handles a whole block of receivers, so callers do not need to dispatch each location separately.
+
+    Input:
+            cbsd:  a cbsd object (the transmitter)
+                :type cbsd CBSD
+
+            lats, lons:  latitudes and longitudes of the receiver locations
+                :type lats  np.ndarray[float]
+                :type lons  np.ndarray[float]
+
+            heights:  AGL of the receiver locations, default 0 for all
+                :type heights   np.ndarray[float]
+    Returns:
+            Propagation loss (dB) at each location, in the same order as the input
+                :type return np.ndarray[float]
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    heights = np.zeros(len(lats)) if heights is None else np.asarray(heights, dtype=float)
+
+    losses = np.empty(len(lats))
+    for k, (lat_rx, lon_rx, height_rx) in enumerate(zip(lats, lons, heights)):
+        # call the method in wf_itm (itm model) to calculate the propagation loss from the CBSD to the location
+        losses[k] = get_loss(cbsd, lat_rx, lon_rx, height_rx)
+
+    return losses
@@ -0,0 +1,184 @@
+# On-disk Propagation Loss Cache, shared by all processes
+import os
+import fcntl
+import struct
+from contextlib import contextmanager
+import hashlib
+import numpy as np
+import constant
+
+# Layout of each record in the cache file
+record_type = np.dtype([("key", "<u8"), ("loss", "<f4"), ("stamp", "<u4")])
+
+_caches = {}    # type: Dict[Tuple[str, int]: LossCache]   # opened caches, by filename and process id
+
+
+class LossCache(object):
+    """
+    Content-addressed cache of propagation losses, stored in a memory-mapped file.
+
+    The file is a set-associative hash table of fixed size (slots), so its size is bounded.
+    When all ways of a set are used, the least recently used record of the set is evicted.
+    Every worker process maps the same file, writes are serialized with a lock file.
+    The lock belongs to the open file, so each process opens the lock file on its own (again after a fork).
+    Records are stamped with a shared counter (in the clock file), increased on every use.
+    """
+    def __init__(self, filename, slots=2**22, ways=8):
+        """
+        Input:
+            filename:   the cache file, created if not exists
+                :type filename: str
+
+            slots:      number of records of a new cache file (an existing file keeps its size)
+                :type slots: int
+
+            ways:       number of records per set
+                :type ways: int
+        """
+        self.filename = filename
+        self.lockname = filename + ".lock"
+        self.ways = ways
+
+        # Create the cache file if not exists
+        directory = os.path.dirname(filename)
+        if directory != "" and not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:     # created by another process
+                pass
+
+        self.lock = None
+        self.pid = None     # process that opened self.lock
+        with self.locked():
+            if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+                with open(filename, "wb") as f:
+                    f.truncate(int(slots) // ways * ways * record_type.itemsize)
+            if not os.path.exists(filename + ".clock") or os.path.getsize(filename + ".clock") == 0:
+                with open(filename + ".clock", "wb") as f:
+                    f.truncate(np.dtype("<u4").itemsize)
+
+        self.records = np.memmap(filename, dtype=record_type, mode="r+")
+        self.clock = np.memmap(filename + ".clock", dtype="<u4", mode="r+", shape=(1,))
+        self.sets = len(self.records) // ways
+
+        # Views of each field
+        self.keys = self.records["key"]
+        self.losses = self.records["loss"]
+        self.stamps = self.records["stamp"]
+
+    # Hold the lock of the cache file
+    @contextmanager
+    def locked(self):
+        if self.pid != os.getpid():
+            # A lock file opened before a fork would be shared with the parent, without mutual exclusion
+            self.lock = open(self.lockname, "a")
+            self.pid = os.getpid()
+        fcntl.flock(self.lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock, fcntl.LOCK_UN)
+
+    # Get the next stamp of the shared counter (with the lock held)
+    def tick(self):
+        self.clock[0] += 1
+        return int(self.clock[0])
+
+    # Get the key of a link
+    @staticmethod
+    def get_key(model, lat_tx, lon_tx, height_tx, indoor, region, lat_rx, lon_rx, height_rx, reliability):
+        content = "%s|%.7f|%.7f|%.2f|%d|%s|%.7f|%.7f|%.2f|%.4f" % (model, lat_tx, lon_tx, height_tx, bool(indoor),
+                                                               region, lat_rx, lon_rx, height_rx, reliability)
+        key = struct.unpack("<Q", hashlib.sha1(content).digest()[:8])[0]
+        return key if key != 0 else 1   # 0 is reserved for empty records
+
+    # Find the record of a key
+    def lookup(self, key):
+        """
+        :param key: key of the link
+        :return: cached loss, None if not cached
+        """
+        start = (key % self.sets) * self.ways
+        for slot in range(start, start + self.ways):
+            if self.keys[slot] == key:
+                loss = float(self.losses[slot])
+                # Verify the record has not been replaced during reading
+                if self.keys[slot] == key:
+                    with self.locked():
+                        if self.keys[slot] == key:
+                            self.stamps[slot] = self.tick()
+                    return loss
+        return None
+
+    # Insert a record
+    def insert(self, key, loss):
+        """
+        :param key: key of the link
+        :param loss: loss to cache
+        """
+        start = (key % self.sets) * self.ways
+        with self.locked():
+            # Use the record of the same key (anywhere in the set), otherwise an empty record,
+            # otherwise evict the least recently used one
+            ways = self.keys[start: start + self.ways]
+            matched = np.flatnonzero(ways == key)
+            if len(matched) == 0:
+                matched = np.flatnonzero(ways == 0)
+            slot = start + (int(matched[0]) if len(matched) > 0
+                            else int(np.argmin(self.stamps[start: start + self.ways])))
+
+            self.keys[slot] = 0         # Invalidate first, readers never see a partial record
+            self.losses[slot] = loss
+            self.stamps[slot] = self.tick()
+            self.keys[slot] = key
+
+    # Get the loss from the cache, or calculate and cache it
+    def get(self, key, calc):
+        """
+        :param key: key of the link
+        :param calc: function to calculate the loss if not cached
+        :return: loss
+        """
+        loss = self.lookup(key)
+        if loss is None:
+            loss = calc()
+            self.insert(key, loss)
+        return loss
+
+
+# Get the cache defined by constant.loss_cache_file
+def get_cache():
+    """
+    :return: LossCache of the current process, None if the cache is disabled
+    """
+    filename = constant.loss_cache_file
+    if filename is None:
+        return None
+    key = (filename, os.getpid())
+    if key not in _caches:
+        _caches[key] = LossCache(filename, slots=constant.loss_cache_slots)
+    return _caches[key]
+
+
+# Calculate a propagation loss through the cache
+def get_loss(model, calc, lat_tx, lon_tx, height_tx, indoor, region, lat_rx, lon_rx, height_rx, reliability=0.5):
+    """
+    Return the loss of the link from the cache if exists, otherwise call the propagation model.
+
+    Input:
+            model:      name of the propagation model ("itm", "hybrid")
+                :type model: str
+
+            calc:       function to call the propagation model, returns the loss in dB
+                :type calc: Callable[[], float]
+
+            the others: geometry of the link and the reliability, as the key of the cache
+
+    Returns:
+            loss in dB
+    """
+    cache = get_cache()
+    if cache is None:
+        return calc()
+    key = cache.get_key(model, lat_tx, lon_tx, height_tx, indoor, region, lat_rx, lon_rx, height_rx, reliability)
+    return cache.get(key, calc)
@@ -0,0 +1,67 @@
+import sys
+import time
+import constant
+import gaa_graph_coloring as gc
+from gaa_sas import SAS
+
+
+def benchmark(state_file, algorithms, thresholds):
+    """
+    Compare graph coloring algorithms on a saved scenario (.cbsd / .ewt)
+
+    Input:
+            state_file:     exported states without extension (see SAS.export_states)
+            algorithms:     names of the coloring algorithms (gaa_graph_coloring.algorithms)
+            thresholds:     fixed edge thresholds to color at
+
+    Returns:
+            List of dict, one for each algorithm:
+                max/total chromatic number and time at each fixed threshold,
+                number of Connected Sets, max threshold and time of graph_coloring_all_until_satisfied
+    """
+    report = []
+    for algorithm in algorithms:
+        mysas = SAS(coloring=algorithm)
+        mysas.import_states(state_file)
+        all_cbsd_ids = {cbsd.id for cbsd in mysas.CBSDs}
+
+        fixed = []
+        for th in thresholds:
+            start = time.time()
+            CSs = mysas.graph_coloring_at(all_cbsd_ids, th=th, parallel=False)
+            fixed.append({"threshold": th,
+                          "max_chromatic": max([cs.get("chromatic") for cs in CSs]) if len(CSs) > 0 else 0,
+                          "total_chromatic": sum([cs.get("chromatic") for cs in CSs]),
+                          "time": time.time() - start
+                          })
+
+        start = time.time()
+        mysas.graph_coloring_all_until_satisfied()
+        time_satisfied = time.time() - start
+
+        report.append({"algorithm": algorithm,
+                       "fixed": fixed,
+                       "num_cs": len(mysas.CSs),
+                       "max_threshold": max([cs.get("edge_threshold") for cs in mysas.CSs]) if len(mysas.CSs) > 0 else 0,
+                       "time_satisfied": time_satisfied
+                       })
+    return report
+
+
+if __name__ == '__main__':
+    # Time the coloring itself, not the coloring cache
+    constant.coloring_cache_size = 0
+    constant.coloring_cache_dir = None
+
+    state_files = sys.argv[1:] if len(sys.argv) > 1 else ["sameseed/ew/cxg_4/sd_50_both_hybrid"]
+
+    for state_file in state_files:
+        print state_file
+        for item in benchmark(state_file, sorted(gc.algorithms.keys()), thresholds=[0.0, 0.2, 0.4, 0.6, 0.8]):
+            print "{0:>14}".format(item["algorithm"]), \
+                "until satisfied: {0} CSs, max threshold {1:.2f}, {2:.2f}s".format(
+                    item["num_cs"], item["max_threshold"], item["time_satisfied"])
+            for fixed in item["fixed"]:
+                print "{0:>14}".format(""), "threshold {0:.1f}:".format(fixed["threshold"]), \
+                    "max chromatic", fixed["max_chromatic"], "total chromatic", fixed["total_chromatic"], \
+                    "time: {0:.3f}s".format(fixed["time"])
@@ -1,4 +1,5 @@
 import time
+import constant
 from gaa_sas import SAS
 
 
@@ -23,6 +24,9 @@ def ew(inputfile, outputfile):
 
 
 if __name__ == '__main__':
+    # Reuse propagation losses of identical links across runs
+    constant.loss_cache_file = "cache/propagation.loss"
+
     densities = [10]
     locations = ["sd"]
     cats = ["_both"]
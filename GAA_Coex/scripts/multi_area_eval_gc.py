@@ -1,4 +1,5 @@
 import time
+import constant
 from gaa_sas import SAS
 
 
@@ -25,6 +26,9 @@ def gc(inputfile, outputfile):
 
 
 if __name__ == '__main__':
+    # Reuse the colorings of identical CxG graphs across runs
+    constant.coloring_cache_dir = "cache/coloring"
+
     # densities = [3, 10, 30]
     # locations = ["vb", "sd"]
     # cats = ["_cata", "_both"]
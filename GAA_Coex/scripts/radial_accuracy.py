@@ -0,0 +1,85 @@
+import sys
+import time
+import numpy as np
+import constant
+import gaa_propagation as pm
+from gaa_sas import SAS
+
+min_rx = constant.rx_power_min
+
+
+def accuracy(infile, propagation, radial_counts, radial_steps, num_cbsds=5, grid_size=0.05):
+    """
+    Compare radial-sweep coverage with the per-point coverage for a few CBSDs of a scenario
+
+    Input:
+            infile:         scenario file (.list)
+            propagation:    "itm", "hybrid"
+            radial_counts:  numbers of radials to try
+            radial_steps:   steps (km) on the radials to try
+            num_cbsds:      number of CBSDs to compare
+            grid_size:      km
+
+    Returns:
+            List of dict, one for each (radial_count, radial_step):
+                mean/p95 absolute loss error (dB), coverage agreement, propagation calls and time of both modes
+    """
+    mysas = SAS(coordination="area", propagation=propagation)
+    mysas.load_CBSDs_file(infile, grid_size=grid_size)
+    cbsds = sorted(mysas.CBSDs, key=lambda x: x.id)[:num_cbsds]
+
+    grid_indexes = list(mysas.grids.keys())
+    coordinates = np.array([mysas.grids.get(g_index) for g_index in grid_indexes], dtype=float)
+
+    # Reference: per-point coverage
+    reference = []
+    calls_point = 0
+    start = time.time()
+    for cbsd in cbsds:
+        targets = np.flatnonzero(pm.get_grids_in_range(cbsd, coordinates))
+        losses = pm.get_loss_block((cbsd, coordinates[targets, 0], coordinates[targets, 1], propagation))
+        reference.append((targets, losses))
+        calls_point += len(targets)
+    time_point = time.time() - start
+
+    report = []
+    for count in radial_counts:
+        for step in radial_steps:
+            pm.radial_count = count
+            pm.radial_step = step
+
+            errors = []
+            agreement = []
+            calls_radial = 0
+            start = time.time()
+            for cbsd, (targets, losses) in zip(cbsds, reference):
+                radial_losses, calls = pm.get_loss_radial_sweep(cbsd, coordinates[targets], propagation)
+                calls_radial += calls
+                errors.extend(np.abs(radial_losses - losses))
+                agreement.extend((cbsd.TxPower - radial_losses >= min_rx) == (cbsd.TxPower - losses >= min_rx))
+            time_radial = time.time() - start
+
+            report.append({"radial_count": count,
+                           "radial_step": step,
+                           "mean_error_db": float(np.mean(errors)) if len(errors) > 0 else 0.0,
+                           "p95_error_db": float(np.percentile(errors, 95)) if len(errors) > 0 else 0.0,
+                           "coverage_agreement": float(np.mean(agreement)) if len(agreement) > 0 else 1.0,
+                           "calls_point": calls_point,
+                           "calls_radial": calls_radial,
+                           "time_point": time_point,
+                           "time_radial": time_radial
+                           })
+    return report
+
+
+if __name__ == '__main__':
+    infile = sys.argv[1] if len(sys.argv) > 1 else "sameseed/scene/vb_10_both.list"
+    propagation = sys.argv[2] if len(sys.argv) > 2 else "hybrid"
+
+    for item in accuracy(infile, propagation, radial_counts=[36, 72, 180, 360], radial_steps=[0.025, 0.05, 0.1]):
+        print "radials:", item["radial_count"], "step:", item["radial_step"], \
+            "mean error: {0:.2f} dB".format(item["mean_error_db"]), \
+            "p95 error: {0:.2f} dB".format(item["p95_error_db"]), \
+            "coverage agreement: {0:.4f}".format(item["coverage_agreement"]), \
+            "calls:", item["calls_radial"], "vs", item["calls_point"], \
+            "time: {0:.2f}s vs {1:.2f}s".format(item["time_radial"], item["time_point"])
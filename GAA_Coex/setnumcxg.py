@@ -20,7 +20,7 @@ def assign_cxg(filename):
         cxgs = np.random.choice(range(cxg_select), num_of_cbsds)
 
         for cbsd, cxg in zip(mysas.CBSDs, list(cxgs)):
-            cbsd.set_cxg(cxg)
+            mysas.set_cxg(cbsd.id, cxg)
 
         mysas.export_states(outfix + outfile)
 
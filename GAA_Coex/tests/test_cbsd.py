@@ -0,0 +1,25 @@
+import json
+import unittest
+import numpy as np
+from gaa_cbsd import CBSD
+from gaa_coverage import Coverage
+
+
+class TestCoverageContent(unittest.TestCase):
+    # Grids out of range (infinite loss) are omitted from the exported coverage, which stays standard JSON
+    def test_content_without_infinity(self):
+        cbsd = CBSD("a", 32.7, -117.1, 6.0, 30.0, "URBAN", False, "cata")
+        cbsd.set_loss(Coverage(np.array([100.0, np.inf, np.nan, 120.0])))
+        content = cbsd.get_coverage_content()
+        self.assertEqual(content, {1: cbsd.TxPower - 100.0, 4: cbsd.TxPower - 120.0})
+
+        text = json.dumps(content)
+        self.assertNotIn("Infinity", text)
+        restored = CBSD("a", 32.7, -117.1, 6.0, 30.0, "URBAN", False, "cata")
+        restored.set_coverage({int(k): v for k, v in json.loads(text).items()})
+        self.assertEqual(restored.coverage.keys(), [1, 4])
+        self.assertIsNone(restored.coverage.get(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
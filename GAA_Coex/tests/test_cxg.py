@@ -0,0 +1,41 @@
+import unittest
+import gaa_graph_coloring as gc
+from gaa_cxg import CxG
+
+
+# CxG of a 5-cycle
+def create_cxg(algorithm="exact"):
+    """
+    :return: CxG
+    """
+    cxg = CxG(0, algorithm)
+    cxg.add_cbsd(["a", "b", "c", "d", "e"])
+    cxg.edges = {frozenset(pair) for pair in [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e"), ("e", "a")]}
+    return cxg
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.saved = gc.exact_max_nodes, gc.exact_max_steps, gc.kempe_max_chain
+
+    def tearDown(self):
+        gc.exact_max_nodes, gc.exact_max_steps, gc.kempe_max_chain = self.saved
+
+    def test_same_problem(self):
+        self.assertEqual(create_cxg().get_fingerprint(), create_cxg().get_fingerprint())
+        self.assertNotEqual(create_cxg().get_fingerprint(), create_cxg("dsatur").get_fingerprint())
+
+    # Colorings computed under other limits of the search are not reused
+    def test_limits(self):
+        fingerprints = {create_cxg().get_fingerprint()}
+        gc.exact_max_nodes = 3
+        fingerprints.add(create_cxg().get_fingerprint())
+        gc.exact_max_steps = 10
+        fingerprints.add(create_cxg().get_fingerprint())
+        gc.kempe_max_chain = 2
+        fingerprints.add(create_cxg().get_fingerprint())
+        self.assertEqual(len(fingerprints), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
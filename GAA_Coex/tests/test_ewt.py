@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from gaa_ewt import EdgeWeightTable, EdgeWeightJournal
+
+
+class TestEdgeWeightTable(unittest.TestCase):
+    # The table behaves as the dict {frozenset((id1, id2)): ew} used before
+    def test_dict_api(self):
+        reference = {frozenset(("a", "b")): 0.5, frozenset(("b", "c")): 0.25, frozenset(("a", "d")): 0.75}
+        ewt = EdgeWeightTable()
+        for key, ew in reference.items():
+            ewt[key] = ew
+        self.assertEqual(len(ewt), 3)
+        self.assertEqual(dict(ewt.items()), reference)
+        self.assertEqual(set(ewt.keys()), set(reference.keys()))
+        self.assertEqual(sorted(ewt.values()), sorted(reference.values()))
+        self.assertEqual(ewt[frozenset(("b", "a"))], 0.5)
+        self.assertEqual(ewt.get(frozenset(("a", "c"))), None)
+        self.assertEqual(ewt.get(frozenset(("a", "c")), 0), 0)
+        self.assertIn(frozenset(("c", "b")), ewt)
+        self.assertNotIn(frozenset(("c", "d")), ewt)
+        self.assertRaises(KeyError, lambda: ewt[frozenset(("c", "d"))])
+
+        # Overwrite, remove
+        ewt[frozenset(("a", "b"))] = 0.125
+        self.assertEqual(ewt[frozenset(("a", "b"))], 0.125)
+        self.assertEqual(ewt.pop(frozenset(("b", "c"))), 0.25)
+        self.assertEqual(ewt.pop(frozenset(("b", "c")), None), None)
+        self.assertRaises(KeyError, ewt.pop, frozenset(("b", "c")))
+        self.assertEqual(ewt, EdgeWeightTable.from_edges(["a", "a"], ["b", "d"], [0.125, 0.75]))
+        self.assertEqual(set(iter(ewt)), {frozenset(("a", "b")), frozenset(("a", "d"))})
+
+    # Edges with ew <= 0 are not kept, neighbors and edges are selected by the threshold
+    def test_threshold(self):
+        ewt = EdgeWeightTable.from_edges(["a", "a", "b", "c"], ["b", "c", "c", "d"], [0.5, 0.0, 0.25, 0.75])
+        self.assertEqual(len(ewt), 3)
+        self.assertEqual(ewt.get_neighbors("c"), {"b", "d"})
+        self.assertEqual(ewt.get_neighbors("c", 0.5), {"d"})
+        self.assertEqual(ewt.get_neighbors("x"), set())
+        self.assertEqual(ewt.get_edge_set({"a", "b", "c"}, 0.2), {frozenset(("a", "b")), frozenset(("b", "c"))})
+        self.assertEqual(ewt.get_edge_set(th=0.5), {frozenset(("c", "d"))})
+
+
+class TestEdgeWeightJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "table.ewj")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Weights are written as the shortest text of the float32 weight, and read back unchanged
+    def test_round_trip(self):
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        journal.append(0, ["a", "b"], ["b", "c"], np.float32([0.3, 0.123456789]))
+        journal.close()
+        with open(self.filename) as f:
+            self.assertEqual(f.read().splitlines(), ["# ewj inputs", "a, b, 0.3", "b, c, 0.12345679", "# chunk 0"])
+
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        journal.close()
+        self.assertEqual(journal.chunks, 1)
+        self.assertEqual(dict(journal.table.items()),
+                         {frozenset(("a", "b")): float(np.float32(0.3)),
+                          frozenset(("b", "c")): float(np.float32(0.123456789))})
+
+
+    # The edges of an interrupted chunk are dropped, the committed chunks are kept
+    def test_resume_interrupted(self):
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        journal.append(0, ["a"], ["b"], np.float32([0.5]))
+        journal.append(1, ["b"], ["c"], np.float32([0.25]))
+        journal.close()
+        with open(self.filename, "a") as f:
+            f.write("c, d, 0.75\nd, e, 0.")     # chunk 2 interrupted, partial line
+
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        self.assertEqual(journal.chunks, 2)
+        self.assertEqual(dict(journal.table.items()), {frozenset(("a", "b")): 0.5, frozenset(("b", "c")): 0.25})
+        journal.append(2, ["c"], ["e"], np.float32([0.125]))
+        journal.close()
+
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        journal.close(remove=True)
+        self.assertEqual(journal.chunks, 3)
+        self.assertEqual(dict(journal.table.items()), {frozenset(("a", "b")): 0.5, frozenset(("b", "c")): 0.25,
+                                                       frozenset(("c", "e")): 0.125})
+        self.assertFalse(os.path.exists(self.filename))
+
+    # A journal of other inputs is discarded
+    def test_other_inputs(self):
+        journal = EdgeWeightJournal(self.filename, "inputs")
+        journal.append(0, ["a"], ["b"], np.float32([0.5]))
+        journal.close()
+
+        journal = EdgeWeightJournal(self.filename, "other")
+        journal.close()
+        self.assertEqual(journal.chunks, 0)
+        self.assertEqual(len(journal.table), 0)
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), "# ewj other\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
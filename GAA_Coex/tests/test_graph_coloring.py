@@ -0,0 +1,144 @@
+import random
+import unittest
+import networkx as nx
+import gaa_graph_coloring as gc
+
+
+# Random graph with string nodes
+def create_graph(num_nodes, density, seed):
+    """
+    :return: vertices, edges
+    :type return: Tuple[Set[str], Set[FrozenSet[str, str]]]
+    """
+    rnd = random.Random(seed)
+    vertices = {"n%02d" % i for i in range(num_nodes)}
+    nodes = sorted(vertices)
+    edges = {frozenset((x, y)) for i, x in enumerate(nodes) for y in nodes[i + 1:] if rnd.random() < density}
+    return vertices, edges
+
+
+# Welsh-Powell of the baseline (greedy coloring with a list of available colors), in (-degree, id) order
+def reference_welsh_powell(vertices, edges):
+    """
+    :return: Dict[str: int]
+    """
+    neighbors = {x: set() for x in vertices}
+    for edge in edges:
+        x, y = tuple(edge)
+        neighbors[x].add(y)
+        neighbors[y].add(x)
+    node_list = sorted(vertices, key=lambda x: (-len(neighbors[x]), x))
+
+    col_val = {node_list[0]: 0}
+    for node in node_list[1:]:
+        available = [True] * len(vertices)
+        for adj_node in neighbors[node]:
+            if adj_node in col_val:
+                available[col_val[adj_node]] = False
+        col_val[node] = available.index(True)
+    return col_val
+
+
+class TestColoring(unittest.TestCase):
+    def assertValid(self, vertices, edges, colors):
+        self.assertEqual(set(colors.keys()), set(vertices))
+        for edge in edges:
+            x, y = tuple(edge)
+            self.assertNotEqual(colors[x], colors[y])
+
+    # The CSR Welsh-Powell gives the colors of the baseline algorithm
+    def test_welsh_powell_matches_reference(self):
+        for seed in range(20):
+            vertices, edges = create_graph(30, 0.05 * (seed % 10 + 1), seed)
+            expected = reference_welsh_powell(vertices, edges)
+            self.assertEqual(gc.coloring(vertices, edges), expected)
+            self.assertEqual(gc.coloring(vertices, edges, "welsh_powell"), expected)
+            self.assertEqual(gc.welsh_powell(gc.create_graph(vertices, edges)), expected)
+
+    # Every registered algorithm gives a valid coloring with colors 0..k-1
+    def test_algorithms_valid(self):
+        for algorithm in sorted(gc.algorithms.keys()):
+            for seed in range(10):
+                vertices, edges = create_graph(25, 0.1 * (seed + 1) / 2, seed)
+                colors = gc.coloring(vertices, edges, algorithm)
+                self.assertValid(vertices, edges, colors)
+                self.assertEqual(set(colors.values()), set(range(len(set(colors.values())))))
+
+    # Exact coloring finds the chromatic number, and never more colors than the heuristics
+    def test_exact(self):
+        graphs = [(nx.cycle_graph(7), 3), (nx.complete_bipartite_graph(4, 5), 2), (nx.complete_graph(5), 5),
+                  (nx.petersen_graph(), 3)]
+        for graph, chromatic in graphs:
+            vertices = {str(x) for x in graph.nodes()}
+            edges = {frozenset((str(x), str(y))) for x, y in graph.edges()}
+            self.assertEqual(len(set(gc.coloring(vertices, edges, "exact").values())), chromatic)
+
+        for seed in range(10):
+            vertices, edges = create_graph(20, 0.3, seed)
+            exact = len(set(gc.coloring(vertices, edges, "exact").values()))
+            for algorithm in gc.algorithms.keys():
+                self.assertLessEqual(exact, len(set(gc.coloring(vertices, edges, algorithm).values())))
+
+    def test_empty_graph(self):
+        for algorithm in gc.algorithms.keys():
+            self.assertEqual(gc.coloring({"a", "b"}, set(), algorithm), {"a": 0, "b": 0})
+
+
+class TestKempe(unittest.TestCase):
+    # The new node is adjacent to both colors, a swap of the (two node) chain of one neighbor frees a color
+    def test_insert_with_swap(self):
+        neighbors = {"x": {"u", "v"}, "u": {"x", "w"}, "v": {"x", "z"}, "w": {"u"}, "z": {"v"}}
+        colors = {"u": 1, "v": 2, "w": 2, "z": 1}
+        self.assertTrue(gc.kempe_insert("x", colors, [1, 2], lambda node: neighbors[node]))
+        self.assertEqual(set(colors.keys()), {"x", "u", "v", "w", "z"})
+        for x, ys in neighbors.items():
+            for y in ys:
+                self.assertNotEqual(colors[x], colors[y])
+
+    def test_insert_free_color(self):
+        neighbors = {"x": {"u"}, "u": {"x"}}
+        colors = {"u": 1}
+        self.assertTrue(gc.kempe_insert("x", colors, [1, 2], lambda node: neighbors[node]))
+        self.assertEqual(colors, {"u": 1, "x": 2})
+
+    # Chains larger than max_chain are not swapped, the colors are unchanged
+    def test_insert_chain_too_large(self):
+        neighbors = {"x": {"u", "v"}, "u": {"x", "w"}, "v": {"x", "z"}, "w": {"u"}, "z": {"v"}}
+        colors = {"u": 1, "v": 2, "w": 2, "z": 1}
+        self.assertFalse(gc.kempe_insert("x", colors, [1, 2], lambda node: neighbors[node], max_chain=1))
+        self.assertEqual(colors, {"u": 1, "v": 2, "w": 2, "z": 1})
+
+    # A triangle needs three colors
+    def test_insert_fails(self):
+        neighbors = {"x": {"u", "v"}, "u": {"x", "v"}, "v": {"x", "u"}}
+        colors = {"u": 1, "v": 2}
+        self.assertFalse(gc.kempe_insert("x", colors, [1, 2], lambda node: neighbors[node]))
+        self.assertEqual(colors, {"u": 1, "v": 2})
+
+
+class TestReduceColors(unittest.TestCase):
+    # Starting from the coloring of the graph with more edges, the result is valid and not worse
+    def test_reduce_from_denser_graph(self):
+        for seed in range(20):
+            vertices, edges = create_graph(30, 0.3, seed)
+            warm = {x: clr + 1 for x, clr in gc.coloring(vertices, edges).items()}
+            sparse = {edge for k, edge in enumerate(sorted(edges, key=sorted)) if k % 3 != 0}
+
+            colors = gc.reduce_colors(vertices, sparse, warm)
+            for edge in sparse:
+                x, y = tuple(edge)
+                self.assertNotEqual(colors[x], colors[y])
+            self.assertEqual(set(colors.values()), set(range(len(set(colors.values())))))
+            self.assertLessEqual(len(set(colors.values())), len(set(warm.values())))
+
+    # All distinct colors of a bipartite graph are reduced to two
+    def test_reduce_bipartite(self):
+        graph = nx.complete_bipartite_graph(3, 4)
+        vertices = {str(x) for x in graph.nodes()}
+        edges = {frozenset((str(x), str(y))) for x, y in graph.edges()}
+        warm = {x: k + 1 for k, x in enumerate(sorted(vertices))}
+        self.assertEqual(len(set(gc.reduce_colors(vertices, edges, warm).values())), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
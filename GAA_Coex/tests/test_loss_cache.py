@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+import constant
+import loss_cache
+
+
+# Increase the shared counter of the cache of the current process
+def count(num):
+    cache = loss_cache.get_cache()
+    for _ in range(num):
+        with cache.locked():
+            cache.tick()
+
+
+class TestLossCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.saved = constant.loss_cache_file, constant.loss_cache_slots
+        constant.loss_cache_file = os.path.join(self.directory, "losses")
+        constant.loss_cache_slots = 64
+
+    def tearDown(self):
+        constant.loss_cache_file, constant.loss_cache_slots = self.saved
+        shutil.rmtree(self.directory)
+
+    def test_insert_lookup(self):
+        cache = loss_cache.get_cache()
+        key = cache.get_key("itm", 32.7, -117.1, 6.0, False, "URBAN", 32.8, -117.2, 3.0, 0.5)
+        self.assertIsNone(cache.lookup(key))
+        cache.insert(key, 120.5)
+        cache.insert(key, 121.5)
+        self.assertEqual(cache.lookup(key), 121.5)
+        self.assertEqual(list(cache.keys).count(key), 1)
+
+    # Processes forked after the cache is opened hold the lock on their own
+    def test_lock_after_fork(self):
+        cache = loss_cache.get_cache()
+        start = int(cache.clock[0])
+        workers = [multiprocessing.Process(target=count, args=(20000,)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(int(cache.clock[0]) - start, 4 * 20000)
+
+
+if __name__ == '__main__':
+    unittest.main()
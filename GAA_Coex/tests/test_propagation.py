@@ -0,0 +1,23 @@
+import unittest
+import numpy as np
+import constant
+import gaa_propagation as pm
+from gaa_cbsd import CBSD
+
+
+class TestCoverageBound(unittest.TestCase):
+    # Grids pruned for an indoor CBSD must stay below rx_power_min at any allowed power
+    def test_pruned_indoor_grids_not_covered(self):
+        cbsd = CBSD("indoor", 32.7, -117.1, 6.0, 30.0, "URBAN", True, "cata")
+        lats, lons = np.meshgrid(np.linspace(32.55, 32.85, 61), np.linspace(-117.25, -116.95, 61))
+        coordinates = np.column_stack((lats.ravel(), lons.ravel()))
+
+        grids_in_range, losses = pm.get_coverage_bound(cbsd, coordinates)
+        pruned = ~grids_in_range
+        self.assertTrue(pruned.any())
+        self.assertTrue(grids_in_range.any())
+        self.assertTrue(np.all(cbsd.TxPowerMax - losses[pruned] < constant.rx_power_min))
+
+
+if __name__ == '__main__':
+    unittest.main()
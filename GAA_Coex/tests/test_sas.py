@@ -0,0 +1,186 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import constant
+import gaa_sas
+import gaa_graph_coloring as gc
+from gaa_sas import SAS
+from gaa_cbsd import CBSD
+from gaa_cxg import CxG
+from gaa_ewt import EdgeWeightTable
+
+
+# SAS with CBSDs at the same location, the i-th in CxG cxgs[i], and the given edges
+def create_sas(cxgs, edges, num_chs=1):
+    """
+    :type cxgs: List[int]
+    :type edges: List[Tuple[str, str, float]]
+    :return: SAS
+    """
+    mysas = SAS(propagation="freespace", coordination="point", num_chs=num_chs)
+    for i, cxg_id in enumerate(cxgs):
+        cbsd = CBSD(str(i), 32.7, -117.1, 6.0, 30.0, "URBAN", False, "cata")
+        cbsd.set_cxg(cxg_id)
+        mysas.index_cbsd(cbsd)
+    mysas.ew_table = EdgeWeightTable.from_edges(*zip(*edges)) if len(edges) > 0 else EdgeWeightTable()
+    for i in range(len(cxgs)):
+        mysas.ew_table.add_id(str(i))
+    return mysas
+
+
+class TestEscalation(unittest.TestCase):
+    # A set unsatisfied by the number of its CxGs alone has no edges to split on
+    def test_escalate_without_edges(self):
+        mysas = create_sas([0, 1], [("0", "1", 0.1)])
+        target_cs = {"edge_threshold": 0.2, "members": {"0": 1, "1": 2}, "chromatic": 2}
+
+        result = mysas.escalate_cs(target_cs)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].get("members"), {"0": 1, "1": 2})
+        self.assertEqual(result[0].get("edge_threshold"), 1.0)
+        self.assertEqual(target_cs.get("edge_threshold"), 0.2)
+
+        result = mysas.escalate_all([target_cs])
+        self.assertEqual([cs.get("edge_threshold") for cs in result], [1.0])
+
+    # An edge within a CxG is dropped by escalation when the channels are not enough
+    def test_escalate_split(self):
+        mysas = create_sas([0, 0], [("0", "1", 0.5)])
+        mysas.graph_coloring_all_until_satisfied()
+        self.assertEqual(len(mysas.CSs), 2)
+        for cs in mysas.CSs:
+            self.assertEqual(cs.get("chromatic"), 1)
+            self.assertGreaterEqual(cs.get("edge_threshold"), 0.5)
+
+
+class TestRecolor(unittest.TestCase):
+    # A CBSD joining a Connected Set takes a color freed by a Kempe chain swap, the other CxGs keep their colors
+    def test_kempe_repair(self):
+        mysas = create_sas([0, 0, 0, 0, 1, 0], [("0", "2", 0.5), ("1", "3", 0.5), ("0", "4", 0.5), ("1", "4", 0.5),
+                                                ("5", "0", 0.5), ("5", "1", 0.5)], num_chs=3)
+        members = {"0": 1, "1": 2, "2": 2, "3": 1, "4": 3}
+        mysas.CSs = [{"edge_threshold": 0.0, "members": dict(members), "chromatic": 3}]
+
+        self.assertEqual(mysas.recolor_cbsd("5"), [0])
+        self.assertEqual(len(mysas.CSs), 1)
+        target_cs = mysas.CSs[0]
+        self.assertEqual(target_cs.get("chromatic"), 3)
+        for edge in mysas.ew_table.get_edge_set(th=0.0):
+            x, y = tuple(edge)
+            if mysas.get_cbsd(x).CxG == mysas.get_cbsd(y).CxG:
+                self.assertNotEqual(target_cs.get("members").get(x), target_cs.get("members").get(y))
+
+        # Only the chain {"0", "2"} swapped its colors
+        self.assertEqual(target_cs.get("members"), {"0": 2, "1": 2, "2": 1, "3": 1, "4": 3, "5": 1})
+        mysas.close_pool()
+
+    # Moving the CBSD that connects a Connected Set splits it
+    def test_split_after_move(self):
+        mysas = create_sas([0, 0, 0], [("0", "1", 0.5), ("1", "2", 0.5)], num_chs=2)
+        mysas.graph_coloring_all_until_satisfied()
+        self.assertEqual(len(mysas.CSs), 1)
+
+        mysas.ew_table.pop(frozenset(("0", "1")))
+        mysas.ew_table.pop(frozenset(("1", "2")))
+        mysas.recolor_cbsd("1")
+        mysas.close_pool()
+        self.assertEqual(sorted(sorted(cs.get("members").keys()) for cs in mysas.CSs), [["0"], ["1"], ["2"]])
+
+
+class TestColorCxgs(unittest.TestCase):
+    def setUp(self):
+        self.saved = constant.coloring_cache_size, constant.coloring_cache_dir
+        constant.coloring_cache_size, constant.coloring_cache_dir = 0, None
+
+    def tearDown(self):
+        constant.coloring_cache_size, constant.coloring_cache_dir = self.saved
+
+    # The pool gives the same colorings as the current process, and the same as the coloring algorithm
+    def test_parallel(self):
+        rnd = random.Random(5)
+        cxgs = []
+        for k in range(6):
+            cxg = CxG(k)
+            nodes = ["%d-%02d" % (k, i) for i in range(20)]
+            cxg.add_cbsd(nodes)
+            cxg.edges = {frozenset((x, y)) for i, x in enumerate(nodes) for y in nodes[i + 1:] if rnd.random() < 0.3}
+            cxgs.append(cxg)
+
+        mysas = SAS()
+        try:
+            parallel = mysas.color_cxgs(cxgs, parallel=True)
+        finally:
+            mysas.close_pool()
+        self.assertEqual(parallel, mysas.color_cxgs(cxgs, parallel=False))
+        for cxg, (chromatic, colors) in zip(cxgs, parallel):
+            self.assertEqual(colors, gc.coloring(cxg.CBSDs, cxg.edges))
+            self.assertEqual(chromatic, len(set(colors.values())))
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.saved = gaa_sas.ew_chunk_size
+        gaa_sas.ew_chunk_size = 50
+
+    def tearDown(self):
+        gaa_sas.ew_chunk_size = self.saved
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def create_sas():
+        rnd = random.Random(1)
+        mysas = SAS(propagation="freespace", coordination="point")
+        for i in range(30):
+            mysas.index_cbsd(CBSD("c%02d" % i, 32.7 + rnd.uniform(-0.1, 0.1), -117.1 + rnd.uniform(-0.1, 0.1),
+                                  6.0, 30.0, "URBAN", False, "cata"))
+        return mysas
+
+    # A resumed computation gives the same edges and link losses as an uninterrupted one
+    def test_resume(self):
+        reference = self.create_sas()
+        ewt = reference.create_ew_table_chunks()
+
+        # Journal of a computation interrupted in chunk 3
+        filename = os.path.join(self.directory, "table.ewj")
+        self.create_sas().create_ew_table_chunks(filename)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        end = lines.index("# chunk 2") + 1
+        with open(filename, "w") as f:
+            f.write("\n".join(lines[:end + 2]) + "\n" + lines[end + 2][:5])
+
+        mysas = self.create_sas()
+        self.assertEqual(mysas.create_ew_table_chunks(filename), ewt)
+        self.assertEqual(mysas.link_loss.losses, reference.link_loss.losses)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Float32 weights are written as the shortest text of the same weight, and read back unchanged
+    def test_ew_table_round_trip(self):
+        weights = [0.3, 1.0, 0.123456789, 1e-5]
+        mysas = create_sas([0, 0, 1, 1, 0], [("0", "1", weights[0]), ("1", "2", weights[1]),
+                                             ("2", "3", weights[2]), ("3", "4", weights[3])])
+        content = mysas.get_ew_table_content()
+        self.assertEqual(content.splitlines(), ["# freespace", "0, 1, 0.3", "1, 2, 1.0", "2, 3, 0.12345679",
+                                                "3, 4, 0.00001"])
+
+        mysas.export_states(os.path.join(self.directory, "states"))
+        imported = SAS(coordination="point")
+        imported.import_states(os.path.join(self.directory, "states"))
+        self.assertEqual(dict(imported.ew_table.items()), dict(mysas.ew_table.items()))
+        self.assertEqual(sorted(imported.ew_table.values()), sorted(np.float32(weights).tolist()))
+        self.assertEqual(imported.get_ew_table_content(), content)
+
+
+if __name__ == '__main__':
+    unittest.main()